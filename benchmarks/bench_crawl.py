@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import subprocess
+import multiprocessing
+from argparse import ArgumentParser
+from typing import List, Dict, Any
+
+# Making the crawlytics module importable when the benchmark is run from the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlytics import Crawlytics, console
+from synthetic_site import SHAPES, page_count, start_server
+
+
+def run_crawl(url: str, url_limit: int, threads: int, connection: Any) -> None:
+    """
+    Crawl a shape in a fresh process so that the peak RSS and the CPU time are those of the crawl
+
+    Args:
+        url (str): Starting url of the shape
+        url_limit (int): URL limit of the crawl
+        threads (int): Number of worker threads
+        connection (multiprocessing.connection.Connection): Pipe receiving the measurements
+    """
+    console.quiet = True
+    start: float = time.perf_counter()
+
+    crawler = Crawlytics(url, url_limit=url_limit, threads=threads)
+    urls: List[str] = crawler.crawl_site(url)
+
+    elapsed: float = time.perf_counter() - start
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    connection.send({
+        'urls': len(urls),
+        'seconds': elapsed,
+        'cpu_seconds': usage.ru_utime + usage.ru_stime,
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        'peak_rss_mb': usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    })
+    connection.close()
+
+
+def measure(shape: str, port: int, size: int, threads: int, requests: Any) -> Dict[str, Any]:
+    """
+    Crawl a shape of the synthetic site and measure the crawl
+
+    Args:
+        shape (str): Name of the shape
+        port (int): Port of the local server
+        size (int): Size of the site in pages
+        threads (int): Number of worker threads
+        requests (multiprocessing.Value): Request counter of the server
+
+    Returns:
+        Dict[str, Any]: Measurements of the crawl
+    """
+    pages: int = page_count(shape, size)
+    url: str = f'http://127.0.0.1:{port}/{shape}/0'
+
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    served: int = requests.value
+
+    process = context.Process(target=run_crawl, args=(url, pages, threads, sender))
+    process.start()
+    sender.close()
+    result: Dict[str, Any] = receiver.recv()
+    process.join()
+
+    # Requests sent per discovered url, redirects and filtered links show up here
+    result['requests'] = requests.value - served
+    result['pages'] = pages
+    result['pages_per_second'] = result['urls'] / result['seconds']
+    result['requests_per_url'] = result['requests'] / max(result['urls'], 1)
+    return result
+
+
+def git_commit() -> str|None:
+    """
+    Get the commit of the repository being benchmarked
+
+    Returns:
+        str: Commit hash, None outside of a git checkout
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """
+    Crawl every shape of the synthetic site and save the measurements as JSON
+    """
+    parser = ArgumentParser(description="Benchmark suite of Crawlytics on a synthetic local website")
+    parser.add_argument("-n", "--pages", type=int, dest="pages", default=2000, help="Size of the synthetic site in pages, every shape gets a fraction of it (default: 2000)")
+    parser.add_argument("-s", "--shapes", type=str, dest="shapes", default=",".join(shape for shape in SHAPES if shape != 'navigation'), help="Comma separated shapes to crawl (default: all but navigation)")
+    parser.add_argument("-t", "--threads", type=int, dest="threads", default=20, help="Number of worker threads (default: 20)")
+    parser.add_argument("-o", "--output", type=str, dest="output", default="bench_crawl.json", help="JSON file receiving the results (default: bench_crawl.json)")
+    parser.add_argument("--compare", type=str, dest="compare", default=None, help="JSON results of a previous run to compare with")
+    parser.add_argument("--server_processes", type=int, dest="server_processes", default=4, help="Number of server processes (default: 4)")
+    parser.add_argument("--port", type=int, dest="port", default=8791, help="Port of the local server (default: 8791)")
+    args = parser.parse_args()
+
+    servers, requests = start_server(args.port, args.pages, args.server_processes)
+    previous: Dict[str, Any] = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as results_file:
+            previous = json.load(results_file).get('shapes', {})
+
+    try:
+        shapes: Dict[str, Dict[str, Any]] = {}
+        console.print(f'{"shape":<10} {"urls":>6} {"time (s)":>9} {"pages/s":>9} {"cpu (s)":>8} {"rss (MB)":>9} {"req/url":>8} {"vs prev":>8}')
+        for shape in args.shapes.split(','):
+            result: Dict[str, Any] = measure(shape, args.port, args.pages, args.threads, requests)
+            shapes[shape] = result
+
+            # Ratio of the pages per second to the previous run, above 1 is faster
+            ratio: str = ''
+            if shape in previous:
+                ratio = f'{result["pages_per_second"] / previous[shape]["pages_per_second"]:.2f}x'
+
+            console.print(f'{shape:<10} {result["urls"]:>6} {result["seconds"]:>9.2f} {result["pages_per_second"]:>9.0f} '
+                          f'{result["cpu_seconds"]:>8.2f} {result["peak_rss_mb"]:>9.1f} {result["requests_per_url"]:>8.2f} {ratio:>8}')
+
+    finally:
+        for process in servers:
+            process.terminate()
+
+    report: Dict[str, Any] = {
+        'commit': git_commit(),
+        'time': time.time(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'pages': args.pages,
+        'threads': args.threads,
+        'shapes': shapes
+    }
+    with open(args.output, 'w', encoding='utf-8') as results_file:
+        json.dump(report, results_file, indent=2)
+    console.print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import os
+import sys
+import time
+import random
+import tracemalloc
+from argparse import ArgumentParser
+from typing import List, Dict, Callable
+
+# Making the crawlytics module importable when the benchmark is run from the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlytics import LINK_EXTRACTORS, LinkExtractor, console
+
+
+def links_page(size: int) -> bytes:
+    """
+    Generate a page dense with links (navigation heavy page)
+
+    Args:
+        size (int): Approximate size of the page in bytes
+
+    Returns:
+        bytes: HTML page
+    """
+    parts: List[str] = ['<html><head><base href="/docs/"><title>Links</title></head><body><ul>']
+    length: int = 0
+    index: int = 0
+    while length < size:
+        part: str = f'<li><a href="/page/{index}.html" class="nav">Page {index}</a></li>'
+        parts.append(part)
+        length += len(part)
+        index += 1
+    parts.append('</ul></body></html>')
+    return ''.join(parts).encode()
+
+
+def text_page(size: int) -> bytes:
+    """
+    Generate a page with a lot of text and markup and few links (article like page)
+
+    Args:
+        size (int): Approximate size of the page in bytes
+
+    Returns:
+        bytes: HTML page
+    """
+    words: List[str] = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit']
+    parts: List[str] = ['<html><head><title>Text</title><style>p{color:red}</style></head><body>']
+    length: int = 0
+    index: int = 0
+    while length < size:
+        sentence: str = ' '.join(random.choice(words) for _ in range(80))
+        part: str = f'<div class="section"><h2>Section {index}</h2><p>{sentence} <b>{sentence[:40]}</b></p>'
+        if index % 10 == 0:
+            part += f'<a href="article/{index}?ref=text">read more</a>'
+        part += '</div>'
+        parts.append(part)
+        length += len(part)
+        index += 1
+    parts.append('</body></html>')
+    return ''.join(parts).encode()
+
+
+def nested_page(size: int) -> bytes:
+    """
+    Generate a page with a deep element tree (table and div soup)
+
+    Args:
+        size (int): Approximate size of the page in bytes
+
+    Returns:
+        bytes: HTML page
+    """
+    parts: List[str] = ['<html><body>']
+    length: int = 0
+    index: int = 0
+    while length < size:
+        part: str = '<div><div><table><tr><td><span><i>' + f'<a href="/deep/{index}">cell {index}</a>' + '</i></span></td></tr></table></div></div>'
+        parts.append(part)
+        length += len(part)
+        index += 1
+    parts.append('</body></html>')
+    return ''.join(parts).encode()
+
+
+# Fixtures of the benchmark
+FIXTURES: Dict[str, Callable[[int], bytes]] = {
+    'links': links_page,
+    'text': text_page,
+    'nested': nested_page
+}
+
+
+def run_extractor(name: str, page: bytes, chunk_size: int) -> LinkExtractor:
+    """
+    Feed the page to a link extractor in chunks like a streamed response
+
+    Args:
+        name (str): Name of the link extractor
+        page (bytes): HTML page
+        chunk_size (int): Size of the chunks fed to the extractor
+
+    Returns:
+        LinkExtractor: Link extractor after the end of the page
+    """
+    extractor: LinkExtractor = LINK_EXTRACTORS[name]('utf-8')
+    for offset in range(0, len(page), chunk_size):
+        extractor.feed(page[offset:offset + chunk_size])
+    extractor.finish()
+    return extractor
+
+
+def main():
+    """
+    Compare the link extractors on large generated HTML pages
+    """
+    parser = ArgumentParser(description="Microbenchmark of the Crawlytics link extractors")
+    parser.add_argument("-s", "--size", type=float, dest="size", default=5, help="Size of every fixture in MB (default: 5)")
+    parser.add_argument("-r", "--repeat", type=int, dest="repeat", default=3, help="Number of runs, the best one is reported (default: 3)")
+    parser.add_argument("--chunk_size", type=int, dest="chunk_size", default=65536, help="Size of the chunks fed to the extractors (default: 65536)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    size: int = int(args.size * 1024 * 1024)
+
+    console.print(f'{"fixture":<8} {"extractor":<10} {"links":>8} {"best (s)":>10} {"MB/s":>8} {"py heap (MB)":>13}')
+    for fixture, generate in FIXTURES.items():
+        page: bytes = generate(size)
+        megabytes: float = len(page) / (1024 * 1024)
+
+        for name in LINK_EXTRACTORS:
+            # Best wall time of the runs
+            best: float = float('inf')
+            for _ in range(args.repeat):
+                start: float = time.perf_counter()
+                extractor: LinkExtractor = run_extractor(name, page, args.chunk_size)
+                best = min(best, time.perf_counter() - start)
+
+            # Peak of the Python heap during one run (the lxml C heap is not traced)
+            tracemalloc.start()
+            run_extractor(name, page, args.chunk_size)
+            peak: int = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            console.print(f'{fixture:<8} {name:<10} {len(extractor.links):>8} {best:>10.3f} {megabytes / best:>8.1f} {peak / (1024 * 1024):>13.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import random
+import re
+from argparse import ArgumentParser
+from typing import List
+
+# Making the crawlytics module importable when the benchmark is run from the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlytics import LinkFilter, console
+
+# Default filter lists of Crawlytics
+IGNORE_EXTENSIONS: List[str] = [
+    'png', 'javascript', 'jpeg', 'jpg',
+    'js', 'css','gif', 'tif', 'bmp', 'ppm',
+    'webp', 'svg', 'pdf', 'ico', 'pdf',
+    'xlsx', 'csv', 'exe', 'war', 'mp4'
+]
+SESSION_END_PHRASES: List[str] = [
+    "logout", "log out", "log-out", "log_out",
+    "signout", "sign out","sign-out", "sign_out",
+    "logoff", "log-off", "log off", "log_off",
+    "signoff", "sign-off", "sign off", "sign_off"
+]
+NON_PAGE_HREF: List[str] = ['javascript:','mailto:','tel:']
+
+
+def legacy_keep(href_value: str) -> bool:
+    """
+    Keep/drop decision of the nested loops previously used in crawl_url
+
+    Args:
+        href_value (str): Value of the href attribute
+
+    Returns:
+        bool: True if the href is kept
+    """
+    logout = False
+    not_page = False
+    ignore = False
+
+    for logout_page in SESSION_END_PHRASES:
+        if str(logout_page).lower() in str(href_value).lower():
+            logout = True
+
+    for not_a_page in NON_PAGE_HREF:
+        if str(not_a_page) in str(href_value).lower():
+            not_page = True
+
+    if len(href_value)> 4:
+        for ignore_extension in IGNORE_EXTENSIONS:
+                if ignore_extension in  href_value[-4:] and '=' not in href_value and '?' not in href_value:
+                    ignore = True
+
+    return not logout and not not_page and not ignore
+
+
+def generate_hrefs(count: int) -> List[str]:
+    """
+    Generate a realistic mix of href values (pages, assets, logout links, non-page links)
+
+    Args:
+        count (int): Number of href values
+
+    Returns:
+        List[str]: href values
+    """
+    templates: List[str] = [
+        '/products/{0}/details.html', 'page{0}.php?id={0}&sort=asc', '../docs/section-{0}/',
+        'https://www.example.com/blog/{0}', '/static/img/photo{0}.jpg', '/assets/app.{0}.js',
+        '/api/data{0}.json', '/css/theme{0}.css', '/account/logout?session={0}', '/Sign-Out/{0}',
+        'mailto:user{0}@example.com', 'javascript:void({0})', 'tel:+1555{0}', '/download.php?file={0}.pdf',
+        '/img/banner{0}.png?v=2', '/reports/{0}.PDF'
+    ]
+    return [random.choice(templates).format(index) for index in range(count)]
+
+
+def main():
+    """
+    Measure the throughput of the link filter against the previous nested loops
+    """
+    parser = ArgumentParser(description="Benchmark of the Crawlytics link filter")
+    parser.add_argument("-n", "--hrefs", type=int, dest="hrefs", default=200000, help="Number of href values (default: 200000)")
+    parser.add_argument("-r", "--repeat", type=int, dest="repeat", default=3, help="Number of runs, the best one is reported (default: 3)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    hrefs: List[str] = generate_hrefs(args.hrefs)
+    link_filter = LinkFilter(SESSION_END_PHRASES, NON_PAGE_HREF, IGNORE_EXTENSIONS)
+
+    console.print(f'{"filter":<12} {"kept":>8} {"best (s)":>10} {"hrefs/s":>12}')
+    for name, keep in (('nested-loop', legacy_keep), ('LinkFilter', lambda href: link_filter.drop_reason(href) is None)):
+        # Best wall time of the runs
+        best: float = float('inf')
+        for _ in range(args.repeat):
+            start: float = time.perf_counter()
+            kept: int = sum(1 for href in hrefs if keep(href))
+            best = min(best, time.perf_counter() - start)
+
+        console.print(f'{name:<12} {kept:>8} {best:>10.3f} {len(hrefs) / best:>12,.0f}')
+
+    # Decisions which changed (eg. /data.json was dropped as js, /img.png?v=2 was kept), digits are folded to list the shapes
+    changed: List[str] = [href for href in hrefs if legacy_keep(href) != (link_filter.drop_reason(href) is None)]
+    shapes: List[str] = sorted({re.sub(r'\d+', 'N', href) for href in changed})
+    console.print(f'Changed decisions: {len(changed)} hrefs, shapes: {", ".join(shapes)}')
+
+
+if __name__ == '__main__':
+    main()
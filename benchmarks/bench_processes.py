@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from typing import List
+
+# Making the crawlytics module importable when the benchmark is run from the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlytics import Crawlytics, console
+from synthetic_site import SHAPES, page_count, start_server
+
+
+def main():
+    """
+    Measure how the pages per second of a sharded crawl scale with the number of processes
+    """
+    parser = ArgumentParser(description="Benchmark of the Crawlytics sharded crawl")
+    parser.add_argument("-n", "--pages", type=int, dest="pages", default=5000, help="Number of pages of the synthetic site (default: 5000)")
+    parser.add_argument("-P", "--processes", type=str, dest="processes", default="1,2,4", help="Comma separated numbers of crawler processes (default: 1,2,4)")
+    parser.add_argument("-t", "--threads", type=int, dest="threads", default=20, help="Number of worker threads per process (default: 20)")
+    parser.add_argument("--navigation", type=int, dest="navigation", default=100, help="Number of navigation links on every page (default: 100)")
+    parser.add_argument("--server_processes", type=int, dest="server_processes", default=4, help="Number of server processes (default: 4)")
+    parser.add_argument("--port", type=int, dest="port", default=8790, help="Port of the local server (default: 8790)")
+    args = parser.parse_args()
+
+    # Pages dense with navigation links, so that parsing and filtering dominate
+    SHAPES['navigation']['navigation'] = args.navigation
+    servers, _ = start_server(args.port, args.pages, args.server_processes)
+    url: str = f'http://127.0.0.1:{args.port}/navigation/0'
+    pages: int = page_count('navigation', args.pages)
+
+    try:
+        results: List[str] = []
+        baseline: float = 0.0
+        for processes in [int(value) for value in args.processes.split(',')]:
+            crawler = Crawlytics(url, url_limit=pages, threads=args.threads)
+
+            # The crawl output is silenced, only the timings are reported
+            console.quiet = True
+            start: float = time.perf_counter()
+            urls: List[str] = crawler.sharded_crawl_site(url, processes) if processes > 1 else crawler.crawl_site(url)
+            elapsed: float = time.perf_counter() - start
+            console.quiet = False
+
+            rate: float = len(urls) / elapsed
+            baseline = baseline or rate
+            results.append(f'{processes:>9} {len(urls):>8} {elapsed:>10.2f} {rate:>10.0f} {rate / baseline:>8.2f}x')
+
+        console.print(f'{"processes":>9} {"pages":>8} {"time (s)":>10} {"pages/s":>10} {"speedup":>9}')
+        for line in results:
+            console.print(line)
+        console.print(f'CPU cores: {os.cpu_count()}')
+
+    finally:
+        for process in servers:
+            process.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+import sys
+import time
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Tuple, Any
+
+# Shapes of the generated sites, every shape is served under /<shape>/ and its pages only link inside it
+#   pages: number of pages as a fraction of the site size
+#   fanout: number of child pages linked from every page (page n links to n*fanout+1 .. n*fanout+fanout)
+#   size: approximate body size in bytes (large pages)
+#   delay: delay in seconds before every response (slow endpoints)
+#   redirects: number of redirects in front of every child page (redirect chains)
+#   traps: number of logout links and of asset links on every page (must be filtered out by the crawler)
+#   navigation: number of navigation links shared by every page (parsing and dedup heavy pages)
+SHAPES: Dict[str, Dict[str, Any]] = {
+    'fanout': {'pages': 1.0, 'fanout': 50},
+    'deep': {'pages': 0.2, 'fanout': 1},
+    'large': {'pages': 0.1, 'fanout': 5, 'size': 512 * 1024},
+    'slow': {'pages': 0.2, 'fanout': 5, 'delay': 0.05},
+    'redirects': {'pages': 0.5, 'fanout': 5, 'redirects': 3},
+    'traps': {'pages': 0.5, 'fanout': 5, 'traps': 20},
+    'navigation': {'pages': 1.0, 'fanout': 5, 'navigation': 100}
+}
+
+# Filler text of the large pages
+FILLER: str = '<p>' + ' '.join(['lorem ipsum dolor sit amet consectetur adipiscing elit'] * 20) + '</p>'
+
+
+def page_count(shape: str, size: int) -> int:
+    """
+    Get the number of pages of a shape
+
+    Args:
+        shape (str): Name of the shape
+        size (int): Size of the site in pages
+
+    Returns:
+        int: Number of pages
+    """
+    return max(int(SHAPES[shape]['pages'] * size), 1)
+
+
+def render_page(shape: str, page: int, size: int) -> bytes:
+    """
+    Generate a page of a shape
+
+    Args:
+        shape (str): Name of the shape
+        page (int): Number of the page
+        size (int): Size of the site in pages
+
+    Returns:
+        bytes: HTML page
+    """
+    config: Dict[str, Any] = SHAPES[shape]
+    count: int = page_count(shape, size)
+    fanout: int = config.get('fanout', 0)
+    children: range = range(page * fanout + 1, min(page * fanout + fanout, count - 1) + 1)
+
+    # Child pages, behind a redirect chain if the shape has one
+    if config.get('redirects'):
+        links: List[str] = [f'/{shape}/r/{config["redirects"]}/{child}' for child in children]
+    else:
+        links = [f'/{shape}/{child}' for child in children]
+
+    # Link back to the home page and navigation block
+    links.append(f'/{shape}/0')
+    links += [f'/{shape}/{index % count}' for index in range(config.get('navigation', 0))]
+
+    # Logout and asset links which the crawler must not fetch
+    for index in range(config.get('traps', 0)):
+        links += [f'/{shape}/account/logout?session={page}-{index}', f'/{shape}/static/app.{page}-{index}.js',
+                  f'/{shape}/img/banner{page}-{index}.png', f'/{shape}/Sign-Out/{index}']
+
+    parts: List[str] = [f'<html><head><title>{shape} {page}</title></head><body><ul>']
+    parts += [f'<li><a href="{link}">link</a></li>' for link in links]
+    parts.append('</ul>')
+
+    # Text of the large pages
+    length: int = sum(len(part) for part in parts)
+    while length < config.get('size', 0):
+        parts.append(FILLER)
+        length += len(FILLER)
+
+    parts.append('</body></html>')
+    return ''.join(parts).encode()
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the synthetic site
+
+    Attributes:
+        size (int): Size of the site in pages
+        requests (multiprocessing.Value): Number of requests served by all the server processes
+    """
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes, Nagle would delay the body of every keep-alive response by 40 ms
+    disable_nagle_algorithm = True
+    size: int = 1000
+    requests: Any = None
+
+    def do_GET(self):
+        """
+        Serve a page, a redirect or an asset
+        """
+        with self.requests.get_lock():
+            self.requests.value += 1
+
+        parts: List[str] = self.path.split('?')[0].strip('/').split('/')
+        shape: str = parts[0]
+        if shape not in SHAPES:
+            return self.respond(404, b'not found', 'text/plain')
+
+        # Slow endpoints
+        if SHAPES[shape].get('delay'):
+            time.sleep(SHAPES[shape]['delay'])
+
+        # Redirect chain, /<shape>/r/<hops>/<page>
+        if len(parts) == 4 and parts[1] == 'r' and parts[2].isdigit():
+            hops: int = int(parts[2]) - 1
+            location: str = f'/{shape}/r/{hops}/{parts[3]}' if hops else f'/{shape}/{parts[3]}'
+            return self.respond(302, b'', 'text/html', {'Location': location})
+
+        # Page, /<shape>/<page>
+        if len(parts) == 2 and parts[1].isdigit():
+            return self.respond(200, render_page(shape, int(parts[1]), self.size), 'text/html; charset=utf-8')
+
+        # Anything else is an asset or a logout page
+        return self.respond(200, b'asset', 'application/octet-stream')
+
+    def respond(self, status: int, body: bytes, content_type: str, headers: Dict[str, str]|None = None) -> None:
+        """
+        Send a response with a body
+
+        Args:
+            status (int): Status code
+            body (bytes): Body
+            content_type (str): Content-Type header
+            headers (Dict[str, str]): Other headers (default = None)
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """
+        Silence the access log
+        """
+        return None
+
+
+class SiteServer(ThreadingHTTPServer):
+    """
+    Server of the synthetic site, the connections closed by the crawler are not reported
+    """
+
+    def handle_error(self, request: Any, client_address: Tuple[str, int]) -> None:
+        """
+        Ignore the connections reset or closed by the client (oversized bodies aborted, keep-alive
+        connections closed by the crawler), report the other errors
+
+        Args:
+            request (socket.socket): Client connection
+            client_address (Tuple[str, int]): Address of the client
+        """
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+def start_server(port: int, size: int, processes: int) -> Tuple[List[multiprocessing.Process], Any]:
+    """
+    Start the synthetic site on 127.0.0.1, the listening socket is shared by several forked
+    server processes so that the server is not the bottleneck of the benchmarks
+
+    Args:
+        port (int): Port of the server
+        size (int): Size of the site in pages
+        processes (int): Number of server processes
+
+    Returns:
+        Tuple[List[multiprocessing.Process], multiprocessing.Value]: Server processes and the shared request counter
+    """
+    context = multiprocessing.get_context('fork')
+    SiteHandler.size = size
+    SiteHandler.requests = context.Value('q', 0)
+
+    server = SiteServer(('127.0.0.1', port), SiteHandler)
+    servers: List[multiprocessing.Process] = [context.Process(target=server.serve_forever, daemon=True) for _ in range(processes)]
+    for process in servers:
+        process.start()
+    server.socket.close()
+    return servers, SiteHandler.requests
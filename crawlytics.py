@@ -1,475 +1,5055 @@
 import mechanicalsoup
 import requests
+import aiohttp
+import asyncio
 import time
 import threading
+from collections import deque, Counter
 import sys
 import math
+import itertools
+import hashlib
+import re
+import heapq
+import random
+import sqlite3
+import zlib
+import os
+import bisect
+import cProfile
+import pstats
+import json
+import gzip
+import multiprocessing
+import queue
+import csv
+import struct
+import atexit
+import signal
 from tldextract import extract
+from bs4 import BeautifulSoup
+from lxml import etree
+from urllib.parse import urljoin, urldefrag, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+from xml.sax.saxutils import escape
+from array import array
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from argparse import ArgumentParser, ArgumentError
-from typing import List, Set, Dict, Tuple, Optional, Union, Any
+from typing import List, Set, Dict, Tuple, Optional, Union, Any, Deque, Iterable, Iterator, FrozenSet, NamedTuple, IO, Callable, Protocol
 from rich.console import Console
 
 console = Console()
 error_console = Console(stderr=True, style="bold red")
 
-class Crawlytics:
+class FrontierQueue(Protocol):
+    """
+    Side of a frontier used by a crawler: the urls found are put, the urls taken are deferred or marked
+    done, and the pending urls are counted or dropped at the time limit. Implemented by Frontier and by
+    TargetFrontier (part of a batch frontier).
     """
-    Crawlytics class
 
-    Args:
-        hostname (str): Hostname of the website
+    def __len__(self) -> int:
+        """
+        Number of pending urls
+        """
+
+    def put(self, url: str) -> None:
+        """
+        Add a url to be crawled
+        """
+
+    def defer(self, url: str, delay: float) -> None:
+        """
+        Put back a url to be handed out again after a delay
+        """
+
+    def task_done(self, url: str|None = None) -> None:
+        """
+        Mark a url as crawled
+        """
+
+    def clear(self) -> int:
+        """
+        Drop the pending urls, they are marked done without being crawled
+        """
+
+
+class Frontier:
+    """
+    Thread-safe frontier queue of urls waiting to be crawled
+
+    Workers block on get() until a url is available instead of polling, and the
+    crawl is complete when join() returns (every queued url has been marked done).
+    A url can be deferred (host rate limit, retry backoff), it is handed out again once its delay is over.
 
     Attributes:
-        __start (float): Time at which the crawler was started
-        __browser (mechanicalsoup.StatefulBrowser): Browser object
-        user_agent (str): User agent
-        _crawl_url_limit (int): URL limit for crawling (default = 1000)
-        _url_flag_limit (bool): URL limit flag
-        __thread_time_limit (int): Time limit in minutes for thread (default = 20)
-        __time_flag_limit (bool): Time limit flag
-        time_break_limit (int): Time limit in minutes for break (default = 5 min)
-        __threads_limit (int): Limit for threads (default = 100)
-        __threads_buffer (Set[str]): Thread buffer for new threads to be created (Threads Limit)
-        thread_kill (bool): Thread kill flag
-        __thread_flag_limit (bool): Thread flag limit (Stop creating new threads)
-        _hostname (str): Hostname of the website
-        _domain (str): Domain name of the website
-        __fetched_urls (List[str]): URLs fetched from the webpages
-        _known_extensions (List[str]): Extensions to be crawled (eg. php, html, htm, aspx, jsp)
-        _ignore_extensions (List[str]): Extensions to be ignored while crawling (eg. png, jpeg, jpg, js, css, gif, pdf)
-        __session_end_phrases (List[str]): Session end phrases if present in the URL then don't crawl it (eg. logout, sign out, log-out)
-        __non_page_href (List[str]): Non-page URLs to be ignored while crawling (eg. javascript, mailto, tel)
-        _fetched_urls (Set[str]): Fetched URLs
-        __processed_urls (Set[str]): Processed URLs
-        __logout_page (str): Login and logout pages
-        thread (threading.Thread): Thread object
+        _queue (Deque[str]): Pending urls
+        _delayed (List[Tuple[float, int, str]]): Heap of the deferred urls (ready time, sequence, url)
+        _sequence (int): Sequence number keeping the deferred urls with the same ready time in order
+        _lock (threading.Lock): Lock guarding the queue and the counters
+        _not_empty (threading.Condition): Signalled when a url is added or the frontier is closed
+        _all_done (threading.Condition): Signalled when every queued url has been marked done
+        _unfinished (int): Number of urls queued but not marked done yet
+        _closed (bool): Closed flag, get() returns None once it is set
     """
 
-    def __init__(self, hostname: str, url_limit: int = 1000):
+    def __init__(self):
         """
         Constructor method
         """
-        # Time at which the crawler was started
-        self.__start: float = time.time()
+        self._queue: Deque[str] = deque()
+        self._delayed: List[Tuple[float, int, str]] = []
+        self._sequence: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._not_empty: threading.Condition = threading.Condition(self._lock)
+        self._all_done: threading.Condition = threading.Condition(self._lock)
+        self._unfinished: int = 0
+        self._closed: bool = False
+
+    def __len__(self) -> int:
+        """
+        Number of pending urls
+        """
+        return len(self._queue) + len(self._delayed)
 
-        # Browser object
-        self.__browser: mechanicalsoup.StatefulBrowser = mechanicalsoup.StatefulBrowser()
+    def put(self, url: str) -> None:
+        """
+        Add a url to the frontier and wake up one waiting worker
 
-        # User agent
-        self.user_agent: str = (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/79.0.3945.130 Safari/537.36 Firefox/62.0"
+        Args:
+            url (str): URL to be crawled
+        """
+        with self._lock:
+            self._queue.append(url)
+            self._unfinished += 1
+            self._not_empty.notify()
+
+    def get(self) -> str|None:
+        """
+        Block until a url is available
+
+        Returns:
+            str: URL to be crawled or None if the frontier is closed
+        """
+        with self._lock:
+            while not self._closed:
+                # Deferred urls first once their delay is over
+                if self._delayed and self._delayed[0][0] <= time.monotonic():
+                    return heapq.heappop(self._delayed)[2]
+                if self._queue:
+                    return self._queue.popleft()
+                if self._refill():
+                    continue
+
+                # Sleeping until a url is added or the next deferred url is ready
+                self._not_empty.wait(self._delayed[0][0] - time.monotonic() if self._delayed else None)
+            return None
+
+    def defer(self, url: str, delay: float) -> None:
+        """
+        Put back a url returned by get() to be handed out again after a delay
+        The url is still unfinished, task_done() must not be called for it
+
+        Args:
+            url (str): URL returned by get()
+            delay (float): Delay in seconds
+        """
+        with self._lock:
+            self._sequence += 1
+            heapq.heappush(self._delayed, (time.monotonic() + delay, self._sequence, url))
+            self._not_empty.notify()
+
+    def _refill(self) -> bool:
+        """
+        Load more urls into the queue when it is empty (lock held), the in-memory frontier has none
+
+        Returns:
+            bool: True if urls were loaded
+        """
+        return False
+
+    def task_done(self, url: str|None = None) -> None:
+        """
+        Mark a url returned by get() as crawled
+
+        Args:
+            url (str): URL returned by get() (default = None)
+        """
+        with self._lock:
+            self._unfinished -= 1
+            if self._unfinished <= 0:
+                self._all_done.notify_all()
+
+    def join(self, timeout: float|None = None) -> bool:
+        """
+        Block until every queued url has been marked done
+
+        Args:
+            timeout (float): Maximum time to wait in seconds (default = None, wait forever)
+
+        Returns:
+            bool: True if the frontier is drained, False if the timeout expired
+        """
+        with self._lock:
+            return self._all_done.wait_for(lambda: self._unfinished <= 0, timeout)
+
+    def clear(self) -> int:
+        """
+        Drop all the pending urls, they are marked done without being crawled
+
+        Returns:
+            int: Number of urls dropped
+        """
+        with self._lock:
+            dropped: int = len(self._queue) + len(self._delayed)
+            self._queue.clear()
+            self._delayed.clear()
+            self._unfinished -= dropped
+            if self._unfinished <= 0:
+                self._all_done.notify_all()
+            return dropped
+
+    def close(self) -> None:
+        """
+        Close the frontier and wake up all the waiting workers
+        """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+
+    def checkpoint(self) -> None:
+        """
+        Persist the state of the frontier, nothing to persist for the in-memory frontier
+        """
+        return None
+
+    def stored_urls(self) -> Iterator[Tuple[int, str]]:
+        """
+        Iterate over the urls of an interrupted crawl, the in-memory frontier has none
+
+        Returns:
+            Iterator[Tuple[int, str]]: Fingerprint and url of every stored url
+        """
+        return iter(())
+
+
+class PersistentFrontier(Frontier):
+    """
+    Frontier backed by a SQLite store (WAL mode) so that an interrupted crawl can be resumed
+
+    Every url is stored with its fingerprint and its state (pending, queued in memory or done).
+    At most memory_limit urls are kept in memory, the others stay pending in the store and are
+    loaded in batches when the memory queue runs empty. New urls and done marks are buffered
+    and written in one transaction at every checkpoint.
+
+    Attributes:
+        path (str): Path of the SQLite store
+        memory_limit (int): Maximum number of urls queued in memory (default = 10000)
+        checkpoint_interval (float): Maximum time in seconds between two checkpoints (default = 5)
+        checkpoint_batch (int): Maximum number of buffered writes before a checkpoint (default = 1000)
+        read_batch (int): Number of stored urls read at a time on resume (default = 1000)
+        exit_timeout (float): Maximum time in seconds waited for the frontier lock by the checkpoint at exit (default = 2)
+        __connection (sqlite3.Connection): Connection to the store, used under the frontier lock
+        __spilled (int): Number of pending urls which are only in the store
+        __inserts (List[Tuple[int, str, int]]): Buffered new urls (fingerprint, url, state)
+        __done (List[Tuple[int]]): Buffered fingerprints of the crawled urls
+        __last_checkpoint (float): Time of the last checkpoint
+    """
+
+    # States of the urls in the store
+    PENDING: int = 0
+    QUEUED: int = 1
+    DONE: int = 2
+
+    def __init__(self, path: str, resume: bool = False, memory_limit: int = 10000):
+        """
+        Constructor method
+
+        Args:
+            path (str): Path of the SQLite store
+            resume (bool): Continue the crawl stored in the store instead of starting a new one (default = False)
+            memory_limit (int): Maximum number of urls queued in memory (default = 10000)
+        """
+        super().__init__()
+        self.path: str = path
+        self.memory_limit: int = memory_limit
+        self.checkpoint_interval: float = 5.0
+        self.checkpoint_batch: int = 1000
+        self.read_batch: int = 1000
+        self.exit_timeout: float = 2.0
+        self.__spilled: int = 0
+        self.__inserts: List[Tuple[int, str, int]] = []
+        self.__done: List[Tuple[int]] = []
+        self.__last_checkpoint: float = time.time()
+
+        self.__connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS urls ('
+            'id INTEGER PRIMARY KEY, fingerprint INTEGER NOT NULL UNIQUE, url TEXT NOT NULL, state INTEGER NOT NULL)'
         )
-        # URL limit for crawling (default = 1000)
-        self._crawl_url_limit: int = url_limit
-        self._url_flag_limit: bool = False
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS urls_state ON urls (state, id)')
+
+        with self.__connection:
+            if resume:
+                # The urls queued in memory when the crawl was interrupted are pending again
+                self.__connection.execute('UPDATE urls SET state = ? WHERE state = ?', (self.PENDING, self.QUEUED))
+                self.__spilled = self.__connection.execute('SELECT COUNT(*) FROM urls WHERE state = ?', (self.PENDING,)).fetchone()[0]
+                self._unfinished = self.__spilled
+            else:
+                self.__connection.execute('DELETE FROM urls')
+
+        # Writing the buffered done marks if the process exits without closing the frontier (Ctrl-C, SIGTERM)
+        atexit.register(self.exit_checkpoint)
+
+    def __len__(self) -> int:
+        """
+        Number of pending urls (in memory and in the store)
+        """
+        return len(self._queue) + len(self._delayed) + self.__spilled
+
+    def stored_urls(self) -> Iterator[Tuple[int, str]]:
+        """
+        Iterate over the urls of the store in the order they were found (resume)
+
+        Returns:
+            Iterator[Tuple[int, str]]: Fingerprint and url of every stored url
+        """
+        last_id: int = 0
+        while True:
+            # Reading the urls in batches after the last one read, the whole table is never in memory
+            with self._lock:
+                rows: List[Tuple[int, int, str]] = self.__connection.execute(
+                    'SELECT id, fingerprint, url FROM urls WHERE id > ? ORDER BY id LIMIT ?', (last_id, self.read_batch)
+                ).fetchall()
+            if not rows:
+                return
+
+            for _, fingerprint, url in rows:
+                # Fingerprints are stored as signed 64-bit integers
+                yield fingerprint & 0xFFFFFFFFFFFFFFFF, url
+            last_id = rows[-1][0]
+
+    def put(self, url: str) -> None:
+        """
+        Add a url to the frontier, it is queued in memory unless the memory queue is full
+
+        Args:
+            url (str): URL to be crawled
+        """
+        fingerprint: int = to_signed(url_fingerprint(url))
+
+        with self._lock:
+            # Urls go to the store once the memory queue is full and until it is drained (first in, first out)
+            if self.__spilled or len(self._queue) >= self.memory_limit:
+                self.__inserts.append((fingerprint, url, self.PENDING))
+                self.__spilled += 1
+            else:
+                self.__inserts.append((fingerprint, url, self.QUEUED))
+                self._queue.append(url)
+                self._not_empty.notify()
+
+            self._unfinished += 1
+            self.__maybe_checkpoint()
+
+    def task_done(self, url: str|None = None) -> None:
+        """
+        Mark a url returned by get() as crawled, it is not crawled again after a resume
+
+        Args:
+            url (str): URL returned by get() (default = None)
+        """
+        with self._lock:
+            if url is not None:
+                self.__done.append((to_signed(url_fingerprint(url)),))
+                self.__maybe_checkpoint()
+
+        super().task_done(url)
+
+    def clear(self) -> int:
+        """
+        Drop all the pending urls, they stay pending in the store so that the crawl can be resumed
+
+        Returns:
+            int: Number of urls dropped
+        """
+        with self._lock:
+            dropped: int = len(self._queue) + len(self._delayed) + self.__spilled
+            self._queue.clear()
+            self._delayed.clear()
+            self.__spilled = 0
+            self._unfinished -= dropped
+            if self._unfinished <= 0:
+                self._all_done.notify_all()
+            return dropped
+
+    def close(self) -> None:
+        """
+        Close the frontier, the buffered writes are checkpointed
+        """
+        super().close()
+        self.checkpoint()
+        atexit.unregister(self.exit_checkpoint)
+
+    def checkpoint(self) -> None:
+        """
+        Write the buffered new urls and done marks to the store in one transaction
+        """
+        with self._lock:
+            self.__checkpoint()
+
+    def exit_checkpoint(self) -> None:
+        """
+        Checkpoint at interpreter exit, skipped if the frontier lock cannot be taken in time
+        (a daemon worker stopped while holding it would otherwise block the exit forever)
+        """
+        if not self._lock.acquire(timeout=self.exit_timeout):
+            error_console.print(f'Frontier checkpoint skipped at exit, the frontier is locked ({self.path})')
+            return
+        try:
+            self.__checkpoint()
+        finally:
+            self._lock.release()
+
+    def __maybe_checkpoint(self) -> None:
+        """
+        Checkpoint when enough writes are buffered or the checkpoint interval has passed (lock held)
+        """
+        if len(self.__inserts) + len(self.__done) >= self.checkpoint_batch or time.time() - self.__last_checkpoint > self.checkpoint_interval:
+            self.__checkpoint()
+
+    def __checkpoint(self) -> None:
+        """
+        Write the buffered new urls and done marks to the store (lock held)
+        """
+        try:
+            with self.__connection:
+                if self.__inserts:
+                    self.__connection.executemany('INSERT OR IGNORE INTO urls (fingerprint, url, state) VALUES (?, ?, ?)', self.__inserts)
+                if self.__done:
+                    self.__connection.executemany(f'UPDATE urls SET state = {self.DONE} WHERE fingerprint = ?', self.__done)
+            self.__inserts = []
+            self.__done = []
+
+        except sqlite3.Error as error:
+            error_console.print('frontier checkpoint function error')
+            error_console.print(error)
+
+        self.__last_checkpoint = time.time()
+
+    def _refill(self) -> bool:
+        """
+        Load the next batch of pending urls from the store into the memory queue (lock held)
+
+        Returns:
+            bool: True if urls were loaded
+        """
+        if not self.__spilled:
+            return False
+
+        # The buffered urls have to be in the store before they can be loaded
+        self.__checkpoint()
+
+        rows: List[Tuple[int, str]] = self.__connection.execute(
+            'SELECT id, url FROM urls WHERE state = ? ORDER BY id LIMIT ?', (self.PENDING, self.memory_limit)
+        ).fetchall()
+
+        with self.__connection:
+            self.__connection.executemany(f'UPDATE urls SET state = {self.QUEUED} WHERE id = ?', [(row[0],) for row in rows])
+
+        self._queue.extend(row[1] for row in rows)
+
+        if rows:
+            self.__spilled = max(self.__spilled - len(rows), 0)
+            return True
+
+        # Nothing left in the store, the counters are out of sync
+        self._unfinished -= self.__spilled
+        self.__spilled = 0
+        if self._unfinished <= 0:
+            self._all_done.notify_all()
+        return False
+
+
+class BatchFrontier:
+    """
+    Frontier shared by the crawlers of a batch crawl, one queue per target
+    The workers take the targets with queued urls in turn (round robin), one url at a time, so that
+    a large site cannot starve the other targets whatever the size of its queue. The deferred urls of
+    all the targets share a heap. Every crawler sees its part of the frontier as a TargetFrontier.
+
+    Attributes:
+        _queues (List[Deque[str|None]]): Pending urls of every target (None asks the worker to start the target)
+        _ready (Deque[int]): Targets with pending urls in round robin order
+        _delayed (List[Tuple[float, int, int, str]]): Heap of the deferred urls (ready time, sequence, target, url)
+        _sequence (int): Sequence number keeping the deferred urls with the same ready time in order
+        _unfinished (List[int]): Number of urls queued but not marked done yet of every target
+        _lock (threading.Lock): Lock guarding the queues and the counters
+        _not_empty (threading.Condition): Signalled when a url is added or the frontier is closed
+        _all_done (threading.Condition): Signalled when every queued url of a target has been marked done
+        _closed (bool): Closed flag, get() returns None once it is set
+    """
+
+    def __init__(self, targets: int):
+        """
+        Constructor method
+
+        Args:
+            targets (int): Number of targets
+        """
+        self._queues: List[Deque[str|None]] = [deque() for _ in range(targets)]
+        self._ready: Deque[int] = deque()
+        self._delayed: List[Tuple[float, int, int, str]] = []
+        self._sequence: int = 0
+        self._unfinished: List[int] = [0] * targets
+        self._lock: threading.Lock = threading.Lock()
+        self._not_empty: threading.Condition = threading.Condition(self._lock)
+        self._all_done: threading.Condition = threading.Condition(self._lock)
+        self._closed: bool = False
+
+    def put(self, target: int, url: str|None) -> None:
+        """
+        Add a url of a target and wake up one waiting worker
+
+        Args:
+            target (int): Index of the target
+            url (str): URL to be crawled, None to start the target
+        """
+        with self._lock:
+            urls: Deque[str|None] = self._queues[target]
+            if not urls:
+                self._ready.append(target)
+            urls.append(url)
+            self._unfinished[target] += 1
+            self._not_empty.notify()
+
+    def get(self) -> Tuple[int, str|None]|None:
+        """
+        Block until a url of any target is available
+
+        Returns:
+            Tuple[int, str]: Index of the target and URL to be crawled (None to start the target), None if the frontier is closed
+        """
+        with self._lock:
+            while not self._closed:
+                # Deferred urls first once their delay is over
+                if self._delayed and self._delayed[0][0] <= time.monotonic():
+                    _, _, target, url = heapq.heappop(self._delayed)
+                    return target, url
+
+                # Next target in turn, it goes back to the end of the round if it has more urls
+                if self._ready:
+                    target = self._ready.popleft()
+                    urls: Deque[str|None] = self._queues[target]
+                    url = urls.popleft()
+                    if urls:
+                        self._ready.append(target)
+                    return target, url
+
+                # Sleeping until a url is added or the next deferred url is ready
+                self._not_empty.wait(self._delayed[0][0] - time.monotonic() if self._delayed else None)
+            return None
+
+    def defer(self, target: int, url: str, delay: float) -> None:
+        """
+        Put back a url returned by get() to be handed out again after a delay
+
+        Args:
+            target (int): Index of the target
+            url (str): URL returned by get()
+            delay (float): Delay in seconds
+        """
+        with self._lock:
+            self._sequence += 1
+            heapq.heappush(self._delayed, (time.monotonic() + delay, self._sequence, target, url))
+            self._not_empty.notify()
+
+    def task_done(self, target: int) -> None:
+        """
+        Mark a url of a target returned by get() as crawled
+
+        Args:
+            target (int): Index of the target
+        """
+        with self._lock:
+            self._unfinished[target] -= 1
+            if self._unfinished[target] <= 0:
+                self._all_done.notify_all()
+
+    def join(self, target: int, timeout: float|None = None) -> bool:
+        """
+        Block until every queued url of a target has been marked done
+
+        Args:
+            target (int): Index of the target
+            timeout (float): Maximum time to wait in seconds (default = None, wait forever)
+
+        Returns:
+            bool: True if the urls of the target are drained, False if the timeout expired
+        """
+        with self._lock:
+            return self._all_done.wait_for(lambda: self._unfinished[target] <= 0, timeout)
+
+    def pending(self, target: int) -> int:
+        """
+        Number of pending urls of a target (queued and deferred)
+
+        Args:
+            target (int): Index of the target
+
+        Returns:
+            int: Number of pending urls
+        """
+        with self._lock:
+            return len(self._queues[target]) + sum(1 for entry in self._delayed if entry[2] == target)
+
+    def clear(self, target: int) -> int:
+        """
+        Drop the pending urls of a target, they are marked done without being crawled
+
+        Args:
+            target (int): Index of the target
+
+        Returns:
+            int: Number of urls dropped
+        """
+        with self._lock:
+            delayed: List[Tuple[float, int, int, str]] = [entry for entry in self._delayed if entry[2] != target]
+            dropped: int = len(self._queues[target]) + len(self._delayed) - len(delayed)
+            self._queues[target].clear()
+            if target in self._ready:
+                self._ready.remove(target)
+            heapq.heapify(delayed)
+            self._delayed = delayed
+            self._unfinished[target] -= dropped
+            if self._unfinished[target] <= 0:
+                self._all_done.notify_all()
+            return dropped
+
+    def close(self) -> None:
+        """
+        Close the frontier and wake up all the waiting workers
+        """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+
+
+class TargetFrontier:
+    """
+    Part of a BatchFrontier seen by the crawler of a target (FrontierQueue), the urls put, deferred and
+    marked done by the crawler go to the queue of the target. The workers of the batch take the urls
+    from the shared frontier.
+
+    Attributes:
+        batch (BatchFrontier): Frontier shared by the targets
+        target (int): Index of the target
+    """
+
+    def __init__(self, batch: BatchFrontier, target: int):
+        """
+        Constructor method
+
+        Args:
+            batch (BatchFrontier): Frontier shared by the targets
+            target (int): Index of the target
+        """
+        self.batch: BatchFrontier = batch
+        self.target: int = target
+
+    def __len__(self) -> int:
+        """
+        Number of pending urls of the target
+        """
+        return self.batch.pending(self.target)
+
+    def put(self, url: str) -> None:
+        """
+        Add a url of the target to the shared frontier
+        """
+        self.batch.put(self.target, url)
+
+    def defer(self, url: str, delay: float) -> None:
+        """
+        Put back a url of the target to be handed out again after a delay
+        """
+        self.batch.defer(self.target, url, delay)
+
+    def task_done(self, url: str|None = None) -> None:
+        """
+        Mark a url of the target as crawled
+        """
+        self.batch.task_done(self.target)
+
+    def clear(self) -> int:
+        """
+        Drop the pending urls of the target
+        """
+        return self.batch.clear(self.target)
+
+
+class ShardRouter:
+    """
+    Routing of the urls between the processes of a sharded crawl
+    Every process owns the urls whose fingerprint modulo the number of processes is its index, it
+    deduplicates and crawls them, and the urls found on its pages are sent in batches to the inbox
+    of their owner. The shared counters let the coordinator enforce the url limit across the
+    processes and detect the end of the crawl (no url in transit, queued or being crawled).
+
+    Attributes:
+        processes (int): Number of crawler processes
+        index (int): Index of the shard owned by the current process (-1 in the coordinator)
+        inboxes (List[multiprocessing.Queue]): Inbox of every shard, batches of urls (referrer, depth, urls, fetch) or None to stop the shard
+        results (multiprocessing.Queue): Urls and statistics sent by every shard at the end of the crawl
+        records (multiprocessing.Queue): Result records written by the coordinator (None without an output file)
+        pending (multiprocessing.Value): Number of urls in transit, queued or being crawled in any process
+        visited (multiprocessing.Value): Number of urls processed by all the processes (url limit)
+        fetched (multiprocessing.Value): Number of urls fetched from the web pages by all the processes
+        seed (str): Canonical starting url, the shard owning it resolves the hostname of the website
+        hostname (multiprocessing.Array): Final url of the starting url once it is fetched (redirects followed), empty until then
+        drained (multiprocessing.Event): Set when no url is pending anymore
+        stop (multiprocessing.Event): Set by the coordinator when the time limit is reached
+    """
+
+    def __init__(self, processes: int, records: bool = False, context: Any = None):
+        """
+        Constructor method
+
+        Args:
+            processes (int): Number of crawler processes
+            records (bool): Create the queue of the result records (default = False)
+            context (multiprocessing.context.BaseContext): Multiprocessing context (default = None, default context)
+        """
+        context = context or multiprocessing.get_context()
+        self.processes: int = processes
+        self.index: int = -1
+        self.inboxes: List[Any] = [context.Queue() for _ in range(processes)]
+        self.results: Any = context.Queue()
+        self.records: Any = context.Queue() if records else None
+        self.pending: Any = context.Value('q', 0)
+        self.visited: Any = context.Value('q', 0)
+        self.fetched: Any = context.Value('q', 0)
+        self.seed: str = ''
+        self.hostname: Any = context.Array('c', 8192)
+        self.drained: Any = context.Event()
+        self.stop: Any = context.Event()
+
+    def owner(self, url: str) -> int:
+        """
+        Index of the shard owning a url
+
+        Args:
+            url (str): Canonical URL
+
+        Returns:
+            int: Index of the shard
+        """
+        return url_fingerprint(url) % self.processes
+
+    def send(self, index: int, urls: List[str], referrer: str|None = None, depth: int = 0, fetch: bool = True) -> None:
+        """
+        Send a batch of urls to the inbox of a shard, they are pending until the shard rejects or crawls them
+
+        Args:
+            index (int): Index of the shard
+            urls (List[str]): Canonical URLs
+            referrer (str): Page on which the urls were found (default = None)
+            depth (int): Depth of the urls (default = 0)
+            fetch (bool): Crawl the urls, else only mark them as processed (redirect targets already fetched) (default = True)
+        """
+        with self.pending.get_lock():
+            self.pending.value += len(urls)
+        self.inboxes[index].put((referrer, depth, urls, fetch))
+
+    def route(self, urls: Iterable[str], referrer: str|None = None, depth: int = 0) -> List[str]:
+        """
+        Send the urls owned by the other shards to their inbox
+
+        Args:
+            urls (Iterable[str]): Canonical URLs found on a page
+            referrer (str): Page on which the urls were found (default = None)
+            depth (int): Depth of the urls (default = 0)
+
+        Returns:
+            List[str]: URLs owned by the current shard, they are pending like the urls sent
+        """
+        batches: Dict[int, List[str]] = {}
+        for url in urls:
+            batches.setdefault(self.owner(url), []).append(url)
+
+        own_urls: List[str] = batches.pop(self.index, [])
+        with self.pending.get_lock():
+            self.pending.value += len(own_urls)
+        for index, batch in batches.items():
+            self.send(index, batch, referrer, depth)
+        return own_urls
+
+    def resolve(self, url: str) -> None:
+        """
+        Share the final url of the starting url with the other shards, before the urls of its page are routed
+
+        Args:
+            url (str): Final url of the starting url
+        """
+        encoded: bytes = url.encode('utf-8', 'surrogatepass')
+        if len(encoded) < len(self.hostname):
+            self.hostname.value = encoded
+
+    def resolved_hostname(self) -> str:
+        """
+        Final url of the starting url shared by the shard which fetched it
+
+        Returns:
+            str: Final url of the starting url, empty if it is not fetched yet
+        """
+        return self.hostname.value.decode('utf-8', 'surrogatepass')
+
+    def done(self, count: int = 1) -> None:
+        """
+        Mark pending urls as rejected (already processed, limit reached) or crawled
+
+        Args:
+            count (int): Number of urls (default = 1)
+        """
+        if count <= 0:
+            return
+        with self.pending.get_lock():
+            self.pending.value -= count
+            if self.pending.value <= 0:
+                self.drained.set()
+
+    def reserve(self, limit: int) -> bool:
+        """
+        Count a new url against the url limit shared by the processes
+
+        Args:
+            limit (int): URL limit
+
+        Returns:
+            bool: True if the url limit is not reached
+        """
+        with self.visited.get_lock():
+            if self.visited.value >= limit:
+                return False
+            self.visited.value += 1
+            return True
+
+
+class HostState:
+    """
+    Politeness state of a host
+
+    Attributes:
+        tokens (float): Tokens left in the bucket
+        updated (float): Time at which the bucket was last refilled
+        limit (float): Current concurrency limit (AIMD)
+        slow_start (bool): Slow start flag, the limit grows by one per response until the first congestion
+        in_flight (int): Number of requests in flight
+        paused_until (float): Time until which no request is sent (Retry-After)
+        min_latency (float): Lowest latency observed
+        latency (float): Moving average of the latency
+        decreased_at (float): Time of the last multiplicative decrease
+    """
+
+    def __init__(self, burst: float, limit: float):
+        """
+        Constructor method
+        """
+        self.tokens: float = burst
+        self.updated: float = time.monotonic()
+        self.limit: float = limit
+        self.slow_start: bool = True
+        self.in_flight: int = 0
+        self.paused_until: float = 0.0
+        self.min_latency: float = float('inf')
+        self.latency: float = 0.0
+        self.decreased_at: float = 0.0
+
+
+class HostScheduler:
+    """
+    Per-host politeness scheduler
+    Every host has a token bucket (requests per second) and a concurrency limit adjusted with AIMD:
+    the limit grows while the responses are fast and successful, and is halved on 429/503 responses,
+    connection errors and latency spikes. Retry-After pauses the host and failed requests are retried
+    with exponential backoff and full jitter.
+
+    Attributes:
+        rate (float): Requests per second per host, 0 for no rate limit (default = 0)
+        burst (float): Size of the token bucket (default = rate)
+        max_concurrency (int): Maximum concurrency per host (default = 100)
+        initial_concurrency (int): Concurrency per host at the start (default = 4)
+        latency_threshold (float): A response slower than this many times the lowest latency is a congestion signal (default = 4)
+        latency_floor (float): Latencies below this many seconds are never a congestion signal (default = 1)
+        max_retries (int): Maximum number of retries per url (default = 3)
+        backoff_base (float): Base delay in seconds of the exponential backoff (default = 1)
+        backoff_cap (float): Maximum delay in seconds of the exponential backoff and Retry-After (default = 300)
+        retries (int): Number of retries scheduled
+        failures (int): Number of urls given up after the maximum number of retries
+        throttled (int): Number of 429/503 responses
+        __hosts (Dict[str, HostState]): State of every host
+        __rates (Dict[str, float]): Requests per second of the hosts with their own rate (robots.txt crawl-delay)
+        __lock (threading.Lock): Lock guarding the states
+    """
+
+    def __init__(self, rate: float = 0, max_concurrency: int = 100, max_retries: int = 3):
+        """
+        Constructor method
+
+        Args:
+            rate (float): Requests per second per host, 0 for no rate limit (default = 0)
+            max_concurrency (int): Maximum concurrency per host (default = 100)
+            max_retries (int): Maximum number of retries per url (default = 3)
+        """
+        self.rate: float = rate
+        self.burst: float = max(rate, 1.0)
+        self.max_concurrency: int = max(max_concurrency, 1)
+        self.initial_concurrency: int = min(4, self.max_concurrency)
+        self.latency_threshold: float = 4.0
+        self.latency_floor: float = 1.0
+        self.max_retries: int = max_retries
+        self.backoff_base: float = 1.0
+        self.backoff_cap: float = 300.0
+        self.retries: int = 0
+        self.failures: int = 0
+        self.throttled: int = 0
+        self.__hosts: Dict[str, HostState] = {}
+        self.__rates: Dict[str, float] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def set_rate(self, host: str, rate: float) -> None:
+        """
+        Set the rate of a host, the lower of this rate and the global rate is used
+
+        Args:
+            host (str): Host of the urls
+            rate (float): Requests per second
+        """
+        with self.__lock:
+            self.__rates[host] = min(rate, self.rate) if self.rate else rate
+
+    def acquire(self, host: str) -> float:
+        """
+        Reserve a request slot for a host
+
+        Args:
+            host (str): Host of the url
+
+        Returns:
+            float: 0 if the request can be sent now, else the delay in seconds after which to try again
+        """
+        with self.__lock:
+            state: HostState = self.__hosts.get(host) or self.__hosts.setdefault(host, HostState(self.burst, self.initial_concurrency))
+            now: float = time.monotonic()
+
+            # Host paused by a Retry-After header or a congestion
+            if state.paused_until > now:
+                return state.paused_until - now
+
+            # Concurrency limit reached, trying again after about one response time (the maximum may be lowered while crawling)
+            if state.in_flight >= min(int(state.limit), self.max_concurrency):
+                return max(state.latency / max(state.limit, 1), 0.01)
+
+            # Refilling the token bucket
+            rate: float = self.__rates.get(host, self.rate)
+            if rate:
+                state.tokens = min(max(rate, 1.0), state.tokens + (now - state.updated) * rate)
+                state.updated = now
+                if state.tokens < 1:
+                    return (1 - state.tokens) / rate
+                state.tokens -= 1
+
+            state.in_flight += 1
+            return 0.0
+
+    def release(self, host: str, latency: float|None, status: int|None, retry_after: float|None = None, adjust: bool = True) -> None:
+        """
+        Release the request slot of a host and adjust its concurrency limit
+
+        Args:
+            host (str): Host of the url
+            latency (float): Time in seconds until the response headers, None on a connection error
+            status (int): Status code of the response, None on a connection error
+            retry_after (float): Delay in seconds of the Retry-After header (default = None)
+            adjust (bool): Adjust the concurrency limit, False if no response was waited for (url dropped, task cancelled) (default = True)
+        """
+        with self.__lock:
+            state: HostState|None = self.__hosts.get(host)
+            if state is None:
+                return
+
+            now: float = time.monotonic()
+            state.in_flight = max(state.in_flight - 1, 0)
+
+            # The slot was not used for a request, the limit is left as it is
+            if not adjust:
+                return
+
+            if latency is not None:
+                state.min_latency = min(state.min_latency, latency)
+                state.latency = latency if not state.latency else 0.8 * state.latency + 0.2 * latency
+
+            # Congestion signals: throttling status, connection error, latency spike
+            throttled: bool = status in (429, 503)
+            congested: bool = throttled or status is None or (
+                latency is not None and latency > max(self.latency_floor, self.latency_threshold * state.min_latency)
+            )
+
+            if throttled:
+                self.throttled += 1
+            if retry_after:
+                state.paused_until = max(state.paused_until, now + min(retry_after, self.backoff_cap))
+
+            if congested:
+                # Multiplicative decrease, at most once per response time
+                if now - state.decreased_at > max(state.latency, 0.1):
+                    state.limit = max(state.limit / 2, 1.0)
+                    state.slow_start = False
+                    state.decreased_at = now
+            elif state.slow_start:
+                # Slow start, the limit doubles every response time
+                state.limit = min(state.limit + 1, self.max_concurrency)
+            else:
+                # Additive increase, the limit grows by one every response time
+                state.limit = min(state.limit + 1 / state.limit, self.max_concurrency)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Delay before a retry, exponential backoff with full jitter
+
+        Args:
+            attempt (int): Number of the retry (1 for the first retry)
+
+        Returns:
+            float: Delay in seconds
+        """
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def concurrency(self, host: str) -> float:
+        """
+        Current concurrency limit of a host
+
+        Args:
+            host (str): Host of the url
+
+        Returns:
+            float: Concurrency limit
+        """
+        with self.__lock:
+            state: HostState|None = self.__hosts.get(host)
+            return state.limit if state else self.initial_concurrency
+
+
+class CacheEntry(NamedTuple):
+    """
+    Response metadata of a url stored in the response cache
+
+    Attributes:
+        etag (str): ETag header of the last response
+        last_modified (str): Last-Modified header of the last response
+        content_hash (str): Hash of the body of the last response
+        outlinks (List[str]): Urls found on the page
+        fetched_at (float): Time at which the page was fetched
+    """
+    etag: str|None
+    last_modified: str|None
+    content_hash: str
+    outlinks: List[str]
+    fetched_at: float
+
+
+class ResponseCache:
+    """
+    Local cache of the response metadata for incremental recrawls (SQLite store in WAL mode)
+    The ETag and Last-Modified of every page are sent back as a conditional request on the next
+    run, on a 304 the cached outlinks are reused instead of downloading and parsing the page
+
+    Attributes:
+        path (str): Path of the SQLite store
+        max_age (float): Entries older than this many seconds are evicted (default = 7 days)
+        max_entries (int): Maximum number of entries, the oldest ones are evicted (default = 100000)
+        hits (int): Number of pages not modified since the last run (304)
+        misses (int): Number of pages downloaded
+        unchanged (int): Number of downloaded pages with the same content hash as the last run
+        evict_interval (int): Number of stored pages between two evictions while crawling (default = 10% of max_entries, at most 1000)
+        __stored (int): Number of pages stored since the last eviction
+        __connection (sqlite3.Connection): Connection to the store, used under the cache lock
+        __lock (threading.Lock): Lock guarding the connection and the counters
+    """
+
+    def __init__(self, path: str, max_age: float = 7 * 24 * 3600, max_entries: int = 100000):
+        """
+        Constructor method
+
+        Args:
+            path (str): Path of the SQLite store
+            max_age (float): Entries older than this many seconds are evicted (default = 7 days)
+            max_entries (int): Maximum number of entries, the oldest ones are evicted (default = 100000)
+        """
+        self.path: str = path
+        self.max_age: float = max_age
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self.unchanged: int = 0
+        self.evict_interval: int = min(max(max_entries // 10, 1), 1000)
+        self.__stored: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+
+        self.__connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            'fingerprint INTEGER PRIMARY KEY, url TEXT NOT NULL, etag TEXT, last_modified TEXT, '
+            'content_hash TEXT NOT NULL, outlinks TEXT NOT NULL, fetched_at REAL NOT NULL)'
+        )
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at)')
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Evict the entries older than max_age and the oldest entries above max_entries
+
+        Returns:
+            int: Number of entries evicted
+        """
+        with self.__lock:
+            return self.__evict()
+
+    def __evict(self) -> int:
+        """
+        Evict the entries older than max_age and the oldest entries above max_entries (lock held)
+
+        Returns:
+            int: Number of entries evicted
+        """
+        self.__stored = 0
+        with self.__connection:
+            evicted: int = self.__connection.execute('DELETE FROM pages WHERE fetched_at < ?', (time.time() - self.max_age,)).rowcount
+            evicted += self.__connection.execute(
+                'DELETE FROM pages WHERE fingerprint IN (SELECT fingerprint FROM pages ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            ).rowcount
+        return evicted
+
+    def get(self, url: str) -> CacheEntry|None:
+        """
+        Get the cached response metadata of a url
+
+        Args:
+            url (str): Canonical url
+
+        Returns:
+            CacheEntry: Cached response metadata or None if the url is not cached
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                'SELECT etag, last_modified, content_hash, outlinks, fetched_at FROM pages WHERE fingerprint = ?',
+                (to_signed(url_fingerprint(url)),)
+            ).fetchone()
+
+        if row is None or row[4] < time.time() - self.max_age:
+            return None
+        return CacheEntry(row[0], row[1], row[2], row[3].split('\n') if row[3] else [], row[4])
+
+    def conditional_headers(self, entry: CacheEntry|None) -> Dict[str, str]:
+        """
+        Get the headers of a conditional request for a cached url
+
+        Args:
+            entry (CacheEntry): Cached response metadata
+
+        Returns:
+            Dict[str, str]: If-None-Match and If-Modified-Since headers
+        """
+        headers: Dict[str, str] = {}
+        if entry:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, url: str, etag: str|None, last_modified: str|None, content_hash: str, outlinks: Iterable[str], previous: CacheEntry|None = None) -> None:
+        """
+        Store the response metadata of a downloaded page
+
+        Args:
+            url (str): Canonical url
+            etag (str): ETag header of the response
+            last_modified (str): Last-Modified header of the response
+            content_hash (str): Hash of the body
+            outlinks (Iterable[str]): Urls found on the page
+            previous (CacheEntry): Cached response metadata of the last run (default = None)
+        """
+        with self.__lock:
+            self.misses += 1
+            if previous and previous.content_hash == content_hash:
+                self.unchanged += 1
+
+            try:
+                with self.__connection:
+                    self.__connection.execute(
+                        'INSERT OR REPLACE INTO pages (fingerprint, url, etag, last_modified, content_hash, outlinks, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (to_signed(url_fingerprint(url)), url, etag, last_modified, content_hash, '\n'.join(outlinks), time.time())
+                    )
+
+                # Evicting periodically so that a long crawl stays within max_entries
+                self.__stored += 1
+                if self.__stored >= self.evict_interval:
+                    self.__evict()
+
+            except sqlite3.Error as error:
+                error_console.print('response cache store function error')
+                error_console.print(error)
+
+    def refresh(self, url: str) -> None:
+        """
+        Record a page not modified since the last run (304), its entry is kept fresh
+
+        Args:
+            url (str): Canonical url
+        """
+        with self.__lock:
+            self.hits += 1
+
+            try:
+                with self.__connection:
+                    self.__connection.execute('UPDATE pages SET fetched_at = ? WHERE fingerprint = ?', (time.time(), to_signed(url_fingerprint(url))))
+
+            except sqlite3.Error as error:
+                error_console.print('response cache refresh function error')
+                error_console.print(error)
+
+    def close(self) -> None:
+        """
+        Close the connection to the store
+        """
+        with self.__lock:
+            self.__connection.close()
+
+
+class ResultWriter:
+    """
+    Buffered writer of the crawl results as JSON Lines, one record per crawled url
+    The records are written by a background thread so that the workers never wait for the disk, and
+    the file is flushed every second so that it can be consumed while the crawl is running.
+    A path ending with .gz is gzip compressed.
+
+    Attributes:
+        path (str): Path of the output file (None when the records are written by another process)
+        records (queue.Queue|multiprocessing.Queue): Records waiting to be written, None stops the writer
+        flush_interval (float): Interval in seconds at which the file is flushed (default = 1)
+        written (int): Number of records written
+        error (Exception): Error which stopped the writer thread (eg. disk full), raised by close() (None while writing)
+        put_timeout (float): Interval in seconds at which a blocked put checks that the writer thread is still alive (default = 0.5)
+        __thread (threading.Thread): Writer thread (None without a path)
+    """
+
+    def __init__(self, path: str|None, records: Any = None, max_queued: int = 10000):
+        """
+        Constructor method
+
+        Args:
+            path (str): Path of the output file, None to only queue the records for the process owning the file
+            records (queue.Queue|multiprocessing.Queue): Queue of the records (default = None, new bounded queue)
+            max_queued (int): Maximum number of records waiting to be written, the workers block above it (default = 10000)
+        """
+        self.path: str|None = path
+        self.records: Any = records if records is not None else queue.Queue(max_queued)
+        self.flush_interval: float = 1.0
+        self.written: int = 0
+        self.error: Exception|None = None
+        self.put_timeout: float = 0.5
+        self.__thread: threading.Thread|None = None
+
+        if path:
+            self.__thread = threading.Thread(target=self.run, name='crawlytics-writer', daemon=True)
+            self.__thread.start()
+
+            # Writing the queued records if the process exits without closing the writer (Ctrl-C, SIGTERM)
+            atexit.register(self.close)
+
+    def open(self) -> IO[str]:
+        """
+        Open the output file, gzip compressed if the path ends with .gz
+
+        Returns:
+            IO[str]: Output file
+        """
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, 'wt', encoding='utf-8')
+        return open(self.path, 'w', encoding='utf-8', buffering=1024 * 1024)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Queue a record to be written
+
+        Args:
+            record (Dict[str, Any]): Result of a crawled url
+        """
+        self.put(record)
+
+    def put(self, record: Dict[str, Any]|None) -> bool:
+        """
+        Queue a record, or None to stop the writer, without blocking forever if the writer thread failed
+
+        Args:
+            record (Dict[str, Any]): Result of a crawled url, None to stop the writer
+
+        Returns:
+            bool: True if the record was queued, False if it was dropped because the writer thread failed
+        """
+        while True:
+            # Dropping the record if the writer thread failed, nothing empties the queue anymore
+            if self.__thread and not self.__thread.is_alive():
+                return False
+            try:
+                self.records.put(record, timeout=self.put_timeout)
+                return True
+            except queue.Full:
+                continue
+
+    def run(self) -> None:
+        """
+        Writer loop, writes the queued records until the writer is closed
+        """
+        try:
+            with self.open() as output:
+                flushed: float = time.monotonic()
+
+                while True:
+                    # Flushing the file when no record came for a while
+                    try:
+                        record: Dict[str, Any]|None = self.records.get(timeout=self.flush_interval)
+                    except queue.Empty:
+                        output.flush()
+                        flushed = time.monotonic()
+                        continue
+
+                    if record is None:
+                        break
+
+                    output.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    self.written += 1
+
+                    # Flushing the file every second so that the records can be consumed during the crawl
+                    if time.monotonic() - flushed > self.flush_interval:
+                        output.flush()
+                        flushed = time.monotonic()
+
+        except Exception as error:
+            self.error = error
+            error_console.print('result writer function error')
+            error_console.print(error)
+
+    def close(self) -> None:
+        """
+        Write the remaining records and close the output file
+
+        Raises:
+            Exception: Error which stopped the writer thread, the records after it were not written
+        """
+        if self.__thread:
+            atexit.unregister(self.close)
+            self.put(None)
+            self.__thread.join()
+        if self.error:
+            raise self.error
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets (Prometheus style, the counts are not cumulative here)
+
+    Attributes:
+        buckets (Tuple[float, ...]): Upper bounds of the buckets in seconds, the last bucket is unbounded
+        counts (List[int]): Number of observations in every bucket
+        count (int): Number of observations
+        total (float): Sum of the observations in seconds
+    """
+    buckets: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self):
+        """
+        Constructor method
+        """
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Add an observation
+
+        Args:
+            value (float): Duration in seconds
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, fraction: float) -> float|None:
+        """
+        Estimate a quantile from the buckets (upper bound of the bucket holding it)
+
+        Args:
+            fraction (float): Quantile between 0 and 1 (eg. 0.99)
+
+        Returns:
+            float: Duration in seconds, None without observations
+        """
+        if not self.count:
+            return None
+
+        rank: float = fraction * self.count
+        cumulative: int = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class Metrics:
+    """
+    Metrics of a crawl: responses by status code, bytes downloaded, latency histograms of the fetch,
+    parse and filter stages, dedup hit rate and worker utilization
+    A snapshot can be exported as JSON or as a Prometheus text file (node exporter textfile collector).
+
+    Attributes:
+        started (float): Time at which the metrics were created
+        statuses (Dict[str, int]): Number of responses by status code (error for connection errors)
+        bytes (int): Number of body bytes downloaded
+        stages (Dict[str, Histogram]): Latency histogram of every stage (fetch, parse, filter)
+        seen_checks (int): Number of urls checked against the seen-set
+        seen_duplicates (int): Number of urls already in the seen-set
+        workers (int): Number of workers (threads or in-flight requests of the asyncio engine)
+        busy_workers (int): Number of workers crawling a url
+        busy_time (float): Time in seconds spent by the workers crawling urls
+        __lock (threading.Lock): Lock guarding the metrics
+    """
+
+    def __init__(self):
+        """
+        Constructor method
+        """
+        self.started: float = time.monotonic()
+        self.statuses: Dict[str, int] = {}
+        self.bytes: int = 0
+        self.stages: Dict[str, Histogram] = {'fetch': Histogram(), 'parse': Histogram(), 'filter': Histogram()}
+        self.seen_checks: int = 0
+        self.seen_duplicates: int = 0
+        self.workers: int = 0
+        self.busy_workers: int = 0
+        self.busy_time: float = 0.0
+        self.__lock: threading.Lock = threading.Lock()
+
+    def record_response(self, status: int|None, size: int, fetch_time: float, parse_time: float, filter_time: float) -> None:
+        """
+        Record a response and the time spent in every stage
+
+        Args:
+            status (int): Status code of the response, None on a connection error
+            size (int): Number of body bytes downloaded
+            fetch_time (float): Time in seconds spent waiting for the network
+            parse_time (float): Time in seconds spent in the link extractor
+            filter_time (float): Time in seconds spent resolving and filtering the links
+        """
+        key: str = str(status) if status is not None else 'error'
+        with self.__lock:
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            self.bytes += size
+            self.stages['fetch'].observe(fetch_time)
+
+            # Pages which were not parsed (errors, non-HTML) are only counted in the fetch stage
+            if parse_time or filter_time:
+                self.stages['parse'].observe(parse_time)
+                self.stages['filter'].observe(filter_time)
+
+    def record_seen(self, duplicate: bool) -> None:
+        """
+        Record a check of the seen-set
+
+        Args:
+            duplicate (bool): True if the url was already seen
+        """
+        with self.__lock:
+            self.seen_checks += 1
+            self.seen_duplicates += duplicate
+
+    def begin_work(self) -> float:
+        """
+        Record a worker starting to crawl a url
+
+        Returns:
+            float: Start time to be passed to end_work()
+        """
+        with self.__lock:
+            self.busy_workers += 1
+        return time.perf_counter()
+
+    def end_work(self, started: float) -> None:
+        """
+        Record a worker done with a url
+
+        Args:
+            started (float): Start time returned by begin_work()
+        """
+        with self.__lock:
+            self.busy_workers -= 1
+            self.busy_time += time.perf_counter() - started
+
+    def snapshot(self, visited: int, frontier: int) -> Dict[str, Any]:
+        """
+        Get a snapshot of the metrics
+
+        Args:
+            visited (int): Number of visited urls
+            frontier (int): Number of urls waiting in the frontier
+
+        Returns:
+            Dict[str, Any]: Metrics by name
+        """
+        with self.__lock:
+            elapsed: float = time.monotonic() - self.started
+            return {
+                'time': time.time(),
+                'elapsed': round(elapsed, 3),
+                'visited': visited,
+                'frontier': frontier,
+                'requests': dict(self.statuses),
+                'bytes': self.bytes,
+                'stages': {
+                    name: {
+                        'count': histogram.count,
+                        'seconds': round(histogram.total, 6),
+                        'p50': histogram.quantile(0.5),
+                        'p90': histogram.quantile(0.9),
+                        'p99': histogram.quantile(0.99)
+                    } for name, histogram in self.stages.items()
+                },
+                'dedup': {
+                    'checks': self.seen_checks,
+                    'duplicates': self.seen_duplicates,
+                    'hit_rate': round(self.seen_duplicates / self.seen_checks, 4) if self.seen_checks else 0.0
+                },
+                'workers': {
+                    'total': self.workers,
+                    'busy': self.busy_workers,
+                    'busy_seconds': round(self.busy_time, 3),
+                    'utilization': round(self.busy_time / (self.workers * elapsed), 4) if self.workers and elapsed else 0.0
+                }
+            }
+
+    def prometheus(self, visited: int, frontier: int, labels: Dict[str, str]|None = None) -> str:
+        """
+        Format the metrics in the Prometheus text exposition format
+
+        Args:
+            visited (int): Number of visited urls
+            frontier (int): Number of urls waiting in the frontier
+            labels (Dict[str, str]): Labels added to every sample (default = None)
+
+        Returns:
+            str: Prometheus text
+        """
+        base: str = ','.join(f'{name}="{value}"' for name, value in (labels or {}).items())
+
+        def sample(name: str, value: float, extra: str = '') -> str:
+            label: str = ','.join(part for part in (base, extra) if part)
+            return f'{name}{{{label}}} {value}' if label else f'{name} {value}'
+
+        lines: List[str] = []
+        with self.__lock:
+            lines += ['# HELP crawlytics_requests_total Responses by status code', '# TYPE crawlytics_requests_total counter']
+            lines += [sample('crawlytics_requests_total', count, f'status="{status}"') for status, count in sorted(self.statuses.items())]
+            lines += ['# HELP crawlytics_bytes_total Body bytes downloaded', '# TYPE crawlytics_bytes_total counter']
+            lines += [sample('crawlytics_bytes_total', self.bytes)]
+
+            lines += ['# HELP crawlytics_stage_seconds Time spent per page in the fetch, parse and filter stages', '# TYPE crawlytics_stage_seconds histogram']
+            for stage, histogram in self.stages.items():
+                cumulative: int = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    lines.append(sample('crawlytics_stage_seconds_bucket', cumulative, f'stage="{stage}",le="{"+Inf" if bound == float("inf") else bound}"'))
+                lines.append(sample('crawlytics_stage_seconds_sum', round(histogram.total, 6), f'stage="{stage}"'))
+                lines.append(sample('crawlytics_stage_seconds_count', histogram.count, f'stage="{stage}"'))
+
+            lines += ['# HELP crawlytics_seen_checks_total URLs checked against the seen-set', '# TYPE crawlytics_seen_checks_total counter']
+            lines += [sample('crawlytics_seen_checks_total', self.seen_checks)]
+            lines += ['# HELP crawlytics_seen_duplicates_total URLs already in the seen-set', '# TYPE crawlytics_seen_duplicates_total counter']
+            lines += [sample('crawlytics_seen_duplicates_total', self.seen_duplicates)]
+            lines += ['# HELP crawlytics_busy_seconds_total Time spent by the workers crawling URLs', '# TYPE crawlytics_busy_seconds_total counter']
+            lines += [sample('crawlytics_busy_seconds_total', round(self.busy_time, 3))]
+
+            for name, help_text, value in (
+                ('crawlytics_visited_urls', 'URLs visited', visited),
+                ('crawlytics_frontier_urls', 'URLs waiting in the frontier', frontier),
+                ('crawlytics_workers', 'Workers', self.workers),
+                ('crawlytics_busy_workers', 'Workers crawling a URL', self.busy_workers)
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', sample(name, value)]
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str, visited: int, frontier: int, labels: Dict[str, str]|None = None) -> None:
+        """
+        Write a snapshot of the metrics, in the Prometheus text format if the path ends with .prom, else as JSON
+        The file is replaced atomically so that a collector never reads a partial snapshot
+
+        Args:
+            path (str): Path of the metrics file
+            visited (int): Number of visited urls
+            frontier (int): Number of urls waiting in the frontier
+            labels (Dict[str, str]): Labels of the snapshot (default = None)
+        """
+        if path.endswith('.prom'):
+            content: str = self.prometheus(visited, frontier, labels)
+        else:
+            content = json.dumps(dict(self.snapshot(visited, frontier), **(labels or {})), indent=2) + '\n'
+
+        with open(path + '.tmp', 'w', encoding='utf-8') as output:
+            output.write(content)
+        os.replace(path + '.tmp', path)
+
+
+class FingerprintSet:
+    """
+    Exact seen-set of 64-bit url fingerprints
+    Open addressing hash table (linear probing) backed by an array of unsigned 64-bit integers,
+    it is kept at most half full so a url costs between 16 and 32 bytes whatever its length
+
+    Attributes:
+        __slots (array): Hash table, 0 marks an empty slot
+        __mask (int): Size of the hash table minus one (the size is a power of two)
+        __count (int): Number of fingerprints in the set
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Constructor method
+
+        Args:
+            capacity (int): Number of fingerprints the set holds before growing (default = 1024)
+        """
+        size: int = 1 << max(2 * capacity - 1, 1).bit_length()
+        self.__slots: array = array('Q', [0]) * size
+        self.__mask: int = size - 1
+        self.__count: int = 0
+
+    def __len__(self) -> int:
+        """
+        Number of fingerprints in the set
+        """
+        return self.__count
+
+    def __contains__(self, fingerprint: int) -> bool:
+        """
+        Check if a fingerprint is in the set
+        """
+        # 0 marks an empty slot
+        fingerprint = fingerprint or 1
+        index: int = fingerprint & self.__mask
+        while True:
+            slot: int = self.__slots[index]
+            if slot == fingerprint:
+                return True
+            if slot == 0:
+                return False
+            index = (index + 1) & self.__mask
+
+    def add(self, fingerprint: int) -> bool:
+        """
+        Add a fingerprint to the set
+
+        Args:
+            fingerprint (int): 64-bit url fingerprint
+
+        Returns:
+            bool: True if the fingerprint was not in the set
+        """
+        # 0 marks an empty slot
+        fingerprint = fingerprint or 1
+        index: int = fingerprint & self.__mask
+        while True:
+            slot: int = self.__slots[index]
+            if slot == fingerprint:
+                return False
+            if slot == 0:
+                break
+            index = (index + 1) & self.__mask
+
+        self.__slots[index] = fingerprint
+        self.__count += 1
+
+        # Growing the hash table when it is half full
+        if self.__count * 2 > self.__mask:
+            self.__resize()
+        return True
+
+    def __resize(self) -> None:
+        """
+        Double the size of the hash table and insert the fingerprints again
+        """
+        slots: array = self.__slots
+        size: int = 2 * len(slots)
+        self.__slots = array('Q', [0]) * size
+        self.__mask = size - 1
+
+        for fingerprint in slots:
+            if fingerprint:
+                index: int = fingerprint & self.__mask
+                while self.__slots[index]:
+                    index = (index + 1) & self.__mask
+                self.__slots[index] = fingerprint
+
+    def memory_usage(self) -> int:
+        """
+        Memory used by the hash table
+
+        Returns:
+            int: Size of the hash table in bytes
+        """
+        return self.__slots.itemsize * len(self.__slots)
+
+
+class BloomFilter:
+    """
+    Approximate seen-set of 64-bit url fingerprints
+    A url may be reported as seen when it is not (false positive at the configured error rate),
+    it is then not crawled, in exchange the memory per url is a few bits
+
+    Attributes:
+        __bits (bytearray): Bit array
+        __size (int): Number of bits
+        __hashes (int): Number of bits set for every fingerprint
+        __count (int): Number of fingerprints added
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Constructor method
+
+        Args:
+            capacity (int): Expected number of fingerprints
+            error_rate (float): False positive rate at the expected number of fingerprints (default = 0.001)
+        """
+        self.__size: int = max(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 64)
+        self.__hashes: int = max(round(self.__size / max(capacity, 1) * math.log(2)), 1)
+        self.__bits: bytearray = bytearray((self.__size + 7) // 8)
+        self.__count: int = 0
+
+    def __len__(self) -> int:
+        """
+        Number of fingerprints added
+        """
+        return self.__count
+
+    def __positions(self, fingerprint: int) -> Iterator[int]:
+        """
+        Bit positions of a fingerprint (double hashing on the two 32-bit halves)
+        """
+        low: int = fingerprint & 0xFFFFFFFF
+        high: int = (fingerprint >> 32) | 1
+        for index in range(self.__hashes):
+            yield (low + index * high) % self.__size
+
+    def __contains__(self, fingerprint: int) -> bool:
+        """
+        Check if a fingerprint may be in the set
+        """
+        return all(self.__bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(fingerprint))
+
+    def add(self, fingerprint: int) -> bool:
+        """
+        Add a fingerprint to the set
+
+        Args:
+            fingerprint (int): 64-bit url fingerprint
+
+        Returns:
+            bool: True if the fingerprint was not in the set
+        """
+        new: bool = False
+        for position in self.__positions(fingerprint):
+            mask: int = 1 << (position & 7)
+            if not self.__bits[position >> 3] & mask:
+                self.__bits[position >> 3] |= mask
+                new = True
+
+        if new:
+            self.__count += 1
+        return new
+
+    def memory_usage(self) -> int:
+        """
+        Memory used by the bit array
+
+        Returns:
+            int: Size of the bit array in bytes
+        """
+        return len(self.__bits)
+
+
+class LinkGraph:
+    """
+    Link graph of the crawled pages, one edge per in scope link from a page to a url
+    Every url is a node with an integer id, the edges are two parallel arrays of 32-bit node ids
+    (8 bytes per edge) and the in-degree of every node is kept up to date in a third array.
+    The adjacency lists (CSR) and the depths are built on demand for the queries.
+    The node 0 is the root of the depths, the starting url when it is added first.
+
+    Attributes:
+        urls (List[str]): Url of every node, indexed by node id
+        __ids (Dict[str, int]): Node id of every url
+        __sources (array): Source node of every edge
+        __targets (array): Target node of every edge
+        __in_degree (array): Number of edges to every node
+        __depths (array): Depth of every node from the root, -1 if unreachable (None until queried)
+        __lock (threading.Lock): Lock guarding the graph, the workers add edges concurrently
+    """
+    # Header of the binary format: magic, version, number of nodes, number of edges, size of the url block
+    HEADER: struct.Struct = struct.Struct('<4sHIQQ')
+    MAGIC: bytes = b'CRLG'
+    VERSION: int = 1
+
+    def __init__(self):
+        """
+        Constructor method
+        """
+        self.urls: List[str] = []
+        self.__ids: Dict[str, int] = {}
+        self.__sources: array = array('I')
+        self.__targets: array = array('I')
+        self.__in_degree: array = array('I')
+        self.__depths: array|None = None
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        Number of nodes
+        """
+        return len(self.urls)
+
+    @property
+    def edge_count(self) -> int:
+        """
+        Number of edges
+        """
+        return len(self.__sources)
+
+    def node(self, url: str) -> int:
+        """
+        Get the node id of a url, the node is added if it is new
+
+        Args:
+            url (str): Canonical URL
+
+        Returns:
+            int: Node id
+        """
+        node_id: int|None = self.__ids.get(url)
+        if node_id is None:
+            node_id = len(self.urls)
+            self.__ids[url] = node_id
+            self.urls.append(url)
+            self.__in_degree.append(0)
+        return node_id
+
+    def add_links(self, source: str, targets: Iterable[str]) -> None:
+        """
+        Add the links found on a page
+
+        Args:
+            source (str): Canonical url of the page
+            targets (Iterable[str]): Canonical urls linked from the page
+        """
+        with self.__lock:
+            source_id: int = self.node(source)
+            for target in targets:
+                target_id: int = self.node(target)
+                self.__sources.append(source_id)
+                self.__targets.append(target_id)
+                self.__in_degree[target_id] += 1
+            self.__depths = None
+
+    def merge(self, other: 'LinkGraph') -> None:
+        """
+        Add the nodes and the edges of another graph (graph of a shard)
+
+        Args:
+            other (LinkGraph): Graph to be merged
+        """
+        with self.__lock:
+            ids: array = array('I', (self.node(url) for url in other.urls))
+            for source_id, target_id in zip(other.__sources, other.__targets):
+                self.__sources.append(ids[source_id])
+                self.__targets.append(ids[target_id])
+                self.__in_degree[ids[target_id]] += 1
+            self.__depths = None
+
+    def adjacency(self) -> Tuple[array, array]:
+        """
+        Build the adjacency lists of the graph (compressed sparse rows)
+
+        Returns:
+            Tuple[array, array]: Offset of the first edge of every node (one more offset at the end) and target of every edge grouped by source
+        """
+        offsets: array = array('Q', [0]) * (len(self.urls) + 1)
+        for source_id in self.__sources:
+            offsets[source_id + 1] += 1
+        for node_id in range(len(self.urls)):
+            offsets[node_id + 1] += offsets[node_id]
+
+        # Filling the targets of every source from its first offset
+        positions: array = array('Q', offsets)
+        targets: array = array('I', [0]) * len(self.__targets)
+        for source_id, target_id in zip(self.__sources, self.__targets):
+            targets[positions[source_id]] = target_id
+            positions[source_id] += 1
+        return offsets, targets
+
+    def depths(self) -> array:
+        """
+        Get the depth of every node, the number of links on the shortest path from the root (breadth-first search)
+
+        Returns:
+            array: Depth of every node indexed by node id, -1 if the node is not reachable from the root
+        """
+        with self.__lock:
+            if self.__depths is None or len(self.__depths) != len(self.urls):
+                depths: array = array('i', [-1]) * len(self.urls)
+                if self.urls:
+                    offsets, targets = self.adjacency()
+                    depths[0] = 0
+                    pending: Deque[int] = deque([0])
+                    while pending:
+                        node_id: int = pending.popleft()
+                        for index in range(offsets[node_id], offsets[node_id + 1]):
+                            target_id: int = targets[index]
+                            if depths[target_id] < 0:
+                                depths[target_id] = depths[node_id] + 1
+                                pending.append(target_id)
+                self.__depths = depths
+            return self.__depths
+
+    def depth(self, url: str) -> int|None:
+        """
+        Get the depth of a url
+
+        Args:
+            url (str): Canonical URL
+
+        Returns:
+            int: Number of links on the shortest path from the root, None if the url is unknown or not reachable
+        """
+        node_id: int|None = self.__ids.get(url)
+        if node_id is None:
+            return None
+        depth: int = self.depths()[node_id]
+        return depth if depth >= 0 else None
+
+    def in_degree(self, url: str) -> int:
+        """
+        Get the number of inbound links of a url
+
+        Args:
+            url (str): Canonical URL
+
+        Returns:
+            int: Number of pages linking to the url (0 if the url is unknown)
+        """
+        node_id: int|None = self.__ids.get(url)
+        return self.__in_degree[node_id] if node_id is not None else 0
+
+    def orphans(self) -> List[str]:
+        """
+        Get the urls which no crawled page links to (eg. pages only listed in a sitemap), the root excluded
+
+        Returns:
+            List[str]: Orphan urls
+        """
+        return [url for node_id, url in enumerate(self.urls) if node_id and not self.__in_degree[node_id]]
+
+    def save(self, path: str) -> None:
+        """
+        Export the graph, GraphML if the path ends with .graphml, CSV if it ends with .csv, else the compact binary format
+        The file is written atomically
+
+        Args:
+            path (str): Path of the graph file
+        """
+        # The depths of the GraphML nodes are computed first, they take the lock too
+        depths: array|None = self.depths() if path.endswith('.graphml') else None
+
+        with self.__lock:
+            if depths is not None:
+                self.save_graphml(path + '.tmp', depths)
+            elif path.endswith('.csv'):
+                self.save_csv(path + '.tmp')
+            else:
+                self.save_binary(path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def save_binary(self, path: str) -> None:
+        """
+        Write the graph in the compact binary format: header, urls separated by newlines and the
+        source and target arrays of the edges as little-endian 32-bit node ids
+
+        Args:
+            path (str): Path of the graph file
+        """
+        urls: bytes = '\n'.join(self.urls).encode('utf-8')
+        sources: array = array('I', self.__sources)
+        targets: array = array('I', self.__targets)
+        if sys.byteorder == 'big':
+            sources.byteswap()
+            targets.byteswap()
+
+        with open(path, 'wb') as output:
+            output.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(self.urls), len(sources), len(urls)))
+            output.write(urls)
+            sources.tofile(output)
+            targets.tofile(output)
+
+    def save_csv(self, path: str) -> None:
+        """
+        Write the edges of the graph as CSV, one source,target row of urls per edge
+
+        Args:
+            path (str): Path of the graph file
+        """
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow(['source', 'target'])
+            writer.writerows((self.urls[source_id], self.urls[target_id]) for source_id, target_id in zip(self.__sources, self.__targets))
+
+    def save_graphml(self, path: str, depths: array) -> None:
+        """
+        Write the graph as GraphML, the url, depth and in-degree of every node are node attributes
+
+        Args:
+            path (str): Path of the graph file
+            depths (array): Depth of every node
+        """
+        with open(path, 'w', encoding='utf-8', buffering=1024 * 1024) as output:
+            output.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                         '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                         '<key id="url" for="node" attr.name="url" attr.type="string"/>\n'
+                         '<key id="depth" for="node" attr.name="depth" attr.type="int"/>\n'
+                         '<key id="in_degree" for="node" attr.name="in_degree" attr.type="int"/>\n'
+                         '<graph id="crawl" edgedefault="directed">\n')
+            for node_id, url in enumerate(self.urls):
+                output.write(f'<node id="n{node_id}"><data key="url">{escape(url)}</data>'
+                             f'<data key="depth">{depths[node_id]}</data><data key="in_degree">{self.__in_degree[node_id]}</data></node>\n')
+            for source_id, target_id in zip(self.__sources, self.__targets):
+                output.write(f'<edge source="n{source_id}" target="n{target_id}"/>\n')
+            output.write('</graph>\n</graphml>\n')
+
+    @classmethod
+    def load(cls, path: str) -> 'LinkGraph':
+        """
+        Read a graph written in the compact binary format
+
+        Args:
+            path (str): Path of the graph file
+
+        Returns:
+            LinkGraph: Graph
+        """
+        graph: LinkGraph = cls()
+        with open(path, 'rb') as graph_file:
+            magic, version, nodes, edges, size = cls.HEADER.unpack(graph_file.read(cls.HEADER.size))
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(f'{path} is not a link graph file')
+
+            for url in graph_file.read(size).decode('utf-8').split('\n') if nodes else []:
+                graph.node(url)
+            graph.__sources.fromfile(graph_file, edges)
+            graph.__targets.fromfile(graph_file, edges)
+
+        if sys.byteorder == 'big':
+            graph.__sources.byteswap()
+            graph.__targets.byteswap()
+        for target_id in graph.__targets:
+            graph.__in_degree[target_id] += 1
+        return graph
+
+
+class TrapDetector:
+    """
+    URL-pattern crawler trap detection (calendars, session ids in the query, endlessly growing paths)
+    The urls are grouped by path template (the segments with a digit or long tokens are wildcards) and
+    by path and set of query parameter names, every group may only produce a limited number of urls.
+    The paths with too many segments or with a segment repeated too many times are dropped too.
+    The groups are counted by hash, the detector is not thread-safe (called under the crawler lock).
+
+    Attributes:
+        max_template_urls (int): Maximum number of urls per path template, 0 for no limit (default = 1000)
+        max_query_urls (int): Maximum number of urls per path and set of query parameter names, 0 for no limit (default = 100)
+        max_repeated_segments (int): Maximum number of occurrences of a path segment, 0 for no limit (default = 2)
+        max_path_depth (int): Maximum number of path segments, 0 for no limit (default = 16)
+        pruned (Dict[str, int]): Number of urls dropped for every reason (template, query, repeat, depth)
+        __templates (Dict[int, int]): Number of urls of every path template
+        __queries (Dict[int, int]): Number of urls of every path and set of query parameter names
+    """
+    # Variable path segments (eg. 2024, 05-12, a3f9c1d2, session tokens)
+    VARIABLE_SEGMENT: re.Pattern = re.compile(r'\d|^[\w-]{24,}$')
+
+    def __init__(self):
+        """
+        Constructor method
+        """
+        self.max_template_urls: int = 1000
+        self.max_query_urls: int = 100
+        self.max_repeated_segments: int = 2
+        self.max_path_depth: int = 16
+        self.pruned: Dict[str, int] = {'template': 0, 'query': 0, 'repeat': 0, 'depth': 0}
+        self.__templates: Dict[int, int] = {}
+        self.__queries: Dict[int, int] = {}
+
+    def check(self, url: str) -> str|None:
+        """
+        Check if a new url is a crawler trap, the url is counted in its groups if it is not
+
+        Args:
+            url (str): Canonical URL
+
+        Returns:
+            str: template, query, repeat or depth if the url is dropped, None if it is kept
+        """
+        parts = urlsplit(url)
+        segments: List[str] = [segment for segment in parts.path.split('/') if segment]
+        reason: str|None = None
+
+        # Endlessly growing paths (eg. /a/b/a/b/a/b or relative links resolved again and again)
+        if self.max_path_depth and len(segments) > self.max_path_depth:
+            reason = 'depth'
+        elif self.max_repeated_segments and len(segments) > self.max_repeated_segments and \
+                max(Counter(segments).values()) > self.max_repeated_segments:
+            reason = 'repeat'
+
+        # Urls of the same path template and of the same path and query parameter names
+        template: int = hash((parts.netloc, tuple('*' if self.VARIABLE_SEGMENT.search(segment) else segment for segment in segments)))
+        query: int|None = None
+        if parts.query:
+            names: Tuple[str, ...] = tuple(sorted({parameter.split('=', 1)[0] for parameter in parts.query.split('&') if parameter}))
+            query = hash((parts.netloc, parts.path, names))
+
+        if reason is None:
+            if self.max_template_urls and self.__templates.get(template, 0) >= self.max_template_urls:
+                reason = 'template'
+            elif query is not None and self.max_query_urls and self.__queries.get(query, 0) >= self.max_query_urls:
+                reason = 'query'
+
+        if reason:
+            self.pruned[reason] += 1
+            return reason
+
+        self.__templates[template] = self.__templates.get(template, 0) + 1
+        if query is not None:
+            self.__queries[query] = self.__queries.get(query, 0) + 1
+        return None
+
+
+class SimHash:
+    """
+    64-bit SimHash of the words of a page (Charikar), near-duplicate pages have fingerprints a few bits apart
+    Every distinct word is hashed once and weighted by its count. The 64 bit columns of the hashes are
+    summed at once in the 32-bit fields of a big integer instead of bit by bit.
+
+    Attributes:
+        __words (Counter): Count of every word of the page (lowercase)
+    """
+    WORD: re.Pattern = re.compile(r'\w+')
+    # Every byte value spread into 8 fields of 32 bits, bit i of the byte is the lowest bit of field i
+    SPREAD: Tuple[int, ...] = tuple(sum(((byte >> bit) & 1) << (32 * bit) for bit in range(8)) for byte in range(256))
+
+    def __init__(self):
+        """
+        Constructor method
+        """
+        self.__words: Counter = Counter()
+
+    def update(self, text: str) -> None:
+        """
+        Add the words of a piece of text
+
+        Args:
+            text (str): Text of the page
+        """
+        self.__words.update(self.WORD.findall(text.lower()))
+
+    def value(self) -> int|None:
+        """
+        Get the fingerprint of the words added so far
+
+        Returns:
+            int: 64-bit fingerprint, None if the page has no words
+        """
+        if not self.__words:
+            return None
+
+        columns: int = 0
+        total: int = 0
+        for word, count in self.__words.items():
+            digest: bytes = hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest()
+            spread: int = 0
+            for index, byte in enumerate(digest):
+                spread |= self.SPREAD[byte] << (256 * index)
+            columns += count * spread
+            total += count
+
+        # A bit is set when more than half of the words (by weight) have it set
+        fingerprint: int = 0
+        for bit in range(64):
+            if ((columns >> (32 * bit)) & 0xFFFFFFFF) * 2 > total:
+                fingerprint |= 1 << bit
+        return fingerprint
+
+
+class NearDuplicateIndex:
+    """
+    Banded index of the SimHash fingerprints of the crawled pages
+    The 64 bits are split into distance + 1 bands, two fingerprints at most distance bits apart have
+    at least one identical band (pigeonhole), so a fingerprint is only compared with the fingerprints
+    sharing one of its bands
+
+    Attributes:
+        distance (int): Maximum number of different bits of near-duplicate pages
+        duplicates (int): Number of near-duplicate pages found
+        __bands (List[Tuple[int, int]]): Shift and mask of every band
+        __tables (List[Dict[int, List[int]]]): Fingerprints by band value, one table per band
+        __lock (threading.Lock): Lock guarding the tables
+    """
+
+    def __init__(self, distance: int = 3):
+        """
+        Constructor method
+
+        Args:
+            distance (int): Maximum number of different bits of near-duplicate pages (default = 3)
+        """
+        self.distance: int = distance
+        self.duplicates: int = 0
+        width: int = 64 // (distance + 1)
+        self.__bands: List[Tuple[int, int]] = [
+            (index * width, (1 << (64 - index * width if index == distance else width)) - 1) for index in range(distance + 1)
+        ]
+        self.__tables: List[Dict[int, List[int]]] = [{} for _ in self.__bands]
+        self.__lock: threading.Lock = threading.Lock()
+
+    def add(self, fingerprint: int) -> bool:
+        """
+        Add the fingerprint of a page unless a near-duplicate page was added before
+
+        Args:
+            fingerprint (int): 64-bit SimHash fingerprint
+
+        Returns:
+            bool: True if the page is a near-duplicate
+        """
+        with self.__lock:
+            for (shift, mask), table in zip(self.__bands, self.__tables):
+                for candidate in table.get((fingerprint >> shift) & mask, ()):
+                    if (candidate ^ fingerprint).bit_count() <= self.distance:
+                        self.duplicates += 1
+                        return True
+
+            for (shift, mask), table in zip(self.__bands, self.__tables):
+                table.setdefault((fingerprint >> shift) & mask, []).append(fingerprint)
+            return False
+
+
+class LinkFilter:
+    """
+    Keep/drop filter for the href values, compiled once per crawler
+    The session end phrases and the non-page markers are matched with a single regular expression
+    on the lowercased href and the extension of the path is looked up in a set
+
+    Attributes:
+        __matcher (re.Pattern): Alternation of the session end phrases and the non-page markers (lowercase)
+        __ignore_extensions (FrozenSet[str]): Extensions to be ignored (lowercase, without the dot)
+    """
+
+    def __init__(self, session_end_phrases: List[str], non_page_href: List[str], ignore_extensions: List[str]):
+        """
+        Constructor method
+
+        Args:
+            session_end_phrases (List[str]): Session end phrases (eg. logout, sign out, log-out)
+            non_page_href (List[str]): Non-page markers (eg. javascript:, mailto:, tel:)
+            ignore_extensions (List[str]): Extensions to be ignored (eg. png, jpeg, jpg, js, css, gif, pdf)
+        """
+        # The phrases of every group are compiled into a trie so that each position of the href is tested once
+        patterns: List[str] = []
+        for group, phrases in (('session_end', session_end_phrases), ('non_page', non_page_href)):
+            if phrases:
+                patterns.append(f'(?P<{group}>{trie_pattern(phrase.lower() for phrase in phrases)})')
+
+        self.__matcher: re.Pattern|None = re.compile('|'.join(patterns)) if patterns else None
+        self.__ignore_extensions: FrozenSet[str] = frozenset(extension.lower().lstrip('.') for extension in ignore_extensions)
+
+    def drop_reason(self, href_value: str) -> str|None:
+        """
+        Check if a href has to be dropped
+
+        Args:
+            href_value (str): Value of the href attribute
+
+        Returns:
+            str: session_end, non_page or extension if the href is dropped, None if it is kept
+        """
+        # Matching the session end phrases and the non-page markers in a single pass
+        if self.__matcher:
+            match = self.__matcher.search(href_value.lower())
+            if match:
+                return match.lastgroup
+
+        # Looking up the extension of the path (eg. /data.json is json, /download.php?file=a.pdf is php)
+        extension: str = url_extension(href_value)
+        if extension and extension in self.__ignore_extensions:
+            return 'extension'
+
+        return None
+
+
+class LinkExtractor:
+    """
+    Base class of the link extractors, the page is fed in chunks and only the href values are kept
+
+    Attributes:
+        links (List[str]): href values of the <a> tags
+        base_href (str): href value of the first <base> tag
+        encoding (str): Encoding of the page if known from the response headers
+        simhash (SimHash): Fingerprint fed with the text of the page (None without near-duplicate detection)
+    """
+
+    def __init__(self, encoding: str|None = None, simhash: SimHash|None = None):
+        """
+        Constructor method
+        """
+        self.links: List[str] = []
+        self.base_href: str|None = None
+        self.encoding: str|None = encoding
+        self.simhash: SimHash|None = simhash
+
+    def feed(self, data: bytes) -> None:
+        """
+        Feed a chunk of the page
+
+        Args:
+            data (bytes): Chunk of the page
+        """
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        """
+        Signal the end of the page, the links are complete after this call
+        """
+        raise NotImplementedError
+
+
+class StreamLinkExtractor(LinkExtractor):
+    """
+    Streaming link extractor on top of the lxml event parser
+    Only the <a href> and <base href> start tags are reported, no tree is built for the page
+    """
+
+    def __init__(self, encoding: str|None = None, simhash: SimHash|None = None):
+        """
+        Constructor method
+        """
+        super().__init__(encoding, simhash)
+        self.__parser: etree.HTMLParser = etree.HTMLParser(target=self, encoding=encoding, no_network=True)
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        """
+        Parser target callback for every start tag
+        """
+        if tag == 'a':
+            href: str|None = attrib.get('href')
+            if href:
+                self.links.append(href)
+        elif tag == 'base' and self.base_href is None:
+            self.base_href = attrib.get('href')
+
+    def close(self) -> None:
+        """
+        Parser target callback at the end of the page
+        """
+        return None
+
+    def feed(self, data: bytes) -> None:
+        """
+        Feed a chunk of the page to the parser, the links are reported as soon as they are parsed
+        """
+        self.__parser.feed(data)
+
+    def finish(self) -> None:
+        """
+        Flush the parser at the end of the page
+        """
+        self.__parser.close()
+
+
+class StreamTextLinkExtractor(StreamLinkExtractor):
+    """
+    Streaming link extractor which also feeds the text of the page to its SimHash
+    A separate class so that the parser of the plain stream extractor gets no text callbacks
+    """
+
+    def __init__(self, encoding: str|None = None, simhash: SimHash|None = None):
+        """
+        Constructor method
+        """
+        self.__skip: int = 0
+        super().__init__(encoding, simhash or SimHash())
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        """
+        Parser target callback for every start tag, the text of the scripts and the styles is skipped
+        """
+        super().start(tag, attrib)
+        if tag in ('script', 'style'):
+            self.__skip += 1
+
+    def end(self, tag: str) -> None:
+        """
+        Parser target callback for every end tag
+        """
+        if tag in ('script', 'style') and self.__skip:
+            self.__skip -= 1
+
+    def data(self, text: str) -> None:
+        """
+        Parser target callback for the text of the page
+        """
+        if not self.__skip:
+            self.simhash.update(text)
+
+
+class SoupLinkExtractor(LinkExtractor):
+    """
+    BeautifulSoup link extractor, the whole page is buffered and parsed into a tree (fallback)
+    """
+
+    def __init__(self, encoding: str|None = None, simhash: SimHash|None = None):
+        """
+        Constructor method
+        """
+        super().__init__(encoding, simhash)
+        self.__chunks: List[bytes] = []
+
+    def feed(self, data: bytes) -> None:
+        """
+        Buffer a chunk of the page
+        """
+        self.__chunks.append(data)
+
+    def finish(self) -> None:
+        """
+        Parse the buffered page into a tree and collect the links
+        """
+        page = BeautifulSoup(b''.join(self.__chunks), 'lxml', from_encoding=self.encoding)
+        self.__chunks = []
+
+        # Getting all the urls from the page
+        self.links = [url_tag['href'] for url_tag in page.find_all('a', href=True) if url_tag['href']]
+
+        # Honoring the <base href> of the page
+        base_tag = page.find('base', href=True)
+        if base_tag:
+            self.base_href = base_tag['href']
+
+        # Fingerprinting the text of the page without the scripts and the styles
+        if self.simhash:
+            for tag in page.find_all(['script', 'style']):
+                tag.decompose()
+            self.simhash.update(page.get_text(' '))
+
+
+# First bytes of a body which identify a web page when the Content-Type is missing or generic
+HTML_SIGNATURES: Tuple[bytes, ...] = (
+    b'<!doctype html', b'<html', b'<head', b'<body', b'<title',
+    b'<script', b'<iframe', b'<table', b'<div', b'<a ', b'<p>', b'<!--'
+)
+
+# Missing or generic Content-Types, the first bytes of the body tell if the response is a web page
+SNIFFED_MIME_TYPES: FrozenSet[str] = frozenset({'', 'application/octet-stream', 'text/plain', 'application/unknown', 'unknown/unknown'})
+
+# Link extractors selectable from the command line
+LINK_EXTRACTORS: Dict[str, type] = {
+    'stream': StreamLinkExtractor,
+    'soup': SoupLinkExtractor
+}
+
+
+class Crawlytics:
+    """
+    Crawlytics class
+
+    Args:
+        hostname (str): Hostname of the website
+        url_limit (int): URL limit for crawling (default = 1000)
+        threads (int): Number of worker threads (default = 100)
+        concurrency (int): Number of in-flight requests for the asyncio engine (default = 500)
+        pool_size (int): Keep-alive connections per host in every worker session (default = 10)
+        cookies (Dict[str, str]): Cookies sent with every request (default = None)
+        extractor (str): Link extractor used to parse the web pages, stream or soup (default = stream)
+        max_body_size (int): Maximum body size in bytes read from every page, 0 for no limit (default = 10 MB)
+        seen_set (str): Seen-set used to deduplicate the URLs, exact or bloom (default = exact)
+        ignore_extensions (List[str]): Extensions to be ignored while crawling (default = None, built-in list, an empty list ignores none)
+        session_end_phrases (List[str]): Session end phrases of the URLs not to be crawled (default = None, built-in list, an empty list ignores none)
+        non_page_href (List[str]): Non-page URL prefixes to be ignored (default = None, built-in list, an empty list ignores none)
+        state (str): SQLite file storing the frontier and the seen URLs for checkpoint and resume (default = None)
+        resume (bool): Resume the interrupted crawl stored in the state file (default = False)
+        cache (str): SQLite file caching the response metadata for incremental recrawls (default = None)
+        cache_max_age (float): Cache entries older than this many days are evicted (default = 7)
+        cache_max_entries (int): Maximum number of cache entries (default = 100000)
+        rate (float): Requests per second per host, 0 for no rate limit (default = 0)
+        host_concurrency (int): Maximum concurrency per host, 0 for the number of workers (default = 0)
+        max_retries (int): Maximum number of retries of a url after a 429/503 or a connection error (default = 3)
+        output (str): JSON Lines file receiving one record per crawled url while crawling, gzip compressed if it ends with .gz (default = None)
+        metrics (str): File receiving a snapshot of the metrics every few seconds, Prometheus text if it ends with .prom, else JSON (default = None)
+        profile (str): File receiving the cProfile statistics of the crawl (default = None)
+        sitemaps (bool): Seed the frontier with the urls of the sitemaps listed in robots.txt (default = False)
+        robots (bool): Honor the robots.txt disallow rules and crawl-delay (default = False)
+        on_page (Callable[[Dict[str, Any]], None]): Hook called with the result record of every crawled page (default = None)
+        on_link (Callable[[str, str], None]): Hook called with every in scope link found and the page linking to it (default = None)
+        should_follow (Callable[[str, str, int], bool]): Hook deciding if a link (url, referrer, depth) is crawled (default = None)
+        graph (str): File receiving the link graph, GraphML if it ends with .graphml, CSV if it ends with .csv, else compact binary (default = None)
+        traps (bool): Drop the urls of crawler traps (path templates, query parameter names, repeated segments, depth) (default = False)
+        near_duplicates (bool): Do not expand the pages whose SimHash is a near-duplicate of a crawled page (default = False)
+        time_limit (float): Time limit of the crawl in minutes (default = 20)
+        frontier (FrontierQueue): Queue receiving the urls found by the workers, the part of a shared frontier in batch mode driven by a BatchCrawler (default = None, own frontier)
+        sessions (threading.local): Per-worker storage of the browser objects shared with other crawlers in batch mode (default = None)
+
+    Attributes:
+        __start (float): Time at which the crawler was started
+        __local (threading.local): Per-worker storage for the browser object
+        __cookies (requests.cookies.RequestsCookieJar): Cookie jar shared by all the workers
+        __pool_size (int): Keep-alive connections per host in every worker session (default = 10)
+        user_agent (str): User agent
+        _crawl_url_limit (int): URL limit for crawling (default = 1000)
+        _url_flag_limit (bool): URL limit flag
+        __thread_time_limit (float): Time limit in seconds for thread (default = 20 min)
+        __time_flag_limit (bool): Time limit flag
+        time_break_limit (int): Time limit in minutes for break (default = 5 min)
+        __threads_limit (int): Number of worker threads (default = 100)
+        __frontier (Frontier): Frontier queue of urls waiting to be crawled by the workers (PersistentFrontier with a state file, None in batch mode)
+        __queue (FrontierQueue): Queue receiving the urls found and taken by the workers, the frontier or the part of a batch frontier
+        __workers (List[threading.Thread]): Worker threads
+        __lock (threading.Lock): Lock guarding the processed urls
+        __status_interval (float): Interval in seconds at which the status is updated
+        __concurrency (int): Number of in-flight requests for the asyncio engine (default = 500)
+        __extractor (str): Link extractor used to parse the web pages (default = stream)
+        max_body_size (int): Maximum body size in bytes read from every page, 0 for no limit (default = 10 MB)
+        __chunk_size (int): Size in bytes of the chunks read from the streamed bodies
+        sniff_size (int): Size in bytes of the body prefix read to sniff a response without a specific Content-Type (default = 512)
+        request_timeout (int): Timeout in seconds for every request (default = 30)
+        thread_kill (bool): Thread kill flag
+        _hostname (str): Hostname of the website, the final url of the starting url once it is fetched
+        _domain (str): Domain name of the website, resolved again from the final url of the starting url
+        __fetched_count (int): Number of URLs fetched from the webpages (duplicates included)
+        _known_extensions (List[str]): Extensions to be crawled (eg. php, html, htm, aspx, jsp)
+        _ignore_extensions (List[str]): Extensions to be ignored while crawling (eg. png, jpeg, jpg, js, css, gif, pdf)
+        __session_end_phrases (List[str]): Session end phrases if present in the URL then don't crawl it (eg. logout, sign out, log-out)
+        __non_page_href (List[str]): Non-page URLs to be ignored while crawling (eg. javascript, mailto, tel)
+        __link_filter (LinkFilter): Link filter compiled from the session end phrases, non-page URLs and ignored extensions
+        _fetched_urls (Set[str]): Fetched URLs
+        __processed_urls (List[str]): Processed URLs (canonical)
+        __seen_set (str): Seen-set used to deduplicate the URLs, exact or bloom (default = exact)
+        bloom_error_rate (float): False positive rate of the bloom seen-set (default = 0.001)
+        __seen_urls (FingerprintSet|BloomFilter): Fingerprints of the processed URLs
+        __logout_page (str): Login and logout pages
+        __host_concurrency (int): Maximum concurrency per host, 0 for the number of workers (default = 0)
+        __scheduler (HostScheduler): Per-host politeness scheduler (token bucket, AIMD concurrency, Retry-After and backoff)
+        __retries (Dict[str, int]): Number of retries of the urls being retried
+        __cache (ResponseCache): Response metadata cache for incremental recrawls (None without a cache file)
+        __options (Dict[str, Any]): Constructor arguments, every process of a sharded crawl creates its own crawler from them
+        __shard (ShardRouter): Url routing of the shard crawled by the current process (None unless sharded)
+        __output (str): JSON Lines file receiving one record per crawled url (None without an output file)
+        __writer (ResultWriter): Writer of the result records while crawling (None without an output file)
+        __origins (Dict[str, Tuple[int, str]]): Depth and referrer of the urls waiting for their result record
+        __metrics (Metrics): Metrics of the crawl (responses, bytes, stage latencies, dedup, worker utilization)
+        __metrics_path (str): File receiving a snapshot of the metrics every few seconds (None without a metrics file)
+        __metrics_labels (Dict[str, str]): Labels of the metrics snapshots (shard of a sharded crawl)
+        __profile (str): File receiving the cProfile statistics of the crawl (None without profiling)
+        __profilers (List[cProfile.Profile]): Profiler of every worker
+        __use_sitemaps (bool): Seed the frontier with the urls of the sitemaps listed in robots.txt
+        __use_robots (bool): Honor the robots.txt disallow rules and crawl-delay
+        robots_agent (str): User agent matched against the robots.txt groups (default = crawlytics, * applies too)
+        max_sitemaps (int): Maximum number of sitemaps fetched, sitemap indexes included (default = 1000)
+        __robots (RobotFileParser): Rules of the robots.txt of the starting host (None unless they are honored)
+        __robots_host (str): Host of the robots.txt rules
+        __start_url (str): Url given to the constructor, the default starting url of iter_crawl
+        __seed (str): Canonical starting url until its first fetch resolves the hostname, the constructor does no network I/O
+        __on_page (Callable[[Dict[str, Any]], None]): Hook called with the result record of every crawled page
+        __on_link (Callable[[str, str], None]): Hook called with every in scope link found and the page linking to it
+        __should_follow (Callable[[str, str, int], bool]): Hook deciding if a link is crawled
+        __results (queue.Queue): Result records waiting to be yielded by iter_crawl (None outside of iter_crawl)
+        __keep_urls (bool): Keep the processed urls to return them, False while streaming the results (output file or iter_crawl)
+        __processed_count (int): Number of processed urls
+        results_queue_size (int): Maximum number of result records waiting in iter_crawl, the workers block above it (default = 1000)
+        __graph_path (str): File receiving the link graph (None without export)
+        link_graph (LinkGraph): Link graph of the crawled pages, recorded if it is not None (created when a graph file is given)
+        trap_detector (TrapDetector): URL-pattern crawler trap detection (None if the traps are not detected)
+        duplicate_index (NearDuplicateIndex): SimHash fingerprints of the crawled pages (None if the near-duplicates are not detected)
+    """
+
+    def __init__(self, hostname: str, url_limit: int = 1000, threads: int = 100, concurrency: int = 500,
+                 pool_size: int = 10, cookies: Optional[Dict[str, str]] = None, extractor: str = 'stream',
+                 max_body_size: int = 10 * 1024 * 1024, seen_set: str = 'exact',
+                 ignore_extensions: Optional[List[str]] = None, session_end_phrases: Optional[List[str]] = None,
+                 non_page_href: Optional[List[str]] = None, state: Optional[str] = None, resume: bool = False,
+                 cache: Optional[str] = None, cache_max_age: float = 7, cache_max_entries: int = 100000,
+                 rate: float = 0, host_concurrency: int = 0, max_retries: int = 3, output: Optional[str] = None,
+                 metrics: Optional[str] = None, profile: Optional[str] = None, sitemaps: bool = False, robots: bool = False,
+                 on_page: Optional[Callable[[Dict[str, Any]], None]] = None, on_link: Optional[Callable[[str, str], None]] = None,
+                 should_follow: Optional[Callable[[str, str, int], bool]] = None, graph: Optional[str] = None,
+                 traps: bool = False, near_duplicates: bool = False, time_limit: float = 20,
+                 frontier: Optional[FrontierQueue] = None, sessions: Optional[threading.local] = None):
+        """
+        Constructor method
+        """
+        # Constructor arguments, every process of a sharded crawl creates its own crawler from them
+        self.__options: Dict[str, Any] = {name: value for name, value in locals().items() if name != 'self'}
+
+        # Time at which the crawler was started
+        self.__start: float = time.time()
+
+        # Per-worker storage for the browser object, a StatefulBrowser is not thread-safe
+        # The crawlers of a batch share it, every worker keeps a single connection pool for all the targets
+        self.__local: threading.local = sessions if sessions is not None else threading.local()
+
+        # Cookie jar shared by all the workers (authenticated crawls)
+        self.__cookies: requests.cookies.RequestsCookieJar = requests.cookies.cookiejar_from_dict(cookies or {})
+
+        # Keep-alive connections per host in every worker session (default = 10)
+        self.__pool_size: int = pool_size
+
+        # User agent
+        self.user_agent: str = (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/79.0.3945.130 Safari/537.36 Firefox/62.0"
+        )
+        # URL limit for crawling (default = 1000)
+        self._crawl_url_limit: int = url_limit
+        self._url_flag_limit: bool = False
+
+        # Time limit in minutes for thread (default = 20)
+        self.__thread_time_limit: float = time_limit * 60
+        # Time limit flag
+        self.__time_flag_limit: bool = False
+
+        # Time limit in minutes for break (default = 5 min)
+        self.time_break_limit: int = 300
+
+        # Number of worker threads (default = 100)
+        self.__threads_limit: int = threads
+
+        # Frontier queue of urls waiting to be crawled by the workers, backed by a SQLite store if a state file is given
+        # In batch mode the workers of the batch take the urls from the shared frontier, the crawler has none of its own
+        self.__frontier: Frontier|None = (PersistentFrontier(state, resume) if state else Frontier()) if frontier is None else None
+        # Queue receiving the urls found and taken by the workers, the part of the shared frontier in batch mode
+        self.__queue: FrontierQueue = frontier if frontier is not None else self.__frontier
+
+        # Worker threads
+        self.__workers: List[threading.Thread] = []
+
+        # Lock guarding the processed urls
+        self.__lock: threading.Lock = threading.Lock()
+
+        # Interval in seconds at which the status is updated while waiting for the frontier
+        self.__status_interval: float = 5.0
+
+        # Number of in-flight requests for the asyncio engine (default = 500)
+        self.__concurrency: int = concurrency
+
+        # Link extractor used to parse the web pages (default = stream)
+        self.__extractor: str = extractor
+
+        # Maximum body size in bytes read from every page, larger pages are truncated (default = 10 MB)
+        self.max_body_size: int = max_body_size
+
+        # Size in bytes of the chunks read from the streamed bodies
+        self.__chunk_size: int = 65536
+
+        # Size in bytes of the body prefix read to sniff a response without a specific Content-Type
+        self.sniff_size: int = 512
+
+        # Timeout in seconds for every request (default = 30)
+        self.request_timeout: int = 30
+
+        # Thread kill flag
+        self.thread_kill: bool = False
+
+        # Hostname of the website, the redirects are followed by the first fetch of the starting url
+        self.__start_url: str = hostname
+        self._hostname: str = hostname
+        self.__seed: str|None = None
+
+        # Domain name of the website, resolved offline from the hostname until the starting url is fetched
+        self._domain: str = self.get_domain_name(hostname)
+
+        # Number of URLs fetched from the webpages (duplicates included)
+        self.__fetched_count: int = 0
+
+        # Extensions to be crawled (eg. php, html, htm, aspx, jsp)
+        self._known_extensions: List[str] = [
+            'php', 'html', 'htm', 'aspx',
+            'jsp', 'dj', 'asp', 'py','vb',
+            'vbjx', 'servlet', 'sql','ts'
+        ]
+
+        # Extensions to be ignored while crawling (eg. png, jpeg, jpg, js, css, gif, pdf)
+        self._ignore_extensions: List[str] = ignore_extensions if ignore_extensions is not None else [
+            'png', 'javascript', 'jpeg', 'jpg',
+            'js', 'css','gif', 'tif', 'bmp', 'ppm',
+            'webp', 'svg', 'pdf', 'ico', 'pdf',
+            'xlsx', 'csv', 'exe', 'war', 'mp4'
+        ]
+
+        # Session end phrases if present in the URL then don't crawl it (eg. logout, sign out, log-out)
+        self.__session_end_phrases: List[str] = session_end_phrases if session_end_phrases is not None else [
+            "logout", "log out", "log-out", "log_out",
+            "signout", "sign out","sign-out", "sign_out",
+            "logoff", "log-off", "log off", "log_off",
+            "signoff", "sign-off", "sign off", "sign_off"
+        ]
+
+        # Non-page URLs to be ignored while crawling (eg. javascript, mailto, tel)
+        self.__non_page_href: List[str] = non_page_href if non_page_href is not None else ['javascript:','mailto:','tel:']
+
+        # Link filter compiled once from the lists above
+        self.__link_filter: LinkFilter = LinkFilter(self.__session_end_phrases, self.__non_page_href, self._ignore_extensions)
+
+        # Fetched URLs
+        self._fetched_urls: Set[str] = set()
+        # Processed URLs (canonical), only counted while the results are streamed to the output file or iter_crawl
+        self.__processed_urls: List[str] = []
+        self.__processed_count: int = 0
+        self.__keep_urls: bool = not output
+
+        # Seen-set used to deduplicate the URLs, exact or bloom (default = exact)
+        self.__seen_set: str = seen_set
+
+        # False positive rate of the bloom seen-set (default = 0.001)
+        self.bloom_error_rate: float = 0.001
+
+        # Fingerprints of the processed URLs
+        self.__seen_urls: FingerprintSet|BloomFilter = self.new_seen_set()
+
+        # Login and logout pages
+        self.__logout_page: str = ''
+
+        # Maximum concurrency per host, 0 for the number of workers (default = 0)
+        self.__host_concurrency: int = host_concurrency
+
+        # Per-host politeness scheduler (token bucket, AIMD concurrency, Retry-After and backoff)
+        self.__scheduler: HostScheduler = HostScheduler(rate, host_concurrency or threads, max_retries)
+
+        # Number of retries of the urls being retried
+        self.__retries: Dict[str, int] = {}
+
+        # Response metadata cache for incremental recrawls
+        self.__cache: ResponseCache|None = ResponseCache(cache, cache_max_age * 24 * 3600, cache_max_entries) if cache else None
+
+        # Url routing of the shard crawled by the current process (sharded crawl only)
+        self.__shard: ShardRouter|None = None
+
+        # JSON Lines file receiving one record per crawled url, the writer is started with the crawl
+        self.__output: str|None = output
+        self.__writer: ResultWriter|None = None
+
+        # Depth and referrer of the urls waiting for their result record
+        self.__origins: Dict[str, Tuple[int, str]] = {}
+
+        # Metrics of the crawl, a snapshot is written to the metrics file every few seconds
+        self.__metrics: Metrics = Metrics()
+        self.__metrics_path: str|None = metrics
+        self.__metrics_labels: Dict[str, str] = {}
+
+        # cProfile statistics of the crawl, every worker has its own profiler
+        self.__profile: str|None = profile
+        self.__profilers: List[cProfile.Profile] = []
+
+        # Sitemap seeding and robots.txt rules, loaded when the crawl starts
+        self.__use_sitemaps: bool = sitemaps
+        self.__use_robots: bool = robots
+        self.robots_agent: str = 'crawlytics'
+        self.max_sitemaps: int = 1000
+        self.__robots: RobotFileParser|None = None
+        self.__robots_host: str = ''
+
+        # Hooks of the library API, called from the worker threads
+        self.__on_page: Callable[[Dict[str, Any]], None]|None = on_page
+        self.__on_link: Callable[[str, str], None]|None = on_link
+        self.__should_follow: Callable[[str, str, int], bool]|None = should_follow
+
+        # Bounded queue of the result records yielded by iter_crawl
+        self.__results: queue.Queue|None = None
+        self.results_queue_size: int = 1000
+
+        # Link graph of the crawled pages, exported to the graph file at the end of the crawl
+        self.__graph_path: str|None = graph
+        self.link_graph: LinkGraph|None = LinkGraph() if graph else None
+
+        # Crawler trap and near-duplicate page detection, their limits can be tuned before crawling
+        self.trap_detector: TrapDetector|None = TrapDetector() if traps else None
+        self.duplicate_index: NearDuplicateIndex|None = NearDuplicateIndex() if near_duplicates else None
+
+    def resolve_hostname(self, url: str) -> None:
+        """
+        Resolve the hostname of the website and its domain name from the final url of the starting url
+        This is done by the first fetch of the starting url (redirects followed), no request is made before the crawl starts
+
+        Args:
+            url (str): Final url of the starting url
+        """
+        self.__seed = None
+        self._hostname = url
+        self._domain = self.get_domain_name(url)
+
+        # Sharing the hostname with the other shards
+        if self.__shard and not self.__shard.resolved_hostname():
+            self.__shard.resolve(url)
+
+    def enqueue_url(self, url: str, referrer: str|None = None, depth: int = 0) -> bool:
+        """
+        Mark the URL as processed and add it to the frontier if it was not processed before
+
+        Args:
+            url (str): URL to be crawled
+            referrer (str): Page on which the URL was found (default = None)
+            depth (int): Number of links from the starting url (default = 0)
+
+        Returns:
+            bool: True if the URL was added to the frontier
+        """
+        try:
+            # Checking if the time limit is not reached and the URL limit is not reached
+            if self.__time_flag_limit or self._url_flag_limit:
+                return False
+
+            # Adding the url to the frontier if it is new
+            if self.mark_processed(url, referrer, depth):
+                self.__queue.put(url)
+                return True
+
+        except Exception as error:
+            error_console.print('enqueue url function error')
+            error_console.print(error)
+
+        return False
+
+    def enqueue_shard_urls(self, urls: Iterable[str], referrer: str|None = None, depth: int = 0) -> None:
+        """
+        Add the urls owned by the current shard to the frontier and send the other ones to their shard
+
+        Args:
+            urls (Iterable[str]): Canonical URLs found on a page
+            referrer (str): Page on which the URLs were found (default = None)
+            depth (int): Number of links from the starting url (default = 0)
+        """
+        try:
+            urls = list(urls)
+            with self.__shard.fetched.get_lock():
+                self.__shard.fetched.value += len(urls)
+
+            # Urls rejected here (already processed, limit reached) are not pending anymore
+            rejected: int = 0
+            for url in self.__shard.route(urls, referrer, depth):
+                if not self.enqueue_url(url, referrer, depth):
+                    rejected += 1
+            self.__shard.done(rejected)
+
+        except Exception as error:
+            error_console.print('enqueue shard urls function error')
+            error_console.print(error)
+
+    def mark_redirect(self, url: str, referrer: str) -> None:
+        """
+        Mark the final url of a redirect as processed, in a sharded crawl the shard owning it marks it
+
+        Args:
+            url (str): Canonical URL the redirect led to, its page is already fetched
+            referrer (str): URL which was redirected
+        """
+        try:
+            if self.__shard and self.__shard.owner(url) != self.__shard.index:
+                self.__shard.send(self.__shard.owner(url), [url], referrer, fetch=False)
+            else:
+                self.mark_processed(url)
+
+        except Exception as error:
+            error_console.print('mark redirect function error')
+            error_console.print(error)
+
+    def mark_processed(self, url: str, referrer: str|None = None, depth: int = 0) -> bool:
+        """
+        Add the URL to the processed urls if it is new and the url limit is not reached
+
+        Args:
+            url (str): Canonical URL to be crawled
+            referrer (str): Page on which the URL was found, kept for the result record (default = None)
+            depth (int): Number of links from the starting url, kept for the result record (default = 0)
+
+        Returns:
+            bool: True if the URL was not processed before and has to be crawled
+        """
+        fingerprint: int = url_fingerprint(url)
+
+        # Urls owned by another shard are marked by their owner
+        if self.__shard and self.__shard.owner(url) != self.__shard.index:
+            return False
+
+        with self.__lock:
+            # Checking if the url is already processed
+            duplicate: bool = fingerprint in self.__seen_urls
+            self.__metrics.record_seen(duplicate)
+            if duplicate:
+                return False
+
+            # Dropping the urls of crawler traps found on the pages, they are marked as seen so that they are counted once
+            if referrer and self.trap_detector and self.trap_detector.check(url):
+                self.__seen_urls.add(fingerprint)
+                return False
+
+            # Checking if the url limit is reached (shared by all the processes of a sharded crawl)
+            if self.__processed_count >= self._crawl_url_limit or (self.__shard and not self.__shard.reserve(self._crawl_url_limit)):
+                if not self._url_flag_limit:
+                    console.print('[bold yellow] Url Limit Reached[/bold yellow]')
+                    self._url_flag_limit = True
+                return False
+
+            # Adding the url to the processed urls
+            self.__seen_urls.add(fingerprint)
+            self.__processed_count += 1
+            if self.__keep_urls:
+                self.__processed_urls.append(url)
+
+            # Keeping the origin of the url until its result record is written
+            if referrer and self.keeps_records():
+                self.__origins[url] = (depth, referrer)
+            return True
+
+    def new_seen_set(self) -> FingerprintSet|BloomFilter:
+        """
+        Create the selected seen-set, the bloom filter is sized for the url limit
+
+        Returns:
+            FingerprintSet|BloomFilter: Empty seen-set
+        """
+        if self.__seen_set == 'bloom':
+            return BloomFilter(self._crawl_url_limit, self.bloom_error_rate)
+        return FingerprintSet()
+
+    def keeps_records(self) -> bool:
+        """
+        Check if the depth and referrer of the urls are kept (output file, hooks or iter_crawl)
+
+        Returns:
+            bool: True if a result record is built for every crawled url
+        """
+        return bool(self.__writer or self.__on_page or self.__should_follow or self.__results is not None)
+
+    def follow_url(self, url: str, referrer: str, depth: int) -> bool:
+        """
+        Call the link hooks for a link found on a page or in a sitemap
+
+        Args:
+            url (str): Canonical in scope URL
+            referrer (str): Page or sitemap on which the URL was found
+            depth (int): Number of links from the starting url
+
+        Returns:
+            bool: True if the url has to be crawled
+        """
+        try:
+            if self.__on_link:
+                self.__on_link(url, referrer)
+            return not self.__should_follow or bool(self.__should_follow(url, referrer, depth))
+
+        except Exception as error:
+            error_console.print('follow url function error')
+            error_console.print(error)
+            return False
+
+    def start_workers(self) -> None:
+        """
+        Start the pool of worker threads pulling urls from the frontier
+        """
+        try:
+            for index in range(self.__threads_limit):
+                worker = threading.Thread(target=self.worker, name=f'crawlytics-worker-{index}', daemon=True)
+                worker.start()
+                self.__workers.append(worker)
+
+        except Exception as error:
+            error_console.print('start workers function error')
+            error_console.print(error)
+
+    def get_browser(self) -> mechanicalsoup.StatefulBrowser:
+        """
+        Get the browser object of the current worker, it is created on first use
+        Every worker has its own session with a keep-alive connection pool, the cookie jar is shared
+
+        Returns:
+            mechanicalsoup.StatefulBrowser: Browser object
+        """
+        browser: mechanicalsoup.StatefulBrowser|None = getattr(self.__local, 'browser', None)
+
+        if browser is None:
+            # Connection pool of the worker session
+            adapter = requests.adapters.HTTPAdapter(pool_connections=self.__pool_size, pool_maxsize=self.__pool_size)
+
+            browser = mechanicalsoup.StatefulBrowser(
+                requests_adapters={'http://': adapter, 'https://': adapter},
+                user_agent=self.user_agent
+            )
+            browser.set_cookiejar(self.__cookies)
+            self.__local.browser = browser
+
+        return browser
+
+    def worker(self) -> None:
+        """
+        Worker loop, blocks on the frontier and crawls urls until the frontier is closed
+        """
+        profiler: cProfile.Profile|None = self.new_profiler()
+
+        while True:
+            # Waiting for the next url, None means the frontier is closed
+            url: str|None = self.__frontier.get()
+            if url is None:
+                break
+            self.crawl_task(url, profiler)
+
+    def crawl_task(self, url: str, profiler: cProfile.Profile|None = None) -> None:
+        """
+        Crawl a url taken from the frontier, then mark it done or put it back to be retried
+
+        Args:
+            url (str): URL taken from the frontier
+            profiler (cProfile.Profile): Profiler of the worker (default = None)
+        """
+        retry: float|None = None
+
+        try:
+            # Checking if the thread kill flag is not set
+            if not self.thread_kill:
+                started: float = self.__metrics.begin_work()
+                try:
+                    retry = profiler.runcall(self.crawl_url, url) if profiler else self.crawl_url(url)
+                finally:
+                    self.__metrics.end_work(started)
+
+        except Exception as error:
+            error_console.print('worker function error')
+            error_console.print(error)
+
+        finally:
+            # Putting the url back if the host is busy or the request has to be retried
+            if retry is not None and not self.thread_kill:
+                self.__queue.defer(url, retry)
+            else:
+                self.__queue.task_done(url)
+                if self.__shard:
+                    self.__shard.done()
+
+    def receive_urls(self) -> None:
+        """
+        Receiver loop of a shard, adds the urls sent by the other shards to the frontier until the inbox is closed
+        """
+        inbox = self.__shard.inboxes[self.__shard.index]
+
+        while True:
+            # Waiting for the next batch of urls, None means the crawl is over
+            batch: Tuple[str|None, int, List[str], bool]|None = inbox.get()
+            if batch is None:
+                break
+            referrer, depth, urls, fetch = batch
+
+            # Hostname resolved by the shard which fetched the starting url, shared before the urls of its page are routed
+            if self.__seed is not None and self.__shard.resolved_hostname():
+                self.resolve_hostname(self.__shard.resolved_hostname())
+
+            # Redirect targets fetched by another shard are only marked as processed, they are not pending anymore
+            if not fetch:
+                for url in urls:
+                    self.mark_processed(url)
+                self.__shard.done(len(urls))
+                continue
+
+            # Urls rejected here (already processed, limit reached) are not pending anymore
+            rejected: int = 0
+            for url in urls:
+                if not self.enqueue_url(url, referrer, depth):
+                    rejected += 1
+            self.__shard.done(rejected)
+
+    def get_domain_name(self, url: str) -> str:
+        """
+        Get domain name (example.com)
+        This function return the domain/subdomain on the basis of url
+        Ex- http://example.com/url => example.com
+        http://sub.examole.com/url => sub.example.com
+
+        Args:
+            url (str): URL to get the domain name from
+
+        Returns:
+            str: Domain name
+        """
+        domain: str = ''
+        if 'http' in url:
+            domain = url.split('://',1)[1]
+        count = domain.count('/')
+        if count > 0:
+            domain = domain.split('/',count)[0]
+        return domain
+
+    def verify_scope_url(self, url: str) -> str|None:
+        """
+        Verify if the URL is in scope or not
+
+        Args:
+            url (str): URL to be verified
+
+        Returns:
+            str: URL if it is in scope else None
+        """
+        if url:
+            if 'http' in url:
+                if self._domain in self.get_domain_name(url):
+                    return url
+        return None
+
+    def reference_url(self, url: str, base_url: str) -> str|None:
+        """
+        Convert the reference url to absolute url
+        The url is resolved offline against the base url of the page, no request is made
+
+        Args:
+            url (str): Reference url
+            base_url (str): Base url of the page (final url after redirects or <base href>)
+
+        Returns:
+            str: Absolute url
+        """
+        try:
+            # Checking if the url is not empty and not a hash tag
+            if url and url[0] != '#' and not self.thread_kill:
+
+                # Generating absolute url from the relative url and dropping the fragment
+                absolute_url: str = urldefrag(urljoin(base_url, url.strip()))[0]
+
+                # Only web pages can be crawled
+                if absolute_url.startswith(('http://', 'https://')):
+                    return absolute_url
+
+        except Exception as error:
+            error_console.print('Reference url function error')
+            error_console.print(error)
+
+        return None
+
+    def filter_href(self, href_value: str, base_url: str) -> str|None:
+        """
+        Apply the logout, non-page and extension filters to a href and resolve it to an in scope absolute url
+
+        Args:
+            href_value (str): Value of the href attribute
+            base_url (str): Base url of the page the href was found on
+
+        Returns:
+            str: Canonical absolute url if the href has to be crawled else None
+        """
+        # Initializing the variables
+        url = None
+
+        # Checking if the url is not empty and not a hash tag
+        if href_value and href_value[0] != '#':
+            # Checking if the url is not a logout page, a non page url or an ignored extension
+            reason: str|None = self.__link_filter.drop_reason(href_value)
+
+            # Setting the logout page
+            if reason == 'session_end' and not self.__logout_page:
+                self.__logout_page = str(href_value)
+
+            if reason is None:
+
+                # Converting the relative url to absolute url
+                url = self.reference_url(href_value, base_url)
+
+                # Verifying if the url is in scope or not
+                if url:
+                    url = self.verify_scope_url(url)
+
+                # Canonicalizing the url before deduplication
+                if url:
+                    url = canonicalize_url(url)
+
+                # Dropping the url if it is disallowed by the robots.txt of its host
+                if url and self.__robots and not self.robots_allowed(url):
+                    url = None
+
+        return url
+
+    def robots_allowed(self, url: str) -> bool:
+        """
+        Check the robots.txt rules for a url, only the urls of the starting host are checked
+
+        Args:
+            url (str): Canonical URL
+
+        Returns:
+            bool: True if the url can be crawled
+        """
+        if not self.__robots or urlsplit(url).netloc != self.__robots_host:
+            return True
+        return self.__robots.can_fetch(self.robots_agent, url)
+
+    def load_robots(self, start_url: str, processes: int = 1) -> List[str]:
+        """
+        Fetch the robots.txt of the starting host, keep its rules and crawl-delay if they are honored
+        and get the sitemaps it lists (/sitemap.xml if it lists none)
+
+        Args:
+            start_url (str): Starting url
+            processes (int): Number of processes sharing the crawl-delay of the host (default = 1)
+
+        Returns:
+            List[str]: Sitemap urls, empty unless the sitemaps are used
+        """
+        if not (self.__use_robots or self.__use_sitemaps):
+            return []
+
+        robots_url: str = urljoin(start_url, '/robots.txt')
+        parser: RobotFileParser = RobotFileParser(robots_url)
+
+        try:
+            response: requests.Response = self.get_browser().session.get(robots_url, timeout=self.request_timeout)
+
+            # Same semantics as urllib.robotparser: everything is disallowed on 401/403, allowed on the other errors
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+
+        except requests.exceptions.RequestException as error:
+            error_console.print('load robots function error')
+            error_console.print(error)
+            parser.allow_all = True
+
+        if self.__use_robots:
+            self.__robots = parser
+            self.__robots_host = urlsplit(robots_url).netloc
+
+            # Crawl-delay and Request-rate limit the request rate of the host
+            rates: List[float] = []
+            delay: float|None = parser.crawl_delay(self.robots_agent)
+            if delay:
+                rates.append(1 / float(delay))
+            request_rate = parser.request_rate(self.robots_agent)
+            if request_rate and request_rate.seconds:
+                rates.append(request_rate.requests / request_rate.seconds)
+            if rates:
+                self.__scheduler.set_rate(self.__robots_host, min(rates) / processes)
+                console.print(f'[bold yellow] robots.txt: {min(rates):.2f} requests per second for {self.__robots_host}[/bold yellow]')
+
+        if not self.__use_sitemaps:
+            return []
+        return parser.site_maps() or [urljoin(start_url, '/sitemap.xml')]
+
+    def sitemap_urls(self, sitemaps: List[str]) -> Iterator[Tuple[str, str]]:
+        """
+        Stream the in scope page urls of the sitemaps, the sitemaps listed by sitemap indexes are
+        fetched too. Every sitemap is parsed while it is downloaded (gzip sitemaps included)
+
+        Args:
+            sitemaps (List[str]): Sitemap urls
+
+        Returns:
+            Iterator[Tuple[str, str]]: Canonical url of every page and the sitemap listing it
+        """
+        pending: Deque[str] = deque(sitemaps)
+        requested: Set[str] = set(sitemaps)
+        fetched: int = 0
+
+        while pending and fetched < self.max_sitemaps:
+            sitemap_url: str = pending.popleft()
+            fetched += 1
+
+            try:
+                with self.get_browser().session.get(sitemap_url, timeout=self.request_timeout, stream=True) as response:
+                    if response.status_code != 200:
+                        continue
+
+                    for kind, loc in parse_sitemap(response.iter_content(chunk_size=self.__chunk_size)):
+                        # Sitemap index, the listed sitemaps of the website are fetched next
+                        if kind == 'sitemap':
+                            if loc not in requested and self.verify_scope_url(loc):
+                                requested.add(loc)
+                                pending.append(loc)
+                            continue
+
+                        url: str|None = self.filter_href(loc, sitemap_url)
+                        if url and self.follow_url(url, sitemap_url, 0):
+                            yield url, sitemap_url
+
+            except (requests.exceptions.RequestException, etree.LxmlError, zlib.error) as error:
+                error_console.print('sitemap urls function error')
+                error_console.print(error)
+
+    def is_html(self, content_type: str, head: bytes) -> bool:
+        """
+        Check if a response is a web page from its Content-Type and the first bytes of the body
+        The body is sniffed only when the Content-Type is missing or generic
+
+        Args:
+            content_type (str): Content-Type header of the response
+            head (bytes): First bytes of the body
+
+        Returns:
+            bool: True if the response contains html content
+        """
+        mime_type: str = content_type.split(';', 1)[0].strip().lower()
+
+        if 'html' in mime_type:
+            return True
+
+        # Sniffing the body (eg. /download?id=5 without Content-Type)
+        if mime_type in SNIFFED_MIME_TYPES:
+            return head[:self.sniff_size].lstrip(b'\xef\xbb\xbf \t\r\n').lower().startswith(HTML_SIGNATURES)
+
+        return False
+
+    def sniffs_body(self, content_type: str) -> bool:
+        """
+        Check if the Content-Type is missing or generic, the first bytes of the body then tell if the response is a web page
+        A response with another non-html Content-Type is dropped before its body is read
+
+        Args:
+            content_type (str): Content-Type header of the response
+
+        Returns:
+            bool: True if a prefix of the body has to be read to know if the response is a web page
+        """
+        return content_type.split(';', 1)[0].strip().lower() in SNIFFED_MIME_TYPES
+
+    def body_chunk(self, received: int, chunk: bytes) -> bytes:
+        """
+        Truncate a chunk of the body to the maximum body size
+
+        Args:
+            received (int): Number of bytes of the body already read
+            chunk (bytes): Chunk of the body
+
+        Returns:
+            bytes: Chunk of the body, empty once the maximum body size is reached
+        """
+        if self.max_body_size and received + len(chunk) > self.max_body_size:
+            return chunk[:max(self.max_body_size - received, 0)]
+        return chunk
+
+    def new_link_extractor(self, content_type: str) -> LinkExtractor:
+        """
+        Create the selected link extractor for a web page
+
+        Args:
+            content_type (str): Content-Type header of the response (charset of the page)
+
+        Returns:
+            LinkExtractor: Link extractor
+        """
+        # The text of the page is fingerprinted for the near-duplicate detection
+        if self.duplicate_index is None:
+            return LINK_EXTRACTORS[self.__extractor](get_charset(content_type))
+        if self.__extractor == 'stream':
+            return StreamTextLinkExtractor(get_charset(content_type))
+        return LINK_EXTRACTORS[self.__extractor](get_charset(content_type), SimHash())
+
+    def extract_urls(self, extractor: LinkExtractor, base_url: str) -> Set[str]:
+        """
+        Filter the links collected by the link extractor of a web page
+
+        Args:
+            extractor (LinkExtractor): Link extractor fed with the whole web page
+            base_url (str): Final url of the web page
+
+        Returns:
+            Set[str]: In scope urls found on the web page
+        """
+        fetched_urls: Set[str] = set()
+
+        # Not expanding a page which is a near-duplicate of a crawled page
+        if extractor.simhash:
+            fingerprint: int|None = extractor.simhash.value()
+            if fingerprint is not None and self.duplicate_index.add(fingerprint):
+                return fetched_urls
+
+        # Honoring the <base href> of the page
+        if extractor.base_href:
+            base_url = urljoin(base_url, extractor.base_href)
+
+        # Iterating through all the urls
+        for href_value in extractor.links:
+
+            # Checking if the thread kill flag is not set
+            if self.thread_kill:
+                break
+
+            # Filtering the url and adding it to the fetched urls
+            url = self.filter_href(href_value, base_url)
+            if url:
+                fetched_urls.add(url)
+
+        return fetched_urls
+
+    def cached_urls(self, start_url: str, entry: CacheEntry) -> Set[str]:
+        """
+        Get the urls of a page not modified since the last run from the response cache
+        The filters are applied again so that a narrower configuration is honored
+
+        Args:
+            start_url (str): Canonical url of the page
+            entry (CacheEntry): Cached response metadata
+
+        Returns:
+            Set[str]: In scope urls found on the web page
+        """
+        self.__cache.refresh(start_url)
+
+        fetched_urls: Set[str] = set()
+        for href_value in entry.outlinks:
+            url = self.filter_href(href_value, start_url)
+            if url:
+                fetched_urls.add(url)
+        return fetched_urls
+
+    def retry_delay(self, url: str, retry_after: float|None) -> float|None:
+        """
+        Schedule a retry of a url after a throttling response or a connection error
+
+        Args:
+            url (str): URL to be retried
+            retry_after (float): Delay in seconds of the Retry-After header
+
+        Returns:
+            float: Delay in seconds before the retry, None if the url has been retried too many times
+        """
+        with self.__lock:
+            attempt: int = self.__retries.get(url, 0) + 1
+
+            # Giving up the url after the maximum number of retries
+            if attempt > self.__scheduler.max_retries:
+                self.__retries.pop(url, None)
+                self.__scheduler.failures += 1
+                return None
+
+            self.__retries[url] = attempt
+            self.__scheduler.retries += 1
+
+        return max(retry_after or 0.0, self.__scheduler.backoff(attempt))
+
+    def crawl_url(self, start_url: str) -> float|None:
+        """
+        Crawl the urls on the web page and add them to the frontier
+
+        Args:
+            start_url (str): Starting url
+
+        Returns:
+            float: Delay in seconds after which the url has to be crawled again (host busy or retry), None when done
+        """
+        # Waiting for the politeness scheduler of the host, the worker picks another url meanwhile
+        host: str = urlsplit(start_url).netloc
+        delay: float = self.__scheduler.acquire(host)
+        if delay:
+            return delay
+
+        latency: float|None = None
+        status: int|None = None
+        content_type: str|None = None
+        retry_after: float|None = None
+        retry: float|None = None
+        received: int = 0
+        parse_time: float = 0.0
+        filter_time: float = 0.0
+        started: float = time.monotonic()
+
+        try:
+
+            fetched_urls: Set[str] = set()
+
+            # Browser object of the current worker
+            browser: mechanicalsoup.StatefulBrowser = self.get_browser()
+
+            # Cached response metadata of the last run (incremental recrawl)
+            entry: CacheEntry|None = self.__cache.get(start_url) if self.__cache else None
+            headers: Dict[str, str] = self.__cache.conditional_headers(entry) if self.__cache else {}
+
+            # Fetching the starting url with a streamed body, redirects are followed here
+            with browser.session.get(start_url, headers=headers, timeout=self.request_timeout, stream=True) as response:
+                latency = time.monotonic() - started
+                status = response.status_code
+
+                # Retrying the url later if the host is throttling the crawler
+                if status in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    retry = self.retry_delay(start_url, retry_after)
+                    return retry
+
+                # Relative urls are resolved against the final url of the page
+                base_url: str = response.url
+
+                # Resolving the hostname of the website from the first fetch of the starting url (redirects followed)
+                if start_url == self.__seed:
+                    self.resolve_hostname(base_url)
+
+                # Marking the redirected url as processed so that it is not fetched again
+                if base_url != start_url and self.verify_scope_url(base_url):
+                    self.mark_redirect(canonicalize_url(base_url), start_url)
+
+                content_type = response.headers.get('Content-Type', '')
+                chunks: Iterator[bytes] = response.iter_content(chunk_size=self.__chunk_size)
+
+                # Reusing the cached urls if the page was not modified since the last run
+                if response.status_code == 304 and entry:
+                    stage: float = time.perf_counter()
+                    fetched_urls = self.cached_urls(start_url, entry)
+                    filter_time = time.perf_counter() - stage
+                    head: bytes = b''
+                elif self.sniffs_body(content_type):
+                    # Reading only a small prefix of the body to sniff it, the rest is streamed if it is a web page
+                    head = response.raw.read(self.sniff_size, decode_content=True) or b''
+                elif self.is_html(content_type, b''):
+                    head = next(chunks, b'')
+                else:
+                    # Not a web page, the response is closed before its body is read
+                    head = b''
+
+                # Checking if the current page is a web page, otherwise the body is not downloaded
+                if head and self.is_html(content_type, head):
+                    extractor: LinkExtractor = self.new_link_extractor(content_type)
+                    digest = hashlib.blake2b(digest_size=16)
+
+                    # Feeding the body to the link extractor while it is downloaded
+                    for chunk in itertools.chain([head], chunks):
+                        chunk = self.body_chunk(received, chunk)
+                        if not chunk:
+                            break
+                        stage = time.perf_counter()
+                        extractor.feed(chunk)
+                        parse_time += time.perf_counter() - stage
+                        digest.update(chunk)
+                        received += len(chunk)
+                    stage = time.perf_counter()
+                    extractor.finish()
+                    parse_time += time.perf_counter() - stage
+
+                    # Getting all the urls from the current page
+                    stage = time.perf_counter()
+                    fetched_urls = self.extract_urls(extractor, base_url)
+                    filter_time = time.perf_counter() - stage
+
+                    # Storing the response metadata for the next run
+                    if self.__cache and response.status_code == 200:
+                        self.__cache.store(start_url, response.headers.get('ETag'), response.headers.get('Last-Modified'), digest.hexdigest(), fetched_urls, entry)
+                else:
+                    received = len(head)
+
+            # Counting the fetched urls
+            with self.__lock:
+                self.__fetched_count += len(fetched_urls)
+
+            # Recording the links of the page in the link graph
+            if self.link_graph is not None:
+                self.link_graph.add_links(start_url, fetched_urls)
+
+            # Calling the link hooks, the urls rejected by should_follow are not crawled
+            depth: int = self.url_depth(start_url) + 1
+            if self.__on_link or self.__should_follow:
+                fetched_urls = {fetched_url for fetched_url in fetched_urls if self.follow_url(fetched_url, start_url, depth)}
+
+            # Adding the fetched urls to the frontier if they are not already processed
+            if self.__shard:
+                self.enqueue_shard_urls(fetched_urls, start_url, depth)
+            else:
+                for fetched_url in fetched_urls:
+                    self.enqueue_url(fetched_url, start_url, depth)
+
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            # Retrying the url later with backoff instead of parking the worker
+            retry = self.retry_delay(start_url, None)
+            return retry
+
+        except Exception as error:
+            error_console.print('crawl url function error')
+            error_console.print(error)
+
+        finally:
+            # Releasing the request slot of the host and adjusting its concurrency
+            self.__scheduler.release(host, latency, status, retry_after)
+
+            # Recording the response, the network time is what is left once parsing and filtering are removed
+            self.__metrics.record_response(status, received, time.monotonic() - started - parse_time - filter_time, parse_time, filter_time)
+
+            # Writing the result record once the url is done (not retried)
+            if retry is None:
+                self.write_record(start_url, status, content_type, latency)
+
+        # Done with the url
+        with self.__lock:
+            self.__retries.pop(start_url, None)
+        return None
+
+    def url_depth(self, url: str) -> int:
+        """
+        Get the depth of a url waiting for its result record
+
+        Args:
+            url (str): Canonical URL
+
+        Returns:
+            int: Number of links from the starting url (0 for the starting url or without result records)
+        """
+        origin: Tuple[int, str]|None = self.__origins.get(url)
+        return origin[0] if origin else 0
+
+    def write_record(self, url: str, status: int|None, content_type: str|None, latency: float|None) -> None:
+        """
+        Write the result record of a crawled url to the output file, the on_page hook and the results of iter_crawl
+
+        Args:
+            url (str): Canonical URL
+            status (int): Status code of the response, None on a connection error
+            content_type (str): Content-Type header of the response
+            latency (float): Time in seconds until the response headers, None on a connection error
+        """
+        if not self.keeps_records():
+            return
+
+        with self.__lock:
+            depth, referrer = self.__origins.pop(url, (0, None))
+
+        record: Dict[str, Any] = {
+            'url': url,
+            'status': status,
+            'content_type': content_type or None,
+            'depth': depth,
+            'referrer': referrer,
+            'latency': round(latency, 4) if latency is not None else None
+        }
+
+        if self.__writer:
+            self.__writer.write(record)
+
+            # Stopping the crawl if the results cannot be written anymore, the error is raised when the writer is closed
+            if self.__writer.error and not self.thread_kill:
+                error_console.print(f'Result writer failed, stopping the crawl ({self._hostname})')
+                self.thread_kill = True
+
+        if self.__on_page:
+            try:
+                self.__on_page(record)
+            except Exception as error:
+                error_console.print('on page function error')
+                error_console.print(error)
+
+        # Waiting for room in the results of iter_crawl, the record is dropped if the iteration was stopped
+        while self.__results is not None and not self.thread_kill:
+            try:
+                self.__results.put(record, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+
+    def export_metrics(self, frontier: int) -> None:
+        """
+        Write a snapshot of the metrics to the metrics file
+
+        Args:
+            frontier (int): Number of urls waiting to be crawled
+        """
+        if not self.__metrics_path:
+            return
+
+        try:
+            self.__metrics.export(self.__metrics_path, self.__processed_count, frontier, self.__metrics_labels)
+
+        except Exception as error:
+            error_console.print('export metrics function error')
+            error_console.print(error)
+
+    def new_profiler(self) -> cProfile.Profile|None:
+        """
+        Create the profiler of a worker when profiling is enabled
+
+        Returns:
+            cProfile.Profile: Profiler, None without profiling
+        """
+        if not self.__profile:
+            return None
+
+        profiler: cProfile.Profile = cProfile.Profile()
+        with self.__lock:
+            self.__profilers.append(profiler)
+        return profiler
+
+    def write_profile(self) -> None:
+        """
+        Merge the profiles of the workers into the profile file and print the top functions
+        """
+        if not self.__profile or not self.__profilers:
+            return
+
+        try:
+            profile: pstats.Stats = pstats.Stats(*self.__profilers, stream=sys.stderr)
+            profile.dump_stats(self.__profile)
+            console.print(f'[bold green] Profile written to {self.__profile}: [/][bold blue]top functions by cumulative time[/]')
+            profile.sort_stats('cumulative').print_stats(15)
+
+        except Exception as error:
+            error_console.print('write profile function error')
+            error_console.print(error)
+
+    def add_graph_root(self, start_url: str) -> None:
+        """
+        Add the starting url as the first node of the link graph, the root of the depths
+
+        Args:
+            start_url (str): Starting url
+        """
+        if self.link_graph is not None:
+            self.link_graph.node(canonicalize_url(start_url))
+
+    def shard_graph_path(self, index: int) -> str:
+        """
+        Get the path of the link graph of a shard, always in the binary format
+
+        Args:
+            index (int): Index of the shard
+
+        Returns:
+            str: Path of the graph file of the shard
+        """
+        return f'{shard_path(self.__graph_path, index)}.bin'
+
+    def write_graph(self) -> None:
+        """
+        Export the link graph to the graph file
+        """
+        if self.link_graph is None or not self.__graph_path:
+            return
+
+        try:
+            self.link_graph.save(self.__graph_path)
+            console.print(f'[bold green] Link graph written to {self.__graph_path}: [/][bold blue]{len(self.link_graph)} nodes, '
+                          f'{self.link_graph.edge_count} edges, {len(self.link_graph.orphans())} orphans[/]')
+
+        except Exception as error:
+            error_console.print('write graph function error')
+            error_console.print(error)
+
+    def print_status(self, queued: int, workers_label: str, workers: int, visited: int|None = None, fetched: int|None = None) -> None:
+        """
+        Print the current status of the crawling process
+
+        Args:
+            queued (int): Number of urls waiting to be crawled
+            workers_label (str): Label for the workers (Threads, Tasks or Processes)
+            workers (int): Number of workers
+            visited (int): Number of visited urls (default = None, urls processed by this crawler)
+            fetched (int): Number of fetched urls (default = None, urls fetched by this crawler)
+        """
+        # Calculating the time elapsed since the start of crawling
+        secs = time.time() - self.__start
+        hours = math.floor(secs/3600)
+        secs = secs-(hours*3600)
+        mins = math.floor(secs/60)
+        secs = math.floor(secs-(mins*60))
+
+        # Updating the terminal output with the current status of the crawling process
+        visited = self.__processed_count if visited is None else visited
+        fetched = self.__fetched_count if fetched is None else fetched
+        console.print('['+str(hours)+':'+str(mins)+':'+str(secs)+'] Visited URLs '+str(visited)+' Queued '+str(queued)+' '+workers_label+' '+str(workers)+' Fetched URLs '+str(fetched)+'   ')
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the counters of the crawling process
+
+        Returns:
+            Dict[str, float]: Counters by name
+        """
+        metrics: Metrics = self.__metrics
+        return {
+            'requests': sum(metrics.statuses.values()),
+            'bytes': metrics.bytes,
+            'fetch_seconds': metrics.stages['fetch'].total,
+            'parse_seconds': metrics.stages['parse'].total,
+            'filter_seconds': metrics.stages['filter'].total,
+            'seen_checks': metrics.seen_checks,
+            'seen_duplicates': metrics.seen_duplicates,
+            'workers': metrics.workers,
+            'busy_seconds': metrics.busy_time,
+            'visited': self.__processed_count,
+            'fetched': self.__fetched_count,
+            'seen_memory': self.__seen_urls.memory_usage(),
+            'seen_urls': len(self.__seen_urls),
+            'throttled': self.__scheduler.throttled,
+            'retries': self.__scheduler.retries,
+            'failures': self.__scheduler.failures,
+            'cache_hits': self.__cache.hits if self.__cache else 0,
+            'cache_misses': self.__cache.misses if self.__cache else 0,
+            'cache_unchanged': self.__cache.unchanged if self.__cache else 0,
+            'trap_template': self.trap_detector.pruned['template'] if self.trap_detector else 0,
+            'trap_query': self.trap_detector.pruned['query'] if self.trap_detector else 0,
+            'trap_repeat': self.trap_detector.pruned['repeat'] if self.trap_detector else 0,
+            'trap_depth': self.trap_detector.pruned['depth'] if self.trap_detector else 0,
+            'near_duplicates': self.duplicate_index.duplicates if self.duplicate_index else 0
+        }
+
+    def print_summary(self, stats: Dict[str, float]|None = None) -> None:
+        """
+        Print the summary of the crawling process
+
+        Args:
+            stats (Dict[str, float]): Counters to be printed (default = None, counters of this crawler)
+        """
+        stats = stats or self.stats()
+        console.print(f'[bold green] Complete execution: [/][bold blue]Total Visited URls: {stats["visited"]}[/]')
+
+        # Memory used by the seen-set per url
+        memory: int = stats['seen_memory']
+        console.print(f'[bold green] Seen-set ({self.__seen_set}): [/][bold blue]{memory} bytes, {memory / max(stats["seen_urls"], 1):.1f} bytes per URL[/]')
+
+        # Throttling and retries of the politeness scheduler
+        console.print(f'[bold green] Politeness: [/][bold blue]{stats["throttled"]} throttled responses, {stats["retries"]} retries, {stats["failures"]} URLs given up[/]')
+
+        # Hits and misses of the response cache
+        if self.__cache:
+            console.print(f'[bold green] Response cache: [/][bold blue]{stats["cache_hits"]} hits (not modified), {stats["cache_misses"]} misses ({stats["cache_unchanged"]} unchanged content)[/]')
+
+        # URLs of crawler traps and near-duplicate pages which were not expanded
+        if self.trap_detector or self.duplicate_index:
+            traps: int = stats['trap_template'] + stats['trap_query'] + stats['trap_repeat'] + stats['trap_depth']
+            console.print(f'[bold green] Pruned: [/][bold blue]{traps} trap URLs (template {stats["trap_template"]}, query {stats["trap_query"]}, '
+                          f'repeated segments {stats["trap_repeat"]}, depth {stats["trap_depth"]}), {stats["near_duplicates"]} near-duplicate pages not expanded[/]')
+
+        # Time spent in every stage, a crawl is network-bound when the fetch time dominates
+        elapsed: float = time.monotonic() - self.__metrics.started
+        utilization: float = stats['busy_seconds'] / (stats['workers'] * elapsed) if stats['workers'] and elapsed else 0.0
+        hit_rate: float = stats['seen_duplicates'] / stats['seen_checks'] if stats['seen_checks'] else 0.0
+        console.print(f'[bold green] Metrics: [/][bold blue]{stats["requests"]} requests, {stats["bytes"] / (1024 * 1024):.1f} MB, '
+                      f'fetch {stats["fetch_seconds"]:.1f}s, parse {stats["parse_seconds"]:.1f}s, filter {stats["filter_seconds"]:.1f}s, '
+                      f'dedup hit rate {hit_rate:.0%}, worker utilization {utilization:.0%}[/]')
+
+    def start_crawl(self, start_url: str) -> List[str]:
+        """
+        Initialize a crawl of the thread engine, load robots.txt and put the starting url in the frontier
+
+        Args:
+            start_url (str): Starting url
+
+        Returns:
+            List[str]: Sitemap urls to be seeded with seed_sitemaps, empty unless the sitemaps are used
+        """
+        # Initializing the variables, the time limit runs from the start of the crawl
+        self.__start = time.time()
+        self.__seed = canonicalize_url(start_url)
+        self.__processed_urls: List[str] = []
+        self.__processed_count = 0
+        self.__seen_urls = self.new_seen_set()
+        self.__scheduler.max_concurrency = self.__host_concurrency or self.__threads_limit
+        self.__writer = ResultWriter(self.__output) if self.__output else None
+        self.__metrics.workers = self.__threads_limit
+
+        # Restoring the urls of an interrupted crawl, only the pending ones are crawled again
+        if self.__frontier is not None:
+            for fingerprint, url in self.__frontier.stored_urls():
+                self.__seen_urls.add(fingerprint)
+                self.__processed_count += 1
+                if self.__keep_urls:
+                    self.__processed_urls.append(url)
+            if self.__processed_count:
+                console.print(f'[bold yellow] Resuming crawl: {self.__processed_count} URLs restored, {len(self.__frontier)} pending[/bold yellow]')
+
+        # Loading robots.txt, then adding the starting url to the frontier
+        sitemaps: List[str] = self.load_robots(start_url)
+        self.add_graph_root(start_url)
+        self.enqueue_url(canonicalize_url(start_url))
+        return sitemaps
+
+    def seed_sitemaps(self, sitemaps: List[str]) -> None:
+        """
+        Add the urls of the sitemaps to the frontier, the workers crawl the pages while the sitemaps are downloaded
+
+        Args:
+            sitemaps (List[str]): Sitemap urls
+        """
+        for url, sitemap_url in self.sitemap_urls(sitemaps):
+            if self._url_flag_limit or self.thread_kill:
+                break
+            self.enqueue_url(url, sitemap_url)
+
+    def share_workers(self, workers: int) -> None:
+        """
+        Limit the concurrency per host to a share of a worker pool used by other crawls as well,
+        so that a slow target does not hold all the workers
+
+        Args:
+            workers (int): Number of workers of the pool the crawl is entitled to
+        """
+        self.__scheduler.max_concurrency = max(min(self.__host_concurrency or workers, workers), 1)
+
+    def stop_at_time_limit(self) -> bool:
+        """
+        Drop the pending urls once the time limit of the crawl is reached, the urls being crawled are finished
+
+        Returns:
+            bool: True if the time limit was reached now
+        """
+        if self.__time_flag_limit or time.time() - self.__start <= self.__thread_time_limit:
+            return False
+
+        console.print(f'[bold yellow] Time Limit Reached ({self._hostname}). Waiting for workers to finish (5 min)[/bold yellow]')
+        self.__time_flag_limit = True
+        self.thread_kill = True
+        self.__queue.clear()
+        return True
+
+    def finish_crawl(self) -> List[str]:
+        """
+        Close the frontier of a crawl of the thread engine, write the remaining result records, the final metrics,
+        the profile and the link graph
+
+        Returns:
+            List[str]: List of all the crawled urls, empty when they are streamed to the output file
+        """
+        # Closing the frontier so that the idle workers exit, the shared frontier of a batch is closed by the batch
+        if self.__frontier is not None:
+            self.__frontier.close()
+
+        # Writing the final metrics, the profile and the remaining result records
+        # The writer is closed last, an error of the writer thread is raised to the caller
+        self.export_metrics(len(self.__queue))
+        self.write_profile()
+        self.write_graph()
+        if self.__writer:
+            self.__writer.close()
+        return self.__processed_urls
+
+    def crawl_site(self, start_url: str) -> List[str]:
+        """
+        Main crawling function which starts the worker pool and waits for the frontier to be drained
+
+        Args:
+            start_url (str): Starting url
+
+        Returns:
+            List[str]: List of all the crawled urls, empty when they are streamed to the output file
+        """
+        # The workers start before the sitemaps are seeded, the pages are crawled while the sitemaps are downloaded
+        sitemaps: List[str] = self.start_crawl(start_url)
+        self.start_workers()
+        self.seed_sitemaps(sitemaps)
+        status_backup: Tuple[int, int] = (0, 0)
+        last_update_time: float = time.time()
+
+        try:
+            with console.status('[bold green]Crawling...'):
+                # Blocking until all the urls in the frontier are crawled, waking up periodically for the status
+                while not self.__frontier.join(timeout=self.__status_interval):
+                    try:
+                        # Checkpointing the frontier and exporting the metrics periodically
+                        self.__frontier.checkpoint()
+                        self.export_metrics(len(self.__frontier))
+
+                        # If time limit is reached then drop the pending urls and wait for the workers (5 min)
+                        if self.stop_at_time_limit() and not self.__frontier.join(timeout=self.time_break_limit):
+                            break
+
+                        # Update terminal output when the counts have changed or 20s have passed
+                        status: Tuple[int, int] = (self.__processed_count, self.__fetched_count)
+                        if status_backup != status or time.time() - last_update_time > 20:
+                            last_update_time = time.time()
+                            status_backup = status
+                            self.print_status(len(self.__frontier), 'Threads', len(self.__workers))
+
+                    except Exception as error:
+                        error_console.print('crawl site function error')
+                        error_console.print(error)
+
+        finally:
+            # Writing the done marks even if the crawl is interrupted (Ctrl-C, SIGTERM), the crawled urls are not fetched again on resume
+            self.__frontier.checkpoint()
+
+        urls: List[str] = self.finish_crawl()
+        self.print_summary()
+        return urls
+
+    def iter_crawl(self, start_url: str|None = None) -> Iterator[Dict[str, Any]]:
+        """
+        Crawl the website in a background thread and yield the result record of every page as soon as it is crawled
+        The records wait in a bounded queue, the workers block when the caller falls behind so that the memory
+        stays bounded, and the crawled urls are only counted. Stopping the iteration stops the crawl.
+
+        Args:
+            start_url (str): Starting url (default = None, the url given to the constructor)
+
+        Returns:
+            Iterator[Dict[str, Any]]: Result record of every crawled url (url, status, content_type, depth, referrer, latency)
+        """
+        results: queue.Queue = queue.Queue(self.results_queue_size)
+        self.__results = results
+        self.__keep_urls = False
+
+        def crawl() -> None:
+            try:
+                self.crawl_site(start_url or self.__start_url)
+            except Exception as error:
+                error_console.print('iter crawl function error')
+                error_console.print(error)
+            finally:
+                # End of the records
+                results.put(None)
+
+        crawler = threading.Thread(target=crawl, name='crawlytics-crawl', daemon=True)
+        crawler.start()
+
+        try:
+            while True:
+                record: Dict[str, Any]|None = results.get()
+                if record is None:
+                    break
+                yield record
+
+        finally:
+            # Stopping the crawl if the caller stopped iterating, the queue is drained so that no worker stays blocked
+            if crawler.is_alive():
+                self.thread_kill = True
+                while crawler.is_alive():
+                    try:
+                        results.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+            crawler.join()
+            self.__results = None
+            self.__keep_urls = not self.__output
+
+    def crawl_shard(self, shard: ShardRouter) -> None:
+        """
+        Crawling function of a shard process, crawls the urls received in the inbox of the shard
+        until the coordinator closes it, then sends the crawled urls and the counters back
+
+        Args:
+            shard (ShardRouter): Url routing of the sharded crawl, its index is the shard of this process
+        """
+        # Initializing the variables, the shard owning the starting url resolves the hostname for the others
+        self.__seed = shard.seed
+        self.__shard = shard
+        self.__processed_urls: List[str] = []
+        self.__processed_count = 0
+        self.__seen_urls = self.new_seen_set()
+        self.__scheduler.max_concurrency = self.__host_concurrency or self.__threads_limit
+
+        # The result records are queued for the coordinator, which owns the output file
+        self.__writer = ResultWriter(None, shard.records) if shard.records is not None else None
+
+        # Every shard writes its own metrics and profile files
+        self.__metrics.workers = self.__threads_limit
+        self.__metrics_labels = {'shard': str(shard.index)}
+        self.__metrics_path = shard_path(self.__metrics_path, shard.index) if self.__metrics_path else None
+        self.__profile = shard_path(self.__profile, shard.index) if self.__profile else None
+        exported: float = time.monotonic()
+
+        # The robots.txt rules are loaded by every shard, the sitemaps are seeded by the coordinator
+        self.__use_sitemaps = False
+        self.load_robots(self._hostname, shard.processes)
+
+        self.start_workers()
+        receiver = threading.Thread(target=self.receive_urls, name=f'crawlytics-shard-{shard.index}', daemon=True)
+        receiver.start()
+
+        # Waiting for the inbox to be closed by the coordinator, waking up twice a second for the time limit
+        while receiver.is_alive():
+            receiver.join(timeout=0.5)
+
+            # Dropping the pending urls once the coordinator has reached the time limit
+            if shard.stop.is_set() and not self.__time_flag_limit:
+                self.__time_flag_limit = True
+                self.thread_kill = True
+                shard.done(self.__frontier.clear())
+
+            # Exporting the metrics periodically
+            if time.monotonic() - exported > self.__status_interval:
+                exported = time.monotonic()
+                self.export_metrics(len(self.__frontier))
+
+        # Closing the frontier so that the idle workers exit
+        self.__frontier.close()
+        self.export_metrics(len(self.__frontier))
+        self.write_profile()
+
+        # The graph of the shard is merged by the coordinator
+        if self.link_graph is not None:
+            self.link_graph.save(self.shard_graph_path(shard.index))
+
+        shard.results.put((shard.index, self.__processed_urls, self.stats()))
+
+    def sharded_crawl_site(self, start_url: str, processes: int) -> List[str]:
+        """
+        Coordinator of a sharded crawl, the url space is partitioned by fingerprint between the
+        crawler processes so that the parsing and filtering of the pages scales across the cores
+        Every process runs its own worker threads, the coordinator enforces the url limit and the
+        time limit and merges the results
+
+        Args:
+            start_url (str): Starting url
+            processes (int): Number of crawler processes
+
+        Returns:
+            List[str]: List of all the crawled urls, empty when they are streamed to the output file
+        """
+        # Initializing the variables
+        self.__processed_urls: List[str] = []
+        self.__processed_count = 0
+        shard: ShardRouter = ShardRouter(processes, records=bool(self.__output))
+        shard.seed = canonicalize_url(start_url)
+
+        # The coordinator writes the result records of all the processes
+        self.__writer = ResultWriter(self.__output, shard.records) if self.__output else None
+
+        # The politeness budget of every host is split between the processes
+        rate: float = self.__options['rate'] / processes
+        host_concurrency: int = math.ceil(self.__host_concurrency / processes)
+        options: Dict[str, Any] = dict(self.__options, hostname=self._hostname, rate=rate, host_concurrency=host_concurrency)
+
+        shard_processes: List[multiprocessing.Process] = []
+        for index in range(processes):
+            shard_process = multiprocessing.Process(target=run_shard, args=(options, shard, index), name=f'crawlytics-shard-{index}', daemon=True)
+            shard_process.start()
+            shard_processes.append(shard_process)
+
+        # The coordinator holds a pending url while seeding, the crawl cannot drain before the sitemaps are read
+        with shard.pending.get_lock():
+            shard.pending.value += 1
+
+        # Sending the starting url to its owner
+        self.add_graph_root(start_url)
+        start_url = canonicalize_url(start_url)
+        shard.send(shard.owner(start_url), [start_url])
+
+        # Routing the sitemap urls to their owners in batches, the shards deduplicate them and apply the url limit
+        batch: List[str] = []
+        batch_sitemap: str|None = None
+        seeded: int = 0
+        for url, sitemap_url in self.sitemap_urls(self.load_robots(start_url)):
+            # Every batch has the sitemap listing its urls as referrer
+            if batch and (len(batch) >= 1000 or sitemap_url != batch_sitemap):
+                shard.route(batch, batch_sitemap)
+                batch = []
+            batch.append(url)
+            batch_sitemap = sitemap_url
+            seeded += 1
+            if seeded >= self._crawl_url_limit:
+                break
+        if batch:
+            shard.route(batch, batch_sitemap)
+        shard.done()
+        status_backup: Tuple[int, int] = (0, 0)
+        last_update_time: float = time.time()
+
+        with console.status('[bold green]Crawling...'):
+            # Blocking until no url is pending in any process, waking up periodically for the status
+            while not shard.drained.wait(timeout=self.__status_interval):
+                try:
+                    # Stopping if a crawler process died, its pending urls would never be done
+                    if any(shard_process.exitcode is not None for shard_process in shard_processes):
+                        error_console.print('sharded crawl site function error')
+                        error_console.print('a crawler process exited unexpectedly')
+                        break
+
+                    # Stopping the shards if the results cannot be written anymore, the error is raised when the writer is closed
+                    if self.__writer and self.__writer.error:
+                        error_console.print(f'Result writer failed, stopping the crawl ({self._hostname})')
+                        shard.stop.set()
+                        shard.drained.wait(timeout=self.time_break_limit)
+                        break
+
+                    # Checking if the thread time limit is reached or not
+                    if time.time() - self.__start > self.__thread_time_limit:
+
+                        # If time limit is reached then the shards drop the pending urls, waiting for the workers (5 min)
+                        console.print('[bold yellow] Time Limit Reached. Waiting for workers to finish (5 min)[/bold yellow]')
+                        self.__time_flag_limit = True
+                        shard.stop.set()
+                        shard.drained.wait(timeout=self.time_break_limit)
+                        break
+
+                    # Update terminal output when the counts have changed or 20s have passed
+                    status: Tuple[int, int] = (shard.visited.value, shard.fetched.value)
+                    if status_backup != status or time.time() - last_update_time > 20:
+                        last_update_time = time.time()
+                        status_backup = status
+                        self.print_status(shard.pending.value, 'Processes', processes, *status)
+
+                except Exception as error:
+                    error_console.print('sharded crawl site function error')
+                    error_console.print(error)
+
+        # Closing the inboxes, every shard sends its urls and counters back
+        for inbox in shard.inboxes:
+            inbox.put(None)
+
+        results: Dict[int, Tuple[List[str], Dict[str, int]]] = {}
+        while len(results) < sum(1 for shard_process in shard_processes if shard_process.exitcode in (None, 0)):
+            try:
+                index, urls, stats = shard.results.get(timeout=self.time_break_limit)
+                results[index] = (urls, stats)
+            except queue.Empty:
+                error_console.print('sharded crawl site function error')
+                error_console.print('no result from the crawler processes')
+                break
+
+        for shard_process in shard_processes:
+            shard_process.join(timeout=self.__status_interval)
+
+        # Hostname of the website resolved by the shard which fetched the starting url
+        if shard.resolved_hostname():
+            self.resolve_hostname(shard.resolved_hostname())
+
+        # Merging the urls and the counters of the shards
+        totals: Dict[str, int] = {}
+        for index in sorted(results):
+            urls, stats = results[index]
+            self.__processed_urls.extend(urls)
+            self.__processed_count += int(stats['visited'])
+            for name, value in stats.items():
+                totals[name] = totals.get(name, 0) + value
+
+        # Merging the link graphs of the shards
+        if self.link_graph is not None:
+            for index in sorted(results):
+                graph_path: str = self.shard_graph_path(index)
+                try:
+                    self.link_graph.merge(LinkGraph.load(graph_path))
+                    os.remove(graph_path)
+                except (OSError, ValueError, struct.error) as error:
+                    error_console.print('sharded crawl site function error')
+                    error_console.print(error)
+            self.write_graph()
+
+        # Writing the remaining result records, the processes have flushed their queues when exiting
+        # The writer is closed last, an error of the writer thread is raised to the caller
+        if self.__writer:
+            self.__writer.close()
+
+        self.print_summary(totals or self.stats())
+        return self.__processed_urls
+
+
+    async def async_crawl_url(self, session: aiohttp.ClientSession, start_url: str) -> Tuple[Set[str], float|None]:
+        """
+        Fetch a web page with the asyncio engine and collect the urls present on it
+        A request slot of the host must have been acquired from the politeness scheduler, it is released here
+
+        Args:
+            session (aiohttp.ClientSession): Pooled HTTP session
+            start_url (str): Starting url
+
+        Returns:
+            Tuple[Set[str], float|None]: In scope urls found on the web page and the delay in seconds before a retry (None when done)
+        """
+        fetched_urls: Set[str] = set()
+        host: str = urlsplit(start_url).netloc
+        latency: float|None = None
+        status: int|None = None
+        content_type: str|None = None
+        retry_after: float|None = None
+        retry: float|None = None
+        cancelled: bool = False
+        received: int = 0
+        parse_time: float = 0.0
+        filter_time: float = 0.0
+        started: float = time.monotonic()
+
+        # The SQLite cache and the result writer may block, they are called from the default executor
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        try:
+            # Cached response metadata of the last run (incremental recrawl)
+            entry: CacheEntry|None = await loop.run_in_executor(None, self.__cache.get, start_url) if self.__cache else None
+            headers: Dict[str, str] = self.__cache.conditional_headers(entry) if self.__cache else {}
+
+            # Fetching the starting url, redirects are followed here
+            async with session.get(start_url, headers=headers, allow_redirects=True) as response:
+                latency = time.monotonic() - started
+                status = response.status
+
+                # Retrying the url later if the host is throttling the crawler
+                if status in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    retry = self.retry_delay(start_url, retry_after)
+                    return fetched_urls, retry
+
+                # Relative urls are resolved against the final url of the page
+                base_url: str = str(response.url)
+
+                # Resolving the hostname of the website from the first fetch of the starting url (redirects followed)
+                if start_url == self.__seed:
+                    self.resolve_hostname(base_url)
+
+                # Marking the redirected url as processed so that it is not fetched again
+                if base_url != start_url and self.verify_scope_url(base_url):
+                    self.mark_processed(canonicalize_url(base_url))
+
+                content_type = response.headers.get('Content-Type', '')
+
+                # Reusing the cached urls if the page was not modified since the last run
+                if response.status == 304 and entry:
+                    stage: float = time.perf_counter()
+                    fetched_urls = await loop.run_in_executor(None, self.cached_urls, start_url, entry)
+                    filter_time = time.perf_counter() - stage
+                    with self.__lock:
+                        self.__fetched_count += len(fetched_urls)
+                    return fetched_urls, None
+
+                # If the current page is not a web page (doesn't contain any html content), the response is closed before its body is read
+                # A response without a specific Content-Type is sniffed from a small prefix of its body
+                head: bytes = b''
+                if self.sniffs_body(content_type):
+                    head = await response.content.read(self.sniff_size)
+                if not self.is_html(content_type, head):
+                    received = len(head)
+                    return fetched_urls, None
+                if not head:
+                    head = await response.content.read(self.__chunk_size)
+
+                extractor: LinkExtractor = self.new_link_extractor(content_type)
+                digest = hashlib.blake2b(digest_size=16)
+                chunk: bytes = head
+
+                # Feeding the body to the link extractor while it is downloaded
+                while chunk:
+                    chunk = self.body_chunk(received, chunk)
+                    if not chunk:
+                        break
+                    stage = time.perf_counter()
+                    extractor.feed(chunk)
+                    parse_time += time.perf_counter() - stage
+                    digest.update(chunk)
+                    received += len(chunk)
+                    chunk = await response.content.read(self.__chunk_size)
+                stage = time.perf_counter()
+                extractor.finish()
+                parse_time += time.perf_counter() - stage
+
+            # Getting all the urls from the current page
+            stage = time.perf_counter()
+            fetched_urls = self.extract_urls(extractor, base_url)
+            filter_time = time.perf_counter() - stage
+
+            # Storing the response metadata for the next run
+            if self.__cache and response.status == 200:
+                await loop.run_in_executor(None, self.__cache.store, start_url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                           digest.hexdigest(), fetched_urls, entry)
+
+            # Counting the fetched urls
+            with self.__lock:
+                self.__fetched_count += len(fetched_urls)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Retrying the url later with backoff
+            retry = self.retry_delay(start_url, None)
+            return fetched_urls, retry
+
+        except asyncio.CancelledError:
+            # The task was cancelled (crawl stopped), this is not a congestion signal of the host
+            cancelled = True
+            raise
+
+        except Exception as error:
+            error_console.print('async crawl url function error')
+            error_console.print(error)
+
+        finally:
+            # Releasing the request slot of the host and adjusting its concurrency (not for a cancelled request)
+            self.__scheduler.release(host, latency, status, retry_after, adjust=not cancelled)
+
+            # Recording the response, the network time is what is left once parsing and filtering are removed
+            self.__metrics.record_response(status, received, time.monotonic() - started - parse_time - filter_time, parse_time, filter_time)
+
+            # Writing the result record once the url is done (not retried)
+            if retry is None and self.keeps_records():
+                await loop.run_in_executor(None, self.write_record, start_url, status, content_type, latency)
+
+        # Done with the url
+        with self.__lock:
+            self.__retries.pop(start_url, None)
+        return fetched_urls, None
+
+    async def async_crawl_site(self, start_url: str) -> List[str]:
+        """
+        Crawling function of the asyncio engine, every url is a task bounded by a semaphore
+
+        Args:
+            start_url (str): Starting url
+
+        Returns:
+            List[str]: List of all the crawled urls, empty when they are streamed to the output file
+        """
+        # Initializing the variables, the blocking requests calls run in the default executor so that the event loop is never blocked
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self.__seed = canonicalize_url(start_url)
+        self.__processed_urls: List[str] = []
+        self.__processed_count = 0
+        self.__seen_urls = self.new_seen_set()
+        self.__scheduler.max_concurrency = self.__host_concurrency or self.__concurrency
+        self.__writer = ResultWriter(self.__output) if self.__output else None
+        self.__metrics.workers = self.__concurrency
+
+        # The event loop runs in this thread, a single profiler covers the whole crawl
+        profiler: cProfile.Profile|None = self.new_profiler()
+        if profiler:
+            profiler.enable()
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(self.__concurrency)
+        tasks: Set[asyncio.Task] = set()
+
+        # Pooled keep-alive connections sized to the concurrency and a timeout on every request
+        connector = aiohttp.TCPConnector(limit=self.__concurrency, limit_per_host=self.__concurrency, keepalive_timeout=30, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers={'User-Agent': self.user_agent},
+                                         cookies=self.__cookies.get_dict()) as session:
+
+            async def crawl(url: str) -> None:
+                host: str = urlsplit(url).netloc
+                depth: int = self.url_depth(url) + 1
+
+                while True:
+                    # Waiting for the politeness scheduler of the host without holding a slot
+                    delay: float|None = self.__scheduler.acquire(host)
+                    if delay:
+                        await asyncio.sleep(delay)
+                    else:
+                        # Waiting for a free slot, the url is dropped if the crawl was stopped meanwhile
+                        async with semaphore:
+                            if self.thread_kill:
+                                self.__scheduler.release(host, None, None, adjust=False)
+                                return
+                            started: float = self.__metrics.begin_work()
+                            try:
+                                fetched_urls, delay = await self.async_crawl_url(session, url)
+                            finally:
+                                self.__metrics.end_work(started)
 
-        # Time limit in minutes for thread (default = 20)
-        self.__thread_time_limit: int = 20 * 60
-        # Time limit flag
-        self.__time_flag_limit: bool = False
+                        # Done with the url, else retrying it after the backoff delay
+                        if delay is None:
+                            break
+                        await asyncio.sleep(delay)
 
-        # Time limit in minutes for break (default = 5 min)
-        self.time_break_limit: int = 300
+                    if self.thread_kill:
+                        return
 
-        # Limit for threads (default = 100)
-        self.__threads_limit: int = 100
+                # Recording the links of the page in the link graph
+                if self.link_graph is not None:
+                    self.link_graph.add_links(url, fetched_urls)
 
-        # Thread buffer for new threads to be created (Threads Limit)
-        self.__threads_buffer: Set[str] = set()
+                # Calling the link hooks, the urls rejected by should_follow are not crawled
+                if self.__on_link or self.__should_follow:
+                    fetched_urls = {fetched_url for fetched_url in fetched_urls if self.follow_url(fetched_url, url, depth)}
 
-        # Thread kill flag
-        self.thread_kill: bool = False
+                # Scheduling the fetched urls if they are not already processed
+                for fetched_url in fetched_urls:
+                    if not self.__time_flag_limit and self.mark_processed(fetched_url, url, depth):
+                        schedule(fetched_url)
 
-        # Thread flag limit (Stop creating new threads)
-        self.__thread_flag_limit: bool = False
+            async def seed(sitemaps: List[str]) -> None:
+                # The sitemaps are downloaded and parsed in the default executor, 1000 urls at a time
+                sitemap_urls: Iterator[Tuple[str, str]] = self.sitemap_urls(sitemaps)
+                while not (self._url_flag_limit or self.thread_kill):
+                    batch: List[Tuple[str, str]] = await loop.run_in_executor(None, list, itertools.islice(sitemap_urls, 1000))
+                    if not batch:
+                        break
+                    for url, sitemap_url in batch:
+                        if self._url_flag_limit:
+                            break
+                        if self.mark_processed(url, sitemap_url):
+                            schedule(url)
 
-        # Hostname of the website
-        self._hostname: str = requests.get(hostname).url
+            def schedule(url: str) -> None:
+                task: asyncio.Task = asyncio.create_task(crawl(url))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
 
-        # Domain name of the website
-        self._domain: str = self.get_domain_name(self._hostname)
+            # Loading robots.txt, then seeding the tasks with the starting url and the sitemap urls
+            # The pages are crawled while the sitemaps are downloaded
+            sitemaps: List[str] = await loop.run_in_executor(None, self.load_robots, start_url)
+            self.add_graph_root(start_url)
+            start_url = canonicalize_url(start_url)
+            if self.mark_processed(start_url):
+                schedule(start_url)
+            if sitemaps:
+                seeder: asyncio.Task = asyncio.create_task(seed(sitemaps))
+                tasks.add(seeder)
+                seeder.add_done_callback(tasks.discard)
+            status_backup: Tuple[int, int] = (0, 0)
+            last_update_time: float = time.time()
 
-        # URLs fetched from the webpages
-        self.__fetched_urls: List[str] = []
+            with console.status('[bold green]Crawling...'):
+                # Waiting until all the tasks are completed, waking up periodically for the status
+                while tasks:
+                    remaining: float = self.__thread_time_limit - (time.time() - self.__start)
 
-        # Extensions to be crawled (eg. php, html, htm, aspx, jsp)
-        self._known_extensions: List[str] = [
-            'php', 'html', 'htm', 'aspx',
-            'jsp', 'dj', 'asp', 'py','vb',
-            'vbjx', 'servlet', 'sql','ts'
-        ]
+                    # Checking if the thread time limit is reached or not
+                    if remaining <= 0:
 
-        # Extensions to be ignored while crawling (eg. png, jpeg, jpg, js, css, gif, pdf)
-        self._ignore_extensions: List[str] = [
-            'png', 'javascript', 'jpeg', 'jpg',
-            'js', 'css','gif', 'tif', 'bmp', 'ppm',
-            'webp', 'svg', 'pdf', 'ico', 'pdf',
-            'xlsx', 'csv', 'exe', 'war', 'mp4'
-        ]
+                        # If time limit is reached then stop scheduling and wait for the running tasks (5 min)
+                        console.print('[bold yellow] Time Limit Reached. Waiting for tasks to finish (5 min)[/bold yellow]')
+                        self.__time_flag_limit = True
+                        self.thread_kill = True
+                        await asyncio.wait(set(tasks), timeout=self.time_break_limit)
+                        for task in tasks:
+                            task.cancel()
+                        break
 
-        # Session end phrases if present in the URL then don't crawl it (eg. logout, sign out, log-out)
-        self.__session_end_phrases: List[str] = [
-            "logout", "log out", "log-out", "log_out",
-            "signout", "sign out","sign-out", "sign_out",
-            "logoff", "log-off", "log off", "log_off",
-            "signoff", "sign-off", "sign off", "sign_off"
-        ]
+                    await asyncio.wait(set(tasks), timeout=min(self.__status_interval, remaining))
+                    self.export_metrics(max(len(tasks) - self.__concurrency, 0))
 
-        # Non-page URLs to be ignored while crawling (eg. javascript, mailto, tel)
-        self.__non_page_href: List[str] = ['javascript:','mailto:','tel:']
+                    # Update terminal output when the counts have changed or 20s have passed
+                    status: Tuple[int, int] = (self.__processed_count, self.__fetched_count)
+                    if status_backup != status or time.time() - last_update_time > 20:
+                        last_update_time = time.time()
+                        status_backup = status
+                        running: int = min(len(tasks), self.__concurrency)
+                        self.print_status(len(tasks) - running, 'Tasks', running)
 
-        # Fetched URLs
-        self._fetched_urls: Set[str] = set()
-        # Processed URLs
-        self.__processed_urls: Set[str] = set()
+        # Writing the final metrics, the profile and the remaining result records
+        # The writer is closed last, an error of the writer thread is raised to the caller
+        self.export_metrics(0)
+        if profiler:
+            profiler.disable()
+        self.write_profile()
+        self.write_graph()
+        if self.__writer:
+            self.__writer.close()
+
+        self.print_summary()
+        return self.__processed_urls
 
-        # Login and logout pages
-        self.__logout_page: str = ''
 
-        # Thread object
-        self.thread: threading.Thread = None
+class BatchCrawler:
+    """
+    Batch crawl of many targets in one process under a global budget of worker threads
+    Every target has its own crawler (scope, url limit, time limit, politeness, results file) on its part
+    of a shared round robin frontier, the workers take one url of every target in turn and share their
+    browser sessions. A target is started by the first worker which takes it (redirects, robots.txt,
+    sitemaps) and finished as soon as its urls are drained, while the other targets keep crawling.
+
+    Attributes:
+        start_urls (List[str]): Starting url of every target
+        crawlers (List[Crawlytics]): Crawler of every target
+        threads (int): Number of worker threads shared by the targets
+        urls (List[List[str]]): Crawled urls of every target, filled when the target is finished (empty for the targets with an output file)
+        __frontier (BatchFrontier): Frontier shared by the targets
+        __sessions (threading.local): Per-worker storage of the browser objects shared by the crawlers
+        __workers (List[threading.Thread]): Worker threads
+        __started (List[bool]): Flag set once a target is started
+        __share (int): Maximum concurrency of every target, its share of the worker threads
+        __status_interval (float): Interval in seconds at which the targets are checked and the status is updated
+    """
 
-    def thread_buffer(self, url: str) -> None:
+    def __init__(self, targets: List[Tuple[str, Dict[str, Any]]], threads: int = 100):
         """
-        Create a thread buffer for new threads to be created
+        Constructor method
 
         Args:
-            url (str): URL to be added to the thread buffer
+            targets (List[Tuple[str, Dict[str, Any]]]): Starting url and constructor arguments of the crawler of every target
+            threads (int): Number of worker threads shared by the targets (default = 100)
         """
+        self.start_urls: List[str] = [url for url, _ in targets]
+        self.threads: int = threads
+        self.urls: List[List[str]] = [[] for _ in targets]
+        self.__frontier: BatchFrontier = BatchFrontier(len(targets))
+        self.__sessions: threading.local = threading.local()
+        self.__workers: List[threading.Thread] = []
+        self.__started: List[bool] = [False] * len(targets)
+        self.__share: int = threads
+        self.__status_interval: float = 1.0
 
-        try:
-            # Checking if the url is not in the thread buffer and adding it
-            if url not in self.__threads_buffer:
-                self.__threads_buffer.add(url)
+        # The crawlers do no network I/O until they are started by a worker
+        self.crawlers: List[Crawlytics] = [
+            Crawlytics(url, **dict(options, threads=threads, frontier=TargetFrontier(self.__frontier, index), sessions=self.__sessions))
+            for index, (url, options) in enumerate(targets)
+        ]
 
-        except Exception as error:
-            error_console.print('thread buffer funtion error')
-            error_console.print(error)
+    def worker(self) -> None:
+        """
+        Worker loop, takes the urls of the targets in turn until the shared frontier is closed
+        """
+        while True:
+            # Waiting for the next url of any target, None means the frontier is closed
+            task: Tuple[int, str|None]|None = self.__frontier.get()
+            if task is None:
+                break
+            index, url = task
+
+            if url is None:
+                self.start_target(index)
+            else:
+                self.crawlers[index].crawl_task(url)
 
-    def thread_create(self) -> None:
+    def start_target(self, index: int) -> None:
         """
-        Create new threads when the thread limit is not reached
+        Start the crawl of a target in a worker: hostname, robots.txt, starting url and sitemap urls
+
+        Args:
+            index (int): Index of the target
         """
+        crawler: Crawlytics = self.crawlers[index]
+
         try:
-            # Copying the thread buffer to a new variable
-            thread_buffer: Set[str] = self.__threads_buffer.copy()
-
-            # Checking if the thread buffer is not empty
-            if len(thread_buffer) > 0:
-                    # Checking if the thread limit is not reached and creating new threads
-                    active_thread: int = threading.active_count()
-                    if active_thread < self.__threads_limit:
-                            new_thread_available: int  = self.__threads_limit - active_thread
-                            # Checking if the thread buffer is less than the new threads available to be created
-                            # If yes then create new threads for all the URLs in the thread buffer
-                            if len(thread_buffer) < new_thread_available:
-                                    # Creating new threads
-                                    for url in thread_buffer:
-                                        self.thread_start(url)
-                                        self.__threads_buffer.remove(url)
-                            # If no then create new threads for the URLs in the thread buffer till the new threads available to be created
-                            else:
-                                new_thread_url: List[str] = list(thread_buffer)[:new_thread_available]
-                                # Creating new threads
-                                for url in new_thread_url:
-                                    self.thread_start(url)
-                                    self.__threads_buffer.remove(url)
+            sitemaps: List[str] = crawler.start_crawl(self.start_urls[index])
+            crawler.share_workers(self.__share)
+            self.__started[index] = True
+            crawler.seed_sitemaps(sitemaps)
 
         except Exception as error:
-            error_console.print('thread create function error')
+            error_console.print(f'start target function error ({self.start_urls[index]})')
             error_console.print(error)
 
-    def thread_start(self, url: str) -> None:
+        finally:
+            # The start of the target was pending like a url
+            self.__frontier.task_done(index)
+
+    def crawl(self) -> List[List[str]]:
         """
-        Start a new thread for the URL
+        Crawl all the targets and wait until every one of them is finished
 
-        Args:
-            url (str): URL to be crawled
+        Returns:
+            List[List[str]]: Crawled urls of every target
         """
-        # Checking if the time limit is not reached and the URL limit is not reached
-        if not self.__time_flag_limit and not self._url_flag_limit:
-            try:
-                self.thread = threading.Thread(target=self.crawl_url, args=(url,))
-                self.thread.start()
+        for index in range(len(self.crawlers)):
+            self.__frontier.put(index, None)
 
-            except Exception as error:
-                error_console.print('Thread Function Error')
-                error_console.print(error)
+        for index in range(self.threads):
+            worker = threading.Thread(target=self.worker, name=f'crawlytics-batch-worker-{index}', daemon=True)
+            worker.start()
+            self.__workers.append(worker)
 
-    def get_domain_name(self, url: str) -> str:
-        """
-        Get domain name (example.com)
-        This function return the domain/subdomain on the basis of url
-        Ex- http://example.com/url => example.com
-        http://sub.examole.com/url => sub.example.com
+        running: Set[int] = set(range(len(self.crawlers)))
+        last_update_time: float = time.time()
 
-        Args:
-            url (str): URL to get the domain name from
+        with console.status('[bold green]Crawling...'):
+            while running:
+                # Every running target is entitled to an equal share of the workers
+                self.__share = -(-self.threads // len(running))
+                for index in running:
+                    self.crawlers[index].share_workers(self.__share)
 
-        Returns:
-            str: Domain name
-        """
-        domain: str = ''
-        if 'http' in url:
-            domain = url.split('://',1)[1]
-        count = domain.count('/')
-        if count > 0:
-            domain = domain.split('/',count)[0]
-        return domain
+                time.sleep(self.__status_interval)
 
-    def verify_scope_url(self, url: str) -> str|None:
-        """
-        Verify if the URL is in scope or not
+                for index in sorted(running):
+                    crawler: Crawlytics = self.crawlers[index]
+                    try:
 
-        Args:
-            url (str): URL to be verified
+                        # Every target has its own time limit, its crawler drops its pending urls when it is reached
+                        if self.__started[index]:
+                            crawler.stop_at_time_limit()
 
-        Returns:
-            str: URL if it is in scope else None
-        """
-        if url:
-            if 'http' in url:
-                if self._domain in self.get_domain_name(url):
-                    return url
-        return None
+                        # Finishing the targets whose urls are drained
+                        if self.__frontier.join(index, timeout=0):
+                            running.discard(index)
+                            self.finish_target(index)
+
+                    except Exception as error:
+                        error_console.print('batch crawl function error')
+                        error_console.print(error)
 
-    def reference_url(self, url: str, start_url: str, browser: mechanicalsoup.StatefulBrowser) -> str|None:
+                # Update terminal output every 20s
+                if time.time() - last_update_time > 20:
+                    last_update_time = time.time()
+                    visited: int = sum(int(crawler.stats()['visited']) for crawler in self.crawlers)
+                    console.print(f'Targets {len(self.crawlers) - len(running)}/{len(self.crawlers)} done, Visited URLs {visited}, Threads {len(self.__workers)}')
+
+        # Closing the shared frontier so that the idle workers exit
+        self.__frontier.close()
+        return self.urls
+
+    def finish_target(self, index: int) -> None:
         """
-        Convert the reference url to absolute url
+        Write the results of a finished target and print its summary line
 
         Args:
-            url (str): Reference url
-            start_url (str): Starting url (current page for this reference url)
-            browser (mechanicalsoup.StatefulBrowser): Browser object
-
-        Returns:
-            str: Absolute url
+            index (int): Index of the target
         """
-        try:
-            # Checking if the url is not empty and not a hash tag
-            if url[0] != '#' and not self.thread_kill and url:
+        crawler: Crawlytics = self.crawlers[index]
+        self.urls[index] = crawler.finish_crawl() if self.__started[index] else []
+        stats: Dict[str, float] = crawler.stats()
+        console.print(f'[bold green] {self.start_urls[index]}: [/][bold blue]{stats["visited"]} URLs, {stats["requests"]} requests, '
+                      f'{stats["failures"]} URLs given up[/]')
 
-                # Opening the starting url (current page for this reference url) in the browser
-                browser.open(start_url)
 
-                # Opening the reference url in the browser
-                # Generating urls from relative urls
-                resp = browser.open_relative(url)
+def get_hostname(url: str) -> str:
+    """
+    Get the hostname from the URL.
 
-                if 200 >= resp.status_code <= 400:
-                    return resp.url
+    Args:
+        url (str): The URL of the website to check
 
-        except requests.exceptions.ConnectionError:
-            time.sleep(10)
-            pass
+    Returns:
+        str: The hostname
+    """
+    #Check if the URL starts with HTTP or HTTPS
+    if not url.startswith('http'):
+        # If not, add the HTTP scheme
+        hostname = f"http://{url}"
+    else:
+        hostname = url
 
-        except Exception as error:
-            error_console.print('Reference url function error')
-            error_console.print(error)
+    return hostname
 
-        return None
+def canonicalize_url(url: str) -> str:
+    """
+    Canonicalize the URL so that the same page is only crawled once.
+    The scheme and the host are lowercased, the default port and the fragment are dropped
+    and the query parameters are sorted. The canonical URL is fetched, so the trailing slash
+    of the path is kept (/docs and /docs/ are distinct urls, one usually redirects to the other).
+    Ex- HTTP://Example.com:80/a/?b=2&a=1#top => http://example.com/a/?a=1&b=2
 
-    def crawl_url(self, start_url: str) -> None:
-        """
-        Crawl the urls on the web page and add them to the thread buffer
+    Args:
+        url (str): Absolute URL
 
-        Args:
-            start_url (str): Starting url
-        """
-        try:
+    Returns:
+        str: Canonical URL
+    """
+    parts = urlsplit(url)
+    scheme: str = parts.scheme.lower()
+    netloc: str = parts.netloc.lower()
 
-            fetched_urls: Set[str] = set()
+    # Dropping the default port of the scheme
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
 
-            # Opening the starting url in the browser
-            self.__browser.open(start_url)
+    # The empty path is the root path
+    path: str = parts.path or '/'
 
-            try:
-                # Getting all the urls from the current page
-                all_urls_tag = self.__browser.links()
-
-            except:
-                # If the current page is not a web page (doesn't contain any html content)
-                all_urls_tag = None
-
-            if all_urls_tag:
-                # Iterating through all the urls
-                for url_tag in all_urls_tag:
-
-                    # Checking if the thread kill flag is not set
-                    if not self.thread_kill:
-
-                        # Initializing the variables
-                        url = None
-                        href_value = url_tag.attrs['href']
-                        logout = False
-                        not_page = False
-                        ignore = False
-
-                        # Checking if the url is not empty and not a hash tag
-                        if href_value and href_value[0] != '#':
-                            # Checking if the url is not a logout page
-                            for logout_page in self.__session_end_phrases:
-                                if str(logout_page).lower() in str(href_value).lower():
-                                    logout = True
-                                    # Setting the logout page
-                                    if self.__logout_page is None:
-                                        self.__logout_page = str(href_value)
-
-                            # Checking if the url is not a non page url (eg. javascript, mailto, tel)
-                            for not_a_page in self.__non_page_href:
-                                if str(not_a_page) in str(href_value).lower():
-                                    not_page = True
-
-                            # Checking if the url is not an ignored extension
-                            if len(href_value)> 4:
-                                for ignore_extension in self._ignore_extensions:
-                                        if ignore_extension in  href_value[-4:] and '=' not in href_value and '?' not in href_value:
-                                            ignore = True
-
-                            if not logout and not not_page and not ignore:
-
-                                # Checking if the url is a relative url
-                                if 'http' not in href_value:
-                                    # Converting the relative url to absolute url
-                                    url = self.reference_url(href_value, start_url, self.__browser)
-                                else:
-                                    url = href_value
-
-                                # Verifying if the url is in scope or not
-                                if url:
-                                    url = self.verify_scope_url(url)
-
-
-                                # Adding the url to the fetched urls
-                                if url:
-                                    fetched_urls.add(url)
-
-            # Adding the fetched urls to the fetched urls list
-            self.__fetched_urls.extend(fetched_urls)
-
-            # Adding the fetched urls to the thread buffer if they are not already processed
-            for fetched_url in fetched_urls:
-                if fetched_url not in self.__processed_urls:
-                    # Adding the fetched url to the processed urls set
-                    self.__processed_urls.add(fetched_url)
-                    # Adding the fetched url to the thread buffer if the thread kill flag is not set
-                    if not self.__time_flag_limit:
-                        self.thread_buffer(fetched_url)
-
-
-        except requests.exceptions.ConnectionError:
-            time.sleep(10)
+    # Sorting the query parameters
+    query: str = '&'.join(sorted(pair for pair in parts.query.split('&') if pair))
 
-        except Exception as error:
-            error_console.print('crawl url function error')
-            error_console.print(error)
+    return urlunsplit((scheme, netloc, path, query, ''))
 
-    def crawl_site(self, start_url: str) -> List[str]:
-        """
-        Main crawling function which starts the crawling process and maintains the threads
+def to_signed(value: int) -> int:
+    """
+    Convert an unsigned 64-bit integer to a signed one (SQLite integers are signed).
 
-        Args:
-            start_url (str): Starting url
+    Args:
+        value (int): Unsigned 64-bit integer
 
-        Returns:
-            List[str]: List of all the crawled urls
-        """
+    Returns:
+        int: Signed 64-bit integer
+    """
+    return value - (1 << 64) if value >= (1 << 63) else value
 
-        # Initializing the variables
-        self.__processed_urls: Set[str] = set()
-        self.__processed_urls.add(start_url)
-        self.thread_start(start_url)
-        thread_count_backup: int = 0
-        last_update_time: float = time.time()
+def url_fingerprint(url: str) -> int:
+    """
+    Get the 64-bit fingerprint of the URL stored in the seen-set.
 
-        with console.status('[bold green]Crawling...'):
-            # Looping until all the threads are completed
-            while threading.active_count() > 1  or len(self.__threads_buffer) > 0:
-                try:
-                    # Updating the thread count
-                    thread_count: int = threading.active_count()
-                    thread_enum: int = len(threading.enumerate())
+    Args:
+        url (str): Canonical URL
 
-                    # Checking for time limit, if time limit exceed then sudden break out of loop
-                    if self.__time_flag_limit and int(time.time()) > int(self.time_break_limit):
-                        break
+    Returns:
+        int: Fingerprint
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+
+def url_extension(url: str) -> str:
+    """
+    Get the extension of the path of an absolute or relative URL.
+    The query string, the fragment and the host are not part of the path.
+    Ex- /data.json?v=2 => json, /download.php?file=a.pdf => php, https://example.com => ''
+
+    Args:
+        url (str): Absolute or relative URL
+
+    Returns:
+        str: Lowercase extension without the dot or an empty string
+    """
+    path: str = url.partition('#')[0].partition('?')[0]
 
-                    if len(self.__processed_urls) >= self._crawl_url_limit and self._url_flag_limit == False:
-                        console.print('[bold yellow] Url Limit Reached[/bold yellow]')
-                        self._url_flag_limit = True
+    # Dropping the scheme and the host of absolute and scheme relative urls
+    authority: int = path.find('//')
+    if authority != -1 and (authority == 0 or path[authority - 1] == ':'):
+        slash: int = path.find('/', authority + 2)
+        path = path[slash:] if slash != -1 else ''
 
-                    # Update terminal output when thread count has changed or 20s have passed
-                    if thread_count_backup != thread_count or int(time.time()) - int(last_update_time) > 20:
-                        last_update_time: float = time.time()
-                        thread_count_backup: int = thread_count
+    dot: int = path.rfind('.')
+    if dot > path.rfind('/'):
+        return path[dot + 1:].lower()
+    return ''
 
-                        # Calculating the time elapsed since the start of crawling
-                        secs = time.time() - self.__start
-                        hours = math.floor(secs/3600)
-                        secs = secs-(hours*3600)
-                        mins = math.floor(secs/60)
-                        secs = math.floor(secs-(mins*60))
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regular expression matching any of the words, common prefixes are factored in a trie.
+    Ex- logout, logoff, signout => log(?:off|out)|signout
 
-                        # Updating the terminal output with the current status of the crawling process
-                        console.print('['+str(hours)+':'+str(mins)+':'+str(secs)+'] Visited URLs '+str(len(self.__processed_urls))+' Threads '+str(thread_count)+' Fetched URLs '+str(len(self.__fetched_urls))+'   ')
+    Args:
+        words (Iterable[str]): Literal words
 
-                    # Checking if the thread buffer is not empty if yes then create a new thread
-                    if len(self.__threads_buffer) > 0:
-                        self.thread_create()
+    Returns:
+        str: Regular expression
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node: Dict[str, Any] = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        # Empty key marks the end of a word
+        node[''] = {}
 
-                        # Updating the thread count
-                        thread_count: int = threading.active_count()
-                        thread_enum: int = len(threading.enumerate())
+    def build(node: Dict[str, Any]) -> str:
+        alternatives: List[str] = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        pattern: str = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        # A word ending here makes the rest optional
+        return f'(?:{pattern})?' if '' in node else pattern
 
-                    if (thread_count > 1 or thread_enum > 1) and not self.__time_flag_limit and not self._url_flag_limit:
+    return build(trie)
 
-                        # Checking if the thread time limit is reached or not
-                        if (time.time() - self.__start > self.__thread_time_limit):
+def parse_retry_after(value: str|None) -> float|None:
+    """
+    Parse the Retry-After header, in seconds or as an HTTP date.
 
-                            # If time limit is reached then wait for all the threads to join
-                            print('Time Limit Reached. Waiting for thread Join(5 min)')
-                            self.__time_flag_limit = True
-                            self.thread_kill = True
-                            self.time_break_limit += int(time.time())
+    Args:
+        value (str): Retry-After header value (eg. "120" or "Wed, 21 Oct 2015 07:28:00 GMT")
 
-                        else:
-                            self.thread_create()
-                            thread_count = threading.active_count()
-                            thread_enum = len(threading.enumerate())
+    Returns:
+        float: Delay in seconds or None if the header is missing or invalid
+    """
+    if not value:
+        return None
 
-                    else:
-                        #checking if all threads are finished and thread_buffer is also empty then break out of loop
-                        if len(self.__threads_buffer) == 0 and (threading.active_count() == 1 and len(threading.enumerate()) == 1):
-                            break
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
 
-                except Exception as error:
-                    error_console.print('crawl site function error')
-                    error_console.print(error)
-                    pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError, IndexError):
+        return None
 
-        console.print(f'[bold green] Complete execution: [/][bold blue]Total Visited URls: {len(self.__processed_urls)}[/]')
-        return self.__processed_urls
+def get_charset(content_type: str) -> str|None:
+    """
+    Get the charset declared in a Content-Type header.
 
+    Args:
+        content_type (str): Content-Type header value (eg. "text/html; charset=utf-8")
 
-def get_hostname(url: str) -> str:
+    Returns:
+        str: Charset or None if it is not declared
     """
-    Get the hostname from the URL.
+    for parameter in content_type.split(';')[1:]:
+        name, _, value = parameter.partition('=')
+        if name.strip().lower() == 'charset' and value.strip():
+            return value.strip().strip('"\'')
+    return None
+
+def parse_sitemap(chunks: Iterable[bytes]) -> Iterator[Tuple[str, str]]:
+    """
+    Parse a sitemap or a sitemap index incrementally while it is downloaded.
+    The entries are cleared once read so that a large sitemap is never held in memory, gzip
+    compressed sitemaps are detected from their first bytes.
 
     Args:
-        url (str): The URL of the website to check
+        chunks (Iterable[bytes]): Chunks of the body of the sitemap
 
     Returns:
-        str: The hostname
+        Iterator[Tuple[str, str]]: Kind of every entry (url or sitemap) and its location
     """
-    #Check if the URL starts with HTTP or HTTPS
-    if not url.startswith('http'):
-        # If not, add the HTTP scheme
-        hostname = f"http://{url}"
-    else:
-        hostname = url
+    # Pull parser fed chunk by chunk, entities and network access are disabled
+    parser = etree.XMLPullParser(events=('end',), tag=('{*}url', '{*}sitemap'), resolve_entities=False, no_network=True, recover=True)
+    decompressor: Any = None
 
-    return hostname
+    for index, chunk in enumerate(itertools.chain(chunks, [None])):
+        if chunk is None:
+            parser.close()
+        else:
+            # Gzip sitemap (sitemap.xml.gz served without Content-Encoding)
+            if index == 0 and chunk[:2] == b'\x1f\x8b':
+                decompressor = zlib.decompressobj(wbits=31)
+            if decompressor:
+                chunk = decompressor.decompress(chunk)
+            parser.feed(chunk)
+
+        for _, element in parser.read_events():
+            loc: str|None = element.findtext('{*}loc')
+            kind: str = etree.QName(element).localname
+
+            # Clearing the entry and the previous ones, the document is never built in memory
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+            if loc and loc.strip():
+                yield kind, loc.strip()
+
+def parse_cookies(cookie: str|None) -> Dict[str, str]:
+    """
+    Parse the cookies from a Cookie header value.
+
+    Args:
+        cookie (str): Cookie header value (eg. "session=abc; token=xyz")
+
+    Returns:
+        Dict[str, str]: Cookies
+    """
+    cookies: Dict[str, str] = {}
+    if cookie:
+        for pair in cookie.split(';'):
+            # Skipping the pairs without a value
+            if '=' in pair:
+                name, value = pair.split('=', 1)
+                cookies[name.strip()] = value.strip()
+    return cookies
+
+def parse_list(value: str|None) -> List[str]|None:
+    """
+    Parse a comma separated list from the command line.
+
+    Args:
+        value (str): Comma separated values (eg. "png,jpg,css")
+
+    Returns:
+        List[str]: Values or None if no value is given
+    """
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def parse_targets(path: str) -> List[Tuple[str, int|None, float|None]]:
+    """
+    Parse a targets file, one target per line: URL [URL_LIMIT [TIME_LIMIT]], the time limit is in minutes.
+    Blank lines and lines starting with # are skipped.
+
+    Args:
+        path (str): Path of the targets file
+
+    Returns:
+        List[Tuple[str, int|None, float|None]]: Starting url, url limit and time limit of every target, None for the defaults
+    """
+    targets: List[Tuple[str, int|None, float|None]] = []
+    with open(path, encoding='utf-8') as targets_file:
+        for number, line in enumerate(targets_file, 1):
+            fields: List[str] = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            if len(fields) > 3:
+                raise ArgumentError(None, f'{path}:{number}: expected URL [URL_LIMIT [TIME_LIMIT]]')
+            try:
+                url_limit: int|None = int(fields[1]) if len(fields) > 1 else None
+                time_limit: float|None = float(fields[2]) if len(fields) > 2 else None
+            except ValueError:
+                raise ArgumentError(None, f'{path}:{number}: invalid url limit or time limit')
+            targets.append((get_hostname(fields[0]), url_limit, time_limit))
+    return targets
+
+def target_names(urls: List[str]) -> List[str]:
+    """
+    Get a file name for every target, the host and port of its url, suffixed if several targets share it.
+    Ex- https://example.com:8080/blog => example.com_8080
+
+    Args:
+        urls (List[str]): Starting url of every target
+
+    Returns:
+        List[str]: File name of every target
+    """
+    names: List[str] = []
+    counts: Dict[str, int] = {}
+    for url in urls:
+        name: str = re.sub(r'[^\w.-]', '_', urlsplit(url).netloc) or 'target'
+        counts[name] = counts.get(name, 0) + 1
+        names.append(name if counts[name] == 1 else f'{name}-{counts[name]}')
+    return names
+
+def shard_path(path: str, index: int|str) -> str:
+    """
+    Get the path of a file written by a shard or a batch target, the index is inserted before the extension.
+    Ex- metrics.prom => metrics.2.prom
+
+    Args:
+        path (str): Path of the file
+        index (int|str): Index of the shard or name of the target
+
+    Returns:
+        str: Path of the file of the shard
+    """
+    root, extension = os.path.splitext(path)
+    return f'{root}.{index}{extension}'
+
+def run_shard(options: Dict[str, Any], shard: ShardRouter, index: int) -> None:
+    """
+    Entry point of a crawler process of a sharded crawl.
+
+    Args:
+        options (Dict[str, Any]): Constructor arguments of the crawler
+        shard (ShardRouter): Url routing of the sharded crawl
+        index (int): Index of the shard owned by the process
+    """
+    try:
+        shard.index = index
+        Crawlytics(**options).crawl_shard(shard)
+    except Exception as error:
+        error_console.print('run shard function error')
+        error_console.print(error)
+
+def batch_crawl(path: str, options: Dict[str, Any]) -> None:
+    """
+    Crawl the targets of a targets file with a shared pool of worker threads, every target writes
+    its results, metrics and link graph to its own files.
+
+    Args:
+        path (str): Path of the targets file
+        options (Dict[str, Any]): Constructor arguments shared by the crawlers, the output is a directory
+    """
+    targets: List[Tuple[str, int|None, float|None]] = parse_targets(path)
+    if not targets:
+        raise ArgumentError(None, f'no target in {path}')
+    names: List[str] = target_names([url for url, _, _ in targets])
+
+    # One results file per target in the output directory
+    directory: str = options['output'] or 'results'
+    os.makedirs(directory, exist_ok=True)
+
+    batch_targets: List[Tuple[str, Dict[str, Any]]] = []
+    for (url, url_limit, time_limit), name in zip(targets, names):
+        target_options: Dict[str, Any] = dict(options, output=os.path.join(directory, f'{name}.jsonl'))
+        if url_limit is not None:
+            target_options['url_limit'] = url_limit
+        if time_limit is not None:
+            target_options['time_limit'] = time_limit
+        for option in ('metrics', 'graph'):
+            if options[option]:
+                target_options[option] = shard_path(options[option], name)
+        batch_targets.append((url, target_options))
+
+    # The urls are streamed to the results files, only their number is reported
+    batch: BatchCrawler = BatchCrawler(batch_targets, options['threads'])
+    batch.crawl()
+    visited: int = sum(int(crawler.stats()['visited']) for crawler in batch.crawlers)
+    console.print(f'[bold green] Results of {len(targets)} targets written to {directory}: [/][bold blue]{visited} URLs[/]')
 
 def parse_args() -> ArgumentParser:
     """
@@ -479,10 +5059,41 @@ def parse_args() -> ArgumentParser:
     parser = ArgumentParser(
         prog = "crawlytics",
         description = "Crawlytics is a python script which crawls the website and fetches all the URLs present on the website.",
-        epilog = "Example: python3 crawlytics.py -u https://www.breachlock.com [-l 1000]"
+        epilog = "Example: python3 crawlytics.py -u https://www.breachlock.com [-l 1000] [-t 100]"
     )
-    parser.add_argument("-u", "--url", type=str, dest="url", required=True, help="Provide the URL to check")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("-u", "--url", type=str, dest="url", help="Provide the URL to check")
+    target.add_argument("--targets_file", "--targets-file", type=str, dest="targets_file", default=None, help="File of the targets to crawl at once with the shared worker threads, one \"URL [URL_LIMIT [TIME_LIMIT]]\" per line, -o is then a directory receiving one results file per target")
     parser.add_argument("-l", "--url_limit", type=int, dest="url_limit", default=1000, help="Provide URL limit to crawl (default: 1000)")
+    parser.add_argument("-t", "--threads", type=int, dest="threads", default=100, help="Number of worker threads (default: 100)")
+    parser.add_argument("--time_limit", type=float, dest="time_limit", default=20, help="Time limit of the crawl of every target in minutes (default: 20)")
+    parser.add_argument("-e", "--engine", type=str, dest="engine", default="thread", choices=["thread", "async"], help="Crawl engine to use (default: thread)")
+    parser.add_argument("-c", "--concurrency", type=int, dest="concurrency", default=500, help="Number of in-flight requests for the async engine (default: 500)")
+    parser.add_argument("-p", "--pool_size", type=int, dest="pool_size", default=10, help="Keep-alive connections per host in every worker session (default: 10)")
+    parser.add_argument("-x", "--extractor", type=str, dest="extractor", default="stream", choices=list(LINK_EXTRACTORS), help="Link extractor used to parse the web pages (default: stream)")
+    parser.add_argument("-m", "--max_body_size", type=int, dest="max_body_size", default=10 * 1024 * 1024, help="Maximum body size in bytes read from every page, 0 for no limit (default: 10485760)")
+    parser.add_argument("-s", "--seen_set", type=str, dest="seen_set", default="exact", choices=["exact", "bloom"], help="Seen-set used to deduplicate the URLs, bloom uses less memory but may skip a few URLs (default: exact)")
+    parser.add_argument("--ignore_extensions", type=str, dest="ignore_extensions", default=None, help="Comma separated extensions to be ignored, replaces the built-in list (eg. \"png,jpg,css,js,pdf\")")
+    parser.add_argument("--session_end_phrases", type=str, dest="session_end_phrases", default=None, help="Comma separated phrases of logout URLs not to be crawled, replaces the built-in list (eg. \"logout,signout\")")
+    parser.add_argument("--non_page_href", type=str, dest="non_page_href", default=None, help="Comma separated non-page URL markers to be ignored, replaces the built-in list (eg. \"javascript:,mailto:,tel:\")")
+    parser.add_argument("--state", type=str, dest="state", default=None, help="SQLite file storing the frontier and the seen URLs, enables checkpoint and resume (thread engine)")
+    parser.add_argument("--resume", action="store_true", dest="resume", help="Resume the interrupted crawl stored in the state file")
+    parser.add_argument("--cache", type=str, dest="cache", default=None, help="SQLite file caching ETag, Last-Modified and outlinks of every page for incremental recrawls")
+    parser.add_argument("--cache_max_age", type=float, dest="cache_max_age", default=7, help="Cache entries older than this many days are evicted (default: 7)")
+    parser.add_argument("--cache_max_entries", type=int, dest="cache_max_entries", default=100000, help="Maximum number of cache entries, the oldest ones are evicted (default: 100000)")
+    parser.add_argument("-r", "--rate", type=float, dest="rate", default=0, help="Requests per second per host, 0 for no rate limit (default: 0)")
+    parser.add_argument("--host_concurrency", type=int, dest="host_concurrency", default=0, help="Maximum concurrent requests per host, adjusted with AIMD below it, 0 for the number of workers (default: 0)")
+    parser.add_argument("--max_retries", type=int, dest="max_retries", default=3, help="Maximum number of retries of a URL after a 429/503 response or a connection error (default: 3)")
+    parser.add_argument("--processes", type=int, dest="processes", default=1, help="Number of crawler processes, the URLs are sharded between them and every process runs its own worker threads (thread engine, default: 1)")
+    parser.add_argument("-o", "--output", type=str, dest="output", default=None, help="JSON Lines file receiving one record per crawled URL while crawling (url, status, content_type, depth, referrer, latency), gzip compressed if it ends with .gz")
+    parser.add_argument("--metrics", type=str, dest="metrics", default=None, help="File receiving a snapshot of the crawl metrics every few seconds, Prometheus text format if it ends with .prom, else JSON (one file per process with --processes)")
+    parser.add_argument("--profile", type=str, dest="profile", default=None, help="File receiving the cProfile statistics of the crawl, the top functions are printed at the end (one file per process with --processes)")
+    parser.add_argument("--sitemaps", action="store_true", dest="sitemaps", help="Seed the frontier with the URLs of the sitemaps listed in robots.txt (or /sitemap.xml), sitemap indexes and gzip sitemaps included")
+    parser.add_argument("--robots", action="store_true", dest="robots", help="Honor the robots.txt disallow rules and crawl-delay of the starting host")
+    parser.add_argument("--graph", type=str, dest="graph", default=None, help="File receiving the link graph of the crawl (source and target of every in scope link), GraphML if it ends with .graphml, CSV if it ends with .csv, else compact binary")
+    parser.add_argument("--traps", action="store_true", dest="traps", help="Drop the URLs of crawler traps: more than 1000 URLs per path template or 100 per path and query parameter names, a path segment repeated more than twice, more than 16 path segments")
+    parser.add_argument("--near_duplicates", action="store_true", dest="near_duplicates", help="Do not expand the pages whose SimHash text fingerprint is within 3 bits of a crawled page")
+    parser.add_argument("-b", "--cookie", type=str, dest="cookie", default=None, help="Cookies sent with every request (eg. \"session=abc; token=xyz\")")
     return parser.parse_args()
 
 def main():
@@ -493,14 +5104,74 @@ def main():
 
         # Parse the command line arguments
         args: ArgumentParser = parse_args()
-        hostname: str = get_hostname(args.url)
-        url_limit: int = args.url_limit
+
+        # Exiting on SIGTERM like on Ctrl-C, so that the frontier state and the results are flushed
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+        # Checking the combination of the arguments
+        if args.resume and not args.state:
+            raise ArgumentError(None, '--resume requires --state')
+        if args.state and args.engine == 'async':
+            raise ArgumentError(None, '--state is only supported by the thread engine')
+        if args.processes > 1 and (args.engine == 'async' or args.state):
+            raise ArgumentError(None, '--processes is only supported by the thread engine without --state')
+        if args.targets_file and (args.engine == 'async' or args.processes > 1 or args.state or args.cache or args.profile):
+            raise ArgumentError(None, '--targets_file is only supported by the thread engine without --processes, --state, --cache or --profile')
+
+        # Constructor arguments shared by every target
+        options: Dict[str, Any] = dict(
+            url_limit=args.url_limit,
+            threads=args.threads,
+            concurrency=args.concurrency,
+            pool_size=args.pool_size,
+            cookies=parse_cookies(args.cookie),
+            extractor=args.extractor,
+            max_body_size=args.max_body_size,
+            seen_set=args.seen_set,
+            ignore_extensions=parse_list(args.ignore_extensions),
+            session_end_phrases=parse_list(args.session_end_phrases),
+            non_page_href=parse_list(args.non_page_href),
+            state=args.state,
+            resume=args.resume,
+            cache=args.cache,
+            cache_max_age=args.cache_max_age,
+            cache_max_entries=args.cache_max_entries,
+            rate=args.rate,
+            host_concurrency=args.host_concurrency,
+            max_retries=args.max_retries,
+            output=args.output,
+            metrics=args.metrics,
+            profile=args.profile,
+            sitemaps=args.sitemaps,
+            robots=args.robots,
+            graph=args.graph,
+            traps=args.traps,
+            near_duplicates=args.near_duplicates,
+            time_limit=args.time_limit
+        )
+
+        # Crawling all the targets of the targets file at once
+        if args.targets_file:
+            batch_crawl(args.targets_file, options)
+            return
 
         # Creating the crawler object
-        crawler_obj = Crawlytics(hostname, url_limit)
-        crawl_urls: Set[str] = set()
+        hostname: str = get_hostname(args.url)
+        crawler_obj = Crawlytics(hostname, **options)
+        crawl_urls: List[str] = []
+
+        # Starting the crawling process with the selected engine
+        if args.engine == 'async':
+            crawl_urls = asyncio.run(crawler_obj.async_crawl_site(hostname))
+        elif args.processes > 1:
+            crawl_urls = crawler_obj.sharded_crawl_site(hostname, args.processes)
+        else:
+            crawl_urls = crawler_obj.crawl_site(hostname)
 
-        crawl_urls = crawler_obj.crawl_site(hostname)
+        # The crawled urls were streamed to the output file, only their number is reported
+        if args.output:
+            console.print(f'[bold green] Results written to {args.output}: [/][bold blue]{crawler_obj.stats()["visited"]} URLs[/]')
+            return
 
         # Printing the crawled urls
         console.print('\n')
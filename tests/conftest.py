@@ -0,0 +1,87 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+
+import pytest
+
+# Making the crawlytics module importable when the tests are run from the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlytics import console
+
+# Number of pages of the local site, every page links to 3 child pages behind a redirect
+SITE_PAGES: int = 150
+SITE_FANOUT: int = 3
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the local site: /page/<n> links to /r/<child> which redirects to /page/<child>,
+    /start redirects to the absolute url of /page/0
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        """
+        Serve a page or a redirect
+        """
+        parts: List[str] = self.path.split('?')[0].strip('/').split('/')
+
+        # Starting url on another host name of the site (localhost -> 127.0.0.1)
+        if parts == ['start']:
+            return self.respond(302, b'', {'Location': f'http://127.0.0.1:{self.server.server_address[1]}/page/0'})
+
+        if len(parts) == 2 and parts[0] == 'r' and parts[1].isdigit():
+            return self.respond(302, b'', {'Location': f'/page/{parts[1]}'})
+
+        if len(parts) == 2 and parts[0] == 'page' and parts[1].isdigit():
+            page: int = int(parts[1])
+            children: range = range(page * SITE_FANOUT + 1, min(page * SITE_FANOUT + SITE_FANOUT, SITE_PAGES - 1) + 1)
+            links: str = ''.join(f'<a href="/r/{child}">child</a>' for child in children)
+            body: bytes = f'<html><body><a href="/page/0">home</a>{links}</body></html>'.encode()
+            return self.respond(200, body, {'Content-Type': 'text/html; charset=utf-8'})
+
+        return self.respond(404, b'not found', {'Content-Type': 'text/plain'})
+
+    def respond(self, status: int, body: bytes, headers: dict) -> None:
+        """
+        Send a response with a body
+        """
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """
+        Silence the access log
+        """
+        return None
+
+
+@pytest.fixture(scope='session')
+def site() -> Iterator[str]:
+    """
+    Local site with redirects served from a thread, yields its base url
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SiteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def quiet_console() -> Iterator[None]:
+    """
+    Silence the crawl output during the tests
+    """
+    console.quiet = True
+    yield
+    console.quiet = False
@@ -0,0 +1,49 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from crawlytics import Crawlytics, ResponseCache
+
+
+@pytest.mark.parametrize('host, path', [('127.0.0.1', '/page/0'), ('localhost', '/start')])
+def test_async_crawl_matches_thread_crawl(site, host, path):
+    """
+    The asyncio engine finds the same urls as the thread engine, the hostname is resolved by the first fetch
+    """
+    url: str = site.replace('127.0.0.1', host) + path
+    assert sorted(asyncio.run(Crawlytics(url, concurrency=20).async_crawl_site(url))) == sorted(Crawlytics(url, threads=10).crawl_site(url))
+
+
+def test_cache_and_output_do_not_block_the_event_loop(site, tmp_path, monkeypatch):
+    """
+    The SQLite cache and the result writer are called from the executor, the event loop keeps running meanwhile
+    """
+    get = ResponseCache.get
+
+    def slow_get(self, url):
+        time.sleep(0.1)
+        return get(self, url)
+
+    monkeypatch.setattr(ResponseCache, 'get', slow_get)
+    url: str = f'{site}/page/0'
+    output = tmp_path / 'results.jsonl'
+    crawler = Crawlytics(url, url_limit=30, concurrency=10, cache=str(tmp_path / 'cache.db'), output=str(output))
+
+    async def crawl() -> float:
+        # Longest time the event loop did not run the watchdog
+        longest: float = 0.0
+        task = asyncio.ensure_future(crawler.async_crawl_site(url))
+        while not task.done():
+            started: float = time.monotonic()
+            await asyncio.sleep(0.005)
+            longest = max(longest, time.monotonic() - started)
+        await task
+        return longest
+
+    assert asyncio.run(crawl()) < 0.08
+    assert crawler.stats()['visited'] == 30
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert records and {record['status'] for record in records} <= {200, 302}
+    assert crawler.stats()['cache_misses'] > 0
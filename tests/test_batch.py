@@ -0,0 +1,78 @@
+import re
+import time
+
+from crawlytics import BatchCrawler, BatchFrontier, Crawlytics, TargetFrontier
+
+
+def mock_target(requests_mock, host: str, pages: int) -> str:
+    """
+    Mock a site of linked pages on a host, page n links to pages 2n+1 and 2n+2
+
+    Returns:
+        str: Starting url
+    """
+    for page in range(pages):
+        links: str = ''.join(f'<a href="/p/{child}">p</a>' for child in (2 * page + 1, 2 * page + 2) if child < pages)
+        requests_mock.get(f'http://{host}/p/{page}', text=f'<html><body>{links}</body></html>', headers={'Content-Type': 'text/html'})
+    return f'http://{host}/p/0'
+
+
+def test_batch_crawl_matches_single_crawls(requests_mock):
+    """
+    Every target of a batch crawl finds the same pages as its own crawl and stops at its own url limit
+    """
+    targets = [
+        (mock_target(requests_mock, 'a.example.com', 30), {}),
+        (mock_target(requests_mock, 'b.example.com', 12), {}),
+        (mock_target(requests_mock, 'c.example.com', 30), {'url_limit': 10}),
+    ]
+
+    urls = BatchCrawler(targets, threads=4).crawl()
+
+    assert [len(target_urls) for target_urls in urls] == [30, 12, 10]
+    for (start_url, options), target_urls in zip(targets[:2], urls):
+        assert sorted(target_urls) == sorted(Crawlytics(start_url, threads=4, **options).crawl_site(start_url))
+    assert all(url.startswith('http://c.example.com/') for url in urls[2])
+
+
+def test_target_frontier_counts_and_drops_its_own_urls():
+    """
+    The part of a batch frontier seen by a target counts and drops the urls of that target only
+    """
+    batch = BatchFrontier(2)
+    first, second = TargetFrontier(batch, 0), TargetFrontier(batch, 1)
+    for index in range(3):
+        first.put(f'http://a.example.com/{index}')
+        second.put(f'http://b.example.com/{index}')
+
+    target, url = batch.get()
+    first.defer(url, 60)
+    assert (len(first), len(second)) == (3, 3)
+
+    assert first.clear() == 3
+    assert (len(first), len(second)) == (0, 3)
+    assert batch.join(0, timeout=0)
+    assert not batch.join(1, timeout=0)
+
+
+def test_time_limit_drops_the_urls_of_one_target(requests_mock):
+    """
+    A target reaching its time limit drops its pending urls, the other targets are crawled in full
+    """
+    def slow_page(request, context):
+        time.sleep(0.02)
+        page: int = int(request.path.rsplit('/', 1)[1])
+        return f'<html><body><a href="/p/{2 * page + 1}">p</a><a href="/p/{2 * page + 2}">p</a></body></html>'
+
+    requests_mock.get(re.compile(r'http://slow\.example\.com/p/\d+'), text=slow_page, headers={'Content-Type': 'text/html'})
+    targets = [
+        (mock_target(requests_mock, 'a.example.com', 30), {}),
+        ('http://slow.example.com/p/0', {'time_limit': 0}),
+    ]
+
+    started: float = time.monotonic()
+    urls = BatchCrawler(targets, threads=4).crawl()
+
+    assert len(urls[0]) == 30
+    assert 0 < len(urls[1]) < 1000
+    assert time.monotonic() - started < 30
@@ -0,0 +1,101 @@
+import re
+import sqlite3
+
+from crawlytics import Crawlytics, ResponseCache
+
+PAGES: int = 15
+
+
+def cached_pages(path: str) -> int:
+    """
+    Number of entries of a cache store
+    """
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_cache_evicts_while_storing(tmp_path):
+    """
+    A long crawl stays within max_entries, the oldest entries are evicted while pages are stored
+    """
+    path: str = str(tmp_path / 'cache.db')
+    cache = ResponseCache(path, max_entries=50)
+    for index in range(500):
+        cache.store(f'http://example.com/{index}', None, None, 'hash', [])
+        assert cached_pages(path) <= cache.max_entries + cache.evict_interval
+
+    # The newest pages are kept
+    assert cache.get('http://example.com/499') is not None
+    assert cache.get('http://example.com/0') is None
+    cache.close()
+
+
+def mock_cached_site(requests_mock) -> str:
+    """
+    Mock a site of linked pages with ETags, the pages answer 304 to a conditional request with their ETag
+
+    Returns:
+        str: Starting url
+    """
+    requests_mock.get(re.compile(r'http://example\.com/p/\d+\.pdf'), content=b'%PDF-1.4', headers={'Content-Type': 'application/pdf'})
+    for page in range(PAGES):
+        url: str = f'http://example.com/p/{page}'
+        links: str = ''.join(f'<a href="/p/{child}">p</a><a href="/p/{child}.pdf">pdf</a>' for child in (2 * page + 1, 2 * page + 2) if child < PAGES)
+        requests_mock.get(url, text=f'<html><body>{links}</body></html>', headers={'Content-Type': 'text/html', 'ETag': f'"v{page}"'})
+        requests_mock.get(url, status_code=304, request_headers={'If-None-Match': f'"v{page}"'})
+    return 'http://example.com/p/0'
+
+
+def test_not_modified_pages_reuse_the_cached_links(requests_mock, tmp_path):
+    """
+    On a recrawl the pages answer 304 and their links are taken from the cache, the crawl finds the same pages
+    """
+    url: str = mock_cached_site(requests_mock)
+    path: str = str(tmp_path / 'cache.db')
+
+    first = Crawlytics(url, threads=4, cache=path)
+    first_urls = first.crawl_site(url)
+    assert len(first_urls) == PAGES
+    assert first.stats()['cache_misses'] == PAGES
+    assert all('If-None-Match' not in request.headers for request in requests_mock.request_history)
+
+    requests_mock.reset_mock()
+    second = Crawlytics(url, threads=4, cache=path)
+    assert sorted(second.crawl_site(url)) == sorted(first_urls)
+    assert second.stats()['cache_hits'] == PAGES
+    assert second.stats()['cache_misses'] == 0
+    assert all(request.headers.get('If-None-Match') for request in requests_mock.request_history if request.method == 'GET')
+
+
+def test_cached_links_are_filtered_again(requests_mock, tmp_path):
+    """
+    The cached links are filtered with the configuration of the current run
+    """
+    url: str = mock_cached_site(requests_mock)
+    path: str = str(tmp_path / 'cache.db')
+
+    assert len(Crawlytics(url, threads=4, cache=path, ignore_extensions=[]).crawl_site(url)) == 2 * PAGES - 1
+
+    recrawl = Crawlytics(url, threads=4, cache=path)
+    assert len(recrawl.crawl_site(url)) == PAGES
+    assert recrawl.stats()['cache_hits'] == PAGES
+
+
+def test_unchanged_content_is_counted(tmp_path):
+    """
+    A page downloaded again with the same content hash is counted as unchanged
+    """
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    cache.store('http://example.com/a', '"v1"', None, 'hash', ['http://example.com/b'])
+    entry = cache.get('http://example.com/a')
+    assert entry.outlinks == ['http://example.com/b']
+    assert cache.conditional_headers(entry) == {'If-None-Match': '"v1"'}
+
+    cache.store('http://example.com/a', '"v2"', None, 'hash', [], previous=entry)
+    cache.store('http://example.com/a', '"v3"', None, 'other', [], previous=cache.get('http://example.com/a'))
+    assert cache.unchanged == 1
+    assert cache.misses == 3
+    cache.close()
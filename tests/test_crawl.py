@@ -0,0 +1,65 @@
+from crawlytics import Crawlytics
+
+
+def test_seed_is_resolved_by_its_first_fetch(requests_mock):
+    """
+    No request is made before the crawl, the hostname is resolved from the final url of the starting url
+    """
+    requests_mock.get('http://example.com/', status_code=301, headers={'Location': 'http://www.example.com/'})
+    requests_mock.get('http://www.example.com/', text='<html><a href="/about">about</a></html>', headers={'Content-Type': 'text/html'})
+    requests_mock.get('http://www.example.com/about', text='<html></html>', headers={'Content-Type': 'text/html'})
+
+    crawler = Crawlytics('http://example.com/', threads=2)
+    assert crawler._domain == 'example.com'
+    urls = crawler.crawl_site('http://example.com/')
+
+    assert crawler._hostname == 'http://www.example.com/'
+    assert crawler._domain == 'www.example.com'
+    assert sorted(urls) == ['http://example.com/', 'http://www.example.com/', 'http://www.example.com/about']
+    # Every page is requested once, the redirect of the starting url is only followed by its fetch
+    requests = [(request.method, request.url) for request in requests_mock.request_history]
+    assert sorted(requests) == [('GET', 'http://example.com/'), ('GET', 'http://www.example.com/'), ('GET', 'http://www.example.com/about')]
+
+
+def test_seed_redirect_to_a_parent_domain(requests_mock):
+    """
+    A starting url redirecting out of its offline domain (www.example.com -> example.com) crawls the final domain
+    """
+    requests_mock.get('http://www.example.com/', status_code=301, headers={'Location': 'http://example.com/'})
+    requests_mock.get('http://example.com/', text='<html><a href="/about">about</a></html>', headers={'Content-Type': 'text/html'})
+    requests_mock.get('http://example.com/about', text='<html></html>', headers={'Content-Type': 'text/html'})
+
+    urls = Crawlytics('http://www.example.com/', threads=2).crawl_site('http://www.example.com/')
+    assert sorted(urls) == ['http://example.com/', 'http://example.com/about', 'http://www.example.com/']
+
+
+def test_empty_filter_lists_replace_the_built_in_ones(requests_mock):
+    """
+    An empty list turns a filter off instead of falling back to the built-in list
+    """
+    requests_mock.get('http://example.com/', headers={'Content-Type': 'text/html'},
+                      text='<html><a href="/report.pdf">report</a><a href="/logout">logout</a></html>')
+    requests_mock.get('http://example.com/report.pdf', headers={'Content-Type': 'application/pdf'}, content=b'%PDF')
+    requests_mock.get('http://example.com/logout', headers={'Content-Type': 'text/html'}, text='<html></html>')
+
+    default = Crawlytics('http://example.com/', threads=2).crawl_site('http://example.com/')
+    assert default == ['http://example.com/']
+
+    unfiltered = Crawlytics('http://example.com/', threads=2, ignore_extensions=[], session_end_phrases=[]).crawl_site('http://example.com/')
+    assert sorted(unfiltered) == ['http://example.com/', 'http://example.com/logout', 'http://example.com/report.pdf']
+
+
+def test_directory_urls_keep_their_trailing_slash(requests_mock):
+    """
+    A directory page is fetched as linked, no extra request is spent on a /docs -> /docs/ redirect
+    """
+    requests_mock.get('http://example.com/', text='<html><a href="/docs/">docs</a><a href="/docs/#intro">intro</a></html>', headers={'Content-Type': 'text/html'})
+    requests_mock.get('http://example.com/docs', status_code=301, headers={'Location': 'http://example.com/docs/'})
+    requests_mock.get('http://example.com/docs/', text='<html><a href="guide/">guide</a></html>', headers={'Content-Type': 'text/html'})
+    requests_mock.get('http://example.com/docs/guide/', text='<html></html>', headers={'Content-Type': 'text/html'})
+
+    urls = Crawlytics('http://example.com/', threads=2).crawl_site('http://example.com/')
+
+    assert sorted(urls) == ['http://example.com/', 'http://example.com/docs/', 'http://example.com/docs/guide/']
+    gets = [request.url for request in requests_mock.request_history if request.method == 'GET']
+    assert sorted(gets) == sorted(urls)
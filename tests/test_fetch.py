@@ -0,0 +1,43 @@
+import io
+
+from crawlytics import Crawlytics
+
+
+class TrackedBody(io.BytesIO):
+    """
+    Response body counting the bytes read by the crawler
+    """
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.read_bytes: int = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data: bytes = super().read(size)
+        self.read_bytes += len(data)
+        return data
+
+
+def test_non_html_body_is_not_read(requests_mock):
+    """
+    A response with a non-html Content-Type is dropped before its body is read, a generic one is sniffed from a small prefix
+    """
+    video = TrackedBody(b'\0' * 1000000)
+    blob = TrackedBody(b'\0' * 1000000)
+    html: bytes = b'  <!DOCTYPE html><html><body><a href="/found">found</a>' + b' ' * 100000 + b'</body></html>'
+    page = TrackedBody(html)
+    requests_mock.get('http://example.com/', headers={'Content-Type': 'text/html'},
+                      text='<html><body><a href="/media/1">video</a><a href="/blob/1">blob</a><a href="/download/1">page</a></body></html>')
+    requests_mock.get('http://example.com/media/1', body=video, headers={'Content-Type': 'video/mp4'})
+    requests_mock.get('http://example.com/blob/1', body=blob, headers={'Content-Type': 'application/octet-stream'})
+    requests_mock.get('http://example.com/download/1', body=page)
+    requests_mock.get('http://example.com/found', headers={'Content-Type': 'text/html'}, text='<html></html>')
+
+    crawler = Crawlytics('http://example.com/', threads=2)
+    urls = crawler.crawl_site('http://example.com/')
+
+    assert video.read_bytes == 0
+    assert blob.read_bytes <= crawler.sniff_size
+    # The sniffed web page is read to the end and its links are crawled
+    assert page.read_bytes == len(html)
+    assert 'http://example.com/found' in urls
@@ -0,0 +1,42 @@
+import pytest
+
+from crawlytics import LinkFilter, url_extension
+
+
+@pytest.mark.parametrize('url, extension', [
+    ('/data.json?v=2', 'json'),
+    ('/download.php?file=a.pdf', 'php'),
+    ('https://example.com', ''),
+    ('//cdn.example.com/app.JS', 'js'),
+    ('/v1.2/page', ''),
+    ('image.png#top', 'png'),
+])
+def test_url_extension(url, extension):
+    """
+    Only the extension of the path counts, not the host, the query or the fragment
+    """
+    assert url_extension(url) == extension
+
+
+def test_link_filter():
+    """
+    The session end phrases, the non-page markers and the extensions are reported with their reason
+    """
+    link_filter = LinkFilter(['logout', 'sign out'], ['javascript:', 'mailto:'], ['png', '.PDF'])
+    assert link_filter.drop_reason('/account/LogOut?next=/') == 'session_end'
+    assert link_filter.drop_reason('/Sign Out') == 'session_end'
+    assert link_filter.drop_reason('JavaScript:void(0)') == 'non_page'
+    assert link_filter.drop_reason('mailto:team@example.com') == 'non_page'
+    assert link_filter.drop_reason('/files/report.pdf') == 'extension'
+    assert link_filter.drop_reason('/logo.png?size=2') == 'extension'
+    assert link_filter.drop_reason('/download.php?file=a.pdf') is None
+    assert link_filter.drop_reason('/blog/post-1') is None
+
+
+def test_empty_link_filter_keeps_everything():
+    """
+    Without phrases, markers or extensions nothing is dropped
+    """
+    link_filter = LinkFilter([], [], [])
+    for href_value in ('/logout', 'javascript:void(0)', '/a.png'):
+        assert link_filter.drop_reason(href_value) is None
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import time
+
+from crawlytics import PersistentFrontier, url_fingerprint
+
+
+def stored_pending(path: str) -> int:
+    """
+    Number of pending urls of a stored crawl
+    """
+    resumed = PersistentFrontier(path, resume=True)
+    try:
+        return len(resumed)
+    finally:
+        resumed.close()
+
+
+def test_persistent_frontier_resume(tmp_path):
+    """
+    The urls marked done are not crawled again after a resume, the pending ones are
+    """
+    path: str = str(tmp_path / 'state.db')
+    urls = [f'http://example.com/{index}' for index in range(50)]
+
+    frontier = PersistentFrontier(path, memory_limit=10)
+    for url in urls:
+        frontier.put(url)
+    for _ in range(20):
+        frontier.task_done(frontier.get())
+    frontier.close()
+
+    resumed = PersistentFrontier(path, resume=True, memory_limit=10)
+    resumed.read_batch = 7
+    assert list(resumed.stored_urls()) == [(url_fingerprint(url), url) for url in urls]
+    assert len(resumed) == 30
+
+    pending = []
+    while len(pending) < 30:
+        url = resumed.get()
+        pending.append(url)
+        resumed.task_done(url)
+    assert pending == urls[20:]
+    assert resumed.join(timeout=0)
+    resumed.close()
+
+
+def test_persistent_frontier_checkpoint_without_close(tmp_path):
+    """
+    A checkpoint writes the buffered done marks, as on an interrupted crawl
+    """
+    path: str = str(tmp_path / 'state.db')
+    frontier = PersistentFrontier(path)
+    frontier.checkpoint_interval = 3600
+    for index in range(5):
+        frontier.put(f'http://example.com/{index}')
+    for _ in range(3):
+        frontier.task_done(frontier.get())
+    frontier.checkpoint()
+
+    resumed = PersistentFrontier(path, resume=True)
+    assert len(resumed) == 2
+    resumed.close()
+    frontier.close()
+
+
+def test_exit_checkpoint_skips_a_held_lock(tmp_path):
+    """
+    The checkpoint at exit writes the buffered marks, but does not wait forever for a lock which is never released
+    """
+    path: str = str(tmp_path / 'state.db')
+    frontier = PersistentFrontier(path)
+    frontier.checkpoint_interval = 3600
+    frontier.exit_timeout = 0.1
+    for index in range(5):
+        frontier.put(f'http://example.com/{index}')
+    frontier.task_done(frontier.get())
+
+    frontier._lock.acquire()
+    started: float = time.monotonic()
+    frontier.exit_checkpoint()
+    assert time.monotonic() - started < 1
+    frontier._lock.release()
+    assert stored_pending(path) == 0
+
+    frontier.exit_checkpoint()
+    assert stored_pending(path) == 4
+    frontier.close()
+
+
+def test_exit_is_not_blocked_by_a_stopped_worker(tmp_path):
+    """
+    The interpreter exits even if a daemon worker holds the frontier lock when the main thread ends
+    """
+    script: str = (
+        'import threading, time\n'
+        'from crawlytics import PersistentFrontier\n'
+        f'frontier = PersistentFrontier({str(tmp_path / "state.db")!r})\n'
+        'frontier.exit_timeout = 0.2\n'
+        'threading.Thread(target=lambda: (frontier._lock.acquire(), time.sleep(3600)), daemon=True).start()\n'
+        'time.sleep(0.2)\n'
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            capture_output=True, timeout=15)
+    assert result.returncode == 0
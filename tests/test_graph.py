@@ -0,0 +1,92 @@
+import csv
+
+import pytest
+
+from crawlytics import Crawlytics, LinkGraph
+from test_output import mock_site
+
+
+def sample_graph() -> LinkGraph:
+    """
+    Small graph: a -> b, c; b -> c, d; e is only linked from itself
+    """
+    graph = LinkGraph()
+    graph.add_links('http://example.com/a', ['http://example.com/b', 'http://example.com/c'])
+    graph.add_links('http://example.com/b', ['http://example.com/c', 'http://example.com/d'])
+    graph.add_links('http://example.com/e', ['http://example.com/e'])
+    return graph
+
+
+def test_graph_queries():
+    """
+    Depths, in-degrees and orphans are computed from the edges
+    """
+    graph = sample_graph()
+    assert len(graph) == 5
+    assert graph.edge_count == 5
+    assert graph.depth('http://example.com/a') == 0
+    assert graph.depth('http://example.com/d') == 2
+    assert graph.depth('http://example.com/e') is None
+    assert graph.depth('http://example.com/unknown') is None
+    assert graph.in_degree('http://example.com/c') == 2
+    assert graph.orphans() == []
+
+
+def test_graph_binary_round_trip(tmp_path):
+    """
+    A graph saved in the binary format is loaded back with the same nodes, edges and queries
+    """
+    graph = sample_graph()
+    path: str = str(tmp_path / 'graph.bin')
+    graph.save(path)
+    loaded: LinkGraph = LinkGraph.load(path)
+
+    assert loaded.urls == graph.urls
+    assert loaded.edge_count == graph.edge_count
+    assert [list(part) for part in loaded.adjacency()] == [list(part) for part in graph.adjacency()]
+    assert list(loaded.depths()) == list(graph.depths())
+    assert loaded.in_degree('http://example.com/c') == 2
+
+    # The loaded graph keeps growing
+    loaded.add_links('http://example.com/d', ['http://example.com/f'])
+    assert loaded.depth('http://example.com/f') == 3
+
+
+def test_empty_graph_round_trip(tmp_path):
+    """
+    An empty graph is saved and loaded too
+    """
+    path: str = str(tmp_path / 'graph.bin')
+    LinkGraph().save(path)
+    loaded: LinkGraph = LinkGraph.load(path)
+    assert len(loaded) == 0 and loaded.edge_count == 0
+
+
+def test_graph_load_rejects_other_files(tmp_path):
+    """
+    A file which is not a binary link graph is rejected
+    """
+    path = tmp_path / 'graph.csv'
+    sample_graph().save(str(path))
+    with pytest.raises(ValueError):
+        LinkGraph.load(str(path))
+
+    with path.open(newline='') as graph_file:
+        rows = list(csv.reader(graph_file))
+    assert rows[0] == ['source', 'target']
+    assert len(rows) == 6
+
+
+def test_crawl_records_the_graph(requests_mock, tmp_path):
+    """
+    The crawl writes the link graph of the pages, every page is reachable from the starting url
+    """
+    url: str = mock_site(requests_mock, pages=15)
+    path: str = str(tmp_path / 'graph.bin')
+    Crawlytics(url, threads=4, graph=path).crawl_site(url)
+
+    graph: LinkGraph = LinkGraph.load(path)
+    assert sorted(graph.urls) == sorted(f'http://example.com/p/{page}' for page in range(15))
+    assert graph.edge_count == 14
+    assert graph.depth('http://example.com/p/14') == 3
+    assert graph.orphans() == []
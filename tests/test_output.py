@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from crawlytics import Crawlytics, ResultWriter
+
+
+def mock_site(requests_mock, pages: int = 20) -> str:
+    """
+    Mock a site of linked pages, page n links to pages 2n+1 and 2n+2
+
+    Returns:
+        str: Starting url
+    """
+    for page in range(pages):
+        links: str = ''.join(f'<a href="/p/{child}">p</a>' for child in (2 * page + 1, 2 * page + 2) if child < pages)
+        requests_mock.get(f'http://example.com/p/{page}', text=f'<html><body>{links}</body></html>', headers={'Content-Type': 'text/html'})
+    return 'http://example.com/p/0'
+
+
+def test_output_streams_records_without_keeping_urls(requests_mock, tmp_path):
+    """
+    With an output file the records are streamed and the urls are only counted
+    """
+    url: str = mock_site(requests_mock)
+    output = tmp_path / 'results.jsonl'
+
+    crawler = Crawlytics(url, threads=4, output=str(output))
+    assert crawler.crawl_site(url) == []
+    assert crawler.stats()['visited'] == 20
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(record['url'] for record in records) == sorted(f'http://example.com/p/{page}' for page in range(20))
+    assert {record['status'] for record in records} == {200}
+
+
+def test_urls_are_returned_without_output(requests_mock):
+    """
+    Without an output file the crawled urls are returned
+    """
+    url: str = mock_site(requests_mock)
+    assert len(Crawlytics(url, threads=4).crawl_site(url)) == 20
+
+
+def test_writer_failure_does_not_block(tmp_path):
+    """
+    A failed writer thread drops the records instead of blocking on its full queue, and close() raises its error
+    """
+    writer = ResultWriter(str(tmp_path / 'missing' / 'results.jsonl'), max_queued=1)
+    for index in range(20):
+        writer.write({'url': f'http://example.com/{index}'})
+
+    with pytest.raises(FileNotFoundError):
+        writer.close()
+    assert writer.written == 0
+
+
+def test_writer_failure_stops_the_crawl(requests_mock, tmp_path):
+    """
+    The error of the writer thread stops the crawl and is raised by crawl_site
+    """
+    url: str = mock_site(requests_mock)
+    crawler = Crawlytics(url, threads=4, output=str(tmp_path / 'missing' / 'results.jsonl'))
+
+    with pytest.raises(FileNotFoundError):
+        crawler.crawl_site(url)
+    assert crawler.thread_kill
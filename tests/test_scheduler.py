@@ -0,0 +1,136 @@
+import time
+
+from crawlytics import Crawlytics, HostScheduler, parse_retry_after
+
+
+def test_retry_after_pauses_the_host():
+    """
+    A 429 with Retry-After pauses the host for that delay and halves its concurrency limit
+    """
+    scheduler = HostScheduler(max_concurrency=16)
+    assert scheduler.acquire('example.com') == 0
+    limit: float = scheduler.concurrency('example.com')
+
+    scheduler.release('example.com', 0.01, 429, retry_after=30)
+    assert scheduler.throttled == 1
+    assert scheduler.concurrency('example.com') == max(limit / 2, 1)
+    assert 29 < scheduler.acquire('example.com') <= 30
+
+    # Other hosts are not paused
+    assert scheduler.acquire('other.example.com') == 0
+
+
+def test_retry_after_is_capped():
+    """
+    A Retry-After longer than backoff_cap pauses the host for backoff_cap only
+    """
+    scheduler = HostScheduler()
+    scheduler.backoff_cap = 5
+    scheduler.acquire('example.com')
+    scheduler.release('example.com', 0.01, 503, retry_after=3600)
+    assert 4 < scheduler.acquire('example.com') <= 5
+
+
+def test_concurrency_limit_and_growth():
+    """
+    The in-flight requests are limited and the limit grows while the responses are fast
+    """
+    scheduler = HostScheduler(max_concurrency=8)
+    limit: int = scheduler.initial_concurrency
+    for _ in range(limit):
+        assert scheduler.acquire('example.com') == 0
+    assert scheduler.acquire('example.com') > 0
+
+    for _ in range(limit):
+        scheduler.release('example.com', 0.01, 200)
+    assert scheduler.concurrency('example.com') == 8
+
+
+def test_unused_slot_does_not_adjust_the_limit():
+    """
+    A slot released without a request (url dropped, task cancelled) is freed but does not raise or lower the limit
+    """
+    scheduler = HostScheduler(max_concurrency=8)
+    limit: int = scheduler.initial_concurrency
+    for _ in range(limit):
+        assert scheduler.acquire('example.com') == 0
+    for _ in range(limit):
+        scheduler.release('example.com', None, None, adjust=False)
+
+    assert scheduler.concurrency('example.com') == limit
+    assert all(scheduler.acquire('example.com') == 0 for _ in range(limit))
+
+
+def test_backoff_is_bounded():
+    """
+    The exponential backoff with full jitter stays within base * 2 ** attempt and the cap
+    """
+    scheduler = HostScheduler()
+    scheduler.backoff_base = 0.5
+    scheduler.backoff_cap = 10
+    for attempt in range(1, 10):
+        delays = [scheduler.backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= min(10, 0.5 * 2 ** attempt) for delay in delays)
+
+
+def test_token_bucket_rate():
+    """
+    With a rate the requests of a host are spaced out once the burst is used
+    """
+    scheduler = HostScheduler(rate=10)
+    granted: int = 0
+    for _ in range(20):
+        if scheduler.acquire('example.com') == 0:
+            granted += 1
+            scheduler.release('example.com', 0.01, 200)
+    assert granted <= 11
+    assert 0 < scheduler.acquire('example.com') <= 0.1
+
+
+def test_parse_retry_after():
+    """
+    Retry-After is given in seconds or as an HTTP date
+    """
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    future: str = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(time.time() + 60))
+    assert 55 < parse_retry_after(future) <= 60
+
+
+def test_throttled_url_is_retried(requests_mock, monkeypatch):
+    """
+    A throttled page is retried after Retry-After and crawled once it succeeds
+    """
+    monkeypatch.setattr(HostScheduler, 'backoff', lambda self, attempt: 0.0)
+    requests_mock.get('http://example.com/', text='<html><body><a href="/a">a</a></body></html>', headers={'Content-Type': 'text/html'})
+    requests_mock.get('http://example.com/a', [
+        {'status_code': 429, 'headers': {'Retry-After': '0'}},
+        {'status_code': 503},
+        {'text': '<html><body>a</body></html>', 'headers': {'Content-Type': 'text/html'}},
+    ])
+
+    crawler = Crawlytics('http://example.com/', threads=2)
+    urls = crawler.crawl_site('http://example.com/')
+
+    assert sorted(urls) == ['http://example.com/', 'http://example.com/a']
+    stats = crawler.stats()
+    assert stats['throttled'] == 2
+    assert stats['retries'] == 2
+    assert stats['failures'] == 0
+
+
+def test_url_given_up_after_max_retries(requests_mock, monkeypatch):
+    """
+    A page throttled more than max_retries times is given up, it is requested max_retries + 1 times
+    """
+    monkeypatch.setattr(HostScheduler, 'backoff', lambda self, attempt: 0.0)
+    requests_mock.get('http://example.com/', text='<html><body><a href="/a">a</a></body></html>', headers={'Content-Type': 'text/html'})
+    requests_mock.get('http://example.com/a', status_code=429, headers={'Retry-After': '0'})
+
+    crawler = Crawlytics('http://example.com/', threads=2, max_retries=1)
+    crawler.crawl_site('http://example.com/')
+
+    assert sum(request.url == 'http://example.com/a' for request in requests_mock.request_history) == 2
+    assert crawler.stats()['failures'] == 1
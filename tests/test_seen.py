@@ -0,0 +1,42 @@
+from crawlytics import BloomFilter, FingerprintSet, url_fingerprint
+
+
+def test_fingerprint_set_is_exact():
+    """
+    The exact seen-set grows past its capacity and reports every fingerprint added once
+    """
+    seen = FingerprintSet(capacity=8)
+    fingerprints = [url_fingerprint(f'http://example.com/{index}') for index in range(5000)]
+
+    assert all(seen.add(fingerprint) for fingerprint in fingerprints)
+    assert len(seen) == 5000
+    assert not any(seen.add(fingerprint) for fingerprint in fingerprints)
+    assert len(seen) == 5000
+    assert all(fingerprint in seen for fingerprint in fingerprints)
+    assert not any(url_fingerprint(f'http://example.com/other/{index}') in seen for index in range(5000))
+
+
+def test_fingerprint_set_zero_fingerprint():
+    """
+    The fingerprint 0 is stored like any other value
+    """
+    seen = FingerprintSet()
+    assert 0 not in seen
+    assert seen.add(0)
+    assert 0 in seen
+    assert not seen.add(0)
+
+
+def test_bloom_filter_error_rate():
+    """
+    The bloom seen-set has no false negatives and stays close to its false positive rate
+    """
+    seen = BloomFilter(capacity=10000, error_rate=0.01)
+    fingerprints = [url_fingerprint(f'http://example.com/{index}') for index in range(10000)]
+    for fingerprint in fingerprints:
+        seen.add(fingerprint)
+
+    assert all(fingerprint in seen for fingerprint in fingerprints)
+    false_positives: int = sum(url_fingerprint(f'http://example.com/other/{index}') in seen for index in range(10000))
+    assert false_positives < 300
+    assert seen.memory_usage() < FingerprintSet(10000).memory_usage()
@@ -0,0 +1,38 @@
+from crawlytics import Crawlytics
+
+
+def test_sharded_crawl_matches_single_process_with_redirects(site):
+    """
+    The redirect targets owned by another shard are marked by their owner, not dropped
+    """
+    url: str = f'{site}/page/0'
+    single = sorted(Crawlytics(url, url_limit=1000, threads=10).crawl_site(url))
+    sharded = sorted(Crawlytics(url, url_limit=1000, threads=10).sharded_crawl_site(url, 4))
+
+    assert sharded == single
+    # Every page is reached behind a redirect, both the redirect and the page are processed
+    assert f'{site}/page/149' in single and f'{site}/r/149' in single
+
+
+def test_sharded_crawl_is_deterministic(site):
+    """
+    Repeated sharded crawls process the same urls
+    """
+    url: str = f'{site}/page/0'
+    runs = [sorted(Crawlytics(url, url_limit=1000, threads=10).sharded_crawl_site(url, 3)) for _ in range(2)]
+    assert runs[0] == runs[1]
+
+
+def test_sharded_crawl_resolves_the_seed_redirect(site):
+    """
+    The shard fetching the starting url shares its final host with the other shards
+    """
+    url: str = site.replace('127.0.0.1', 'localhost') + '/start'
+    single = sorted(Crawlytics(url, url_limit=1000, threads=10).crawl_site(url))
+    crawler = Crawlytics(url, url_limit=1000, threads=10)
+    sharded = sorted(crawler.sharded_crawl_site(url, 4))
+
+    assert sharded == single
+    # The pages, the redirects to the pages but the first one and the starting url
+    assert len(single) == 150 + 149 + 1
+    assert crawler._hostname == f'{site}/page/0'
@@ -0,0 +1,83 @@
+import re
+
+from crawlytics import Crawlytics, TrapDetector
+
+
+def test_template_limit():
+    """
+    A calendar of urls differing only by their numeric segments is cut at max_template_urls
+    """
+    detector = TrapDetector()
+    detector.max_template_urls = 10
+    reasons = [detector.check(f'http://example.com/calendar/2024/{day}') for day in range(1, 31)]
+    assert reasons[:10] == [None] * 10
+    assert set(reasons[10:]) == {'template'}
+    assert detector.pruned['template'] == 20
+
+    # Other templates and other hosts have their own limit
+    assert detector.check('http://example.com/calendar/2024/1/events') is None
+    assert detector.check('http://other.example.com/calendar/2024/1') is None
+
+
+def test_query_limit():
+    """
+    Urls of the same path and query parameter names are cut at max_query_urls, the parameter order does not matter
+    """
+    detector = TrapDetector()
+    detector.max_query_urls = 5
+    reasons = [detector.check(f'http://example.com/search?page={index}&sid=x{index}') for index in range(8)]
+    assert reasons == [None] * 5 + ['query'] * 3
+    assert detector.check('http://example.com/search?sid=y&page=9') == 'query'
+    assert detector.check('http://example.com/search?q=a') is None
+
+
+def test_repeated_segments_and_depth():
+    """
+    Endlessly growing paths are dropped by repeated segment or by depth
+    """
+    detector = TrapDetector()
+    assert detector.check('http://example.com/a/b/a/b') is None
+    assert detector.check('http://example.com/a/b/a/b/a') == 'repeat'
+    assert detector.check('http://example.com/' + '/'.join(f's{index}x' for index in range(17))) == 'depth'
+    assert detector.pruned == {'template': 0, 'query': 0, 'repeat': 1, 'depth': 1}
+
+
+def test_dropped_urls_are_not_counted():
+    """
+    A dropped url does not use up the limit of its template
+    """
+    detector = TrapDetector()
+    detector.max_template_urls = 2
+    assert detector.check('http://example.com/x/x/x/1') == 'repeat'
+    assert detector.check('http://example.com/x/1') is None
+    assert detector.check('http://example.com/x/2') is None
+    assert detector.check('http://example.com/x/3') == 'template'
+
+
+def test_zero_limits_disable_the_checks():
+    """
+    A limit of 0 disables its check
+    """
+    detector = TrapDetector()
+    detector.max_template_urls = 0
+    detector.max_repeated_segments = 0
+    detector.max_path_depth = 0
+    assert all(detector.check(f'http://example.com/{"a/" * 30}{index}') is None for index in range(2000))
+
+
+def test_crawl_prunes_a_calendar_trap(requests_mock):
+    """
+    A page linking to the next day forever stops at the template limit of the discovered urls (the starting url is not checked)
+    """
+    requests_mock.get(
+        re.compile(r'http://example\.com/day/\d+'),
+        text=lambda request, context: f'<html><body><a href="/day/{int(request.path.rsplit("/", 1)[1]) + 1}">next</a></body></html>',
+        headers={'Content-Type': 'text/html'}
+    )
+
+    crawler = Crawlytics('http://example.com/day/0', threads=2, url_limit=5000, traps=True)
+    crawler.trap_detector.max_template_urls = 50
+    urls = crawler.crawl_site('http://example.com/day/0')
+
+    assert len(urls) == 51
+    assert crawler.stats()['trap_template'] == 1
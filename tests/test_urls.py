@@ -0,0 +1,21 @@
+import pytest
+
+from crawlytics import canonicalize_url
+
+
+@pytest.mark.parametrize('url, canonical', [
+    ('HTTP://Example.COM:80/a/?b=2&a=1#top', 'http://example.com/a/?a=1&b=2'),
+    ('https://example.com:443/', 'https://example.com/'),
+    ('https://example.com:8443/a', 'https://example.com:8443/a'),
+    ('http://example.com', 'http://example.com/'),
+    ('http://example.com/docs/', 'http://example.com/docs/'),
+    ('http://example.com/docs', 'http://example.com/docs'),
+    ('http://example.com/a?&b=1&&a=2', 'http://example.com/a?a=2&b=1'),
+    ('http://example.com/A/b#x', 'http://example.com/A/b'),
+])
+def test_canonicalize_url(url, canonical):
+    """
+    The scheme, host, default port, fragment and query order are normalized, the path and its trailing slash are kept
+    """
+    assert canonicalize_url(url) == canonical
+    assert canonicalize_url(canonical) == canonical